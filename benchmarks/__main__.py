@@ -0,0 +1,81 @@
+import argparse
+import json
+import platform
+import subprocess
+import sys
+from datetime import datetime, timezone
+from importlib import import_module
+
+import numpy as np
+
+# Benchmarks modules, each one exposing PARAMETERS and run(**parameters) -> dict
+BENCHMARKS = ["universe", "get_area", "brain", "agent", "experiment", "analysis"]
+
+
+def get_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(names: list, quick: bool = False) -> dict:
+    # Results of every parametrization of the benchmarks, with their context
+    report = {
+        "commit": get_commit(),
+        "date": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "benchmarks": {},
+    }
+    for name in names:
+        module = import_module(f"benchmarks.{name}")
+        parameters = getattr(module, "PARAMETERS", [{}])
+        report["benchmarks"][name] = [
+            {"parameters": p, "results": module.run(**p)}
+            for p in (parameters[:1] if quick else parameters)
+        ]
+        print(f"{name}: Done", file=sys.stderr)
+    return report
+
+
+def compare(report: dict, baseline: dict) -> None:
+    # Ratios to the baseline, above 1 being slower except for throughputs
+    for name, runs in report["benchmarks"].items():
+        for current, previous in zip(runs, baseline["benchmarks"].get(name, [])):
+            if current["parameters"] != previous["parameters"]:
+                continue
+            for key, value in current["results"].items():
+                if previous["results"].get(key):
+                    ratio = value / previous["results"][key]
+                    print(
+                        f"{name}{current['parameters']} {key:<32}: {ratio:>6.2f}x",
+                        file=sys.stderr,
+                    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Simulation core benchmarks")
+    parser.add_argument("names", nargs="*", help=f"Among {BENCHMARKS}, all by default")
+    parser.add_argument("--output", help="JSON file, stdout by default")
+    parser.add_argument("--baseline", help="JSON report to compare with")
+    parser.add_argument(
+        "--quick", action="store_true", help="Smallest parametrization only"
+    )
+    args = parser.parse_args()
+    for name in args.names:
+        if name not in BENCHMARKS:
+            raise ValueError(f"Possible benchmarks: {BENCHMARKS}")
+
+    report = run(args.names or BENCHMARKS, args.quick)
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(report, file, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+    if args.baseline:
+        with open(args.baseline) as file:
+            compare(report, json.load(file))
@@ -0,0 +1,76 @@
+import numpy as np
+from time import perf_counter_ns
+
+from src.Agent import Agent
+from src.Position import Position
+from src.Scheduler import TurnScheduler
+from src.Universe import Universe
+
+PARAMETERS = [
+    {"height": 100, "width": 100, "population_count": 100},
+    {"height": 1000, "width": 1000, "population_count": 10000},
+]
+DIRECTIONS = [Position(1, 0), Position(-1, 0), Position(0, -1), Position(0, 1)]
+
+
+def populate(
+    universe: Universe, count: int, rng: np.random.Generator, scheduler=None
+) -> list:
+    # Agents not started, on cells spread on even coordinates
+    cells = rng.choice(
+        (universe.height // 2) * (universe.width // 2), size=count, replace=False
+    )
+    return [
+        Agent(
+            universe=universe,
+            initial_position=Position(
+                y=int(2 * (c // (universe.width // 2))),
+                x=int(2 * (c % (universe.width // 2))),
+            ),
+            generation=0,
+            parents=[None],
+            rng=rng.spawn(1)[0],
+            scheduler=scheduler,
+        )
+        for c in cells
+    ]
+
+
+def run(height: int = 1000, width: int = 1000, population_count: int = 10000) -> dict:
+    rng = np.random.default_rng(0)
+    results = {}
+
+    # Moves back and forth, half of them toward a free cell
+    universe = Universe(height=height, width=width)
+    agents = populate(universe, population_count, rng)
+    start = perf_counter_ns()
+    for direction in DIRECTIONS:
+        for agent in agents:
+            agent.move(direction)
+    results["move"] = (perf_counter_ns() - start) / (4 * population_count)
+
+    # Eats toward empty and occupied cells
+    start = perf_counter_ns()
+    for direction in DIRECTIONS:
+        for agent in agents:
+            agent.eat(direction)
+    results["eat"] = (perf_counter_ns() - start) / (4 * population_count)
+
+    # Births in the free surrounding cells, children threads waiting for a turn
+    # never given
+    universe = Universe(height=height, width=width)
+    scheduler = TurnScheduler(universe)
+    agents = populate(universe, population_count, rng, scheduler)
+    start = perf_counter_ns()
+    for agent in agents:
+        agent.energy = agent.phenome.energy_capacity
+        agent.reproduce()
+    results["reproduce"] = (perf_counter_ns() - start) / population_count
+    universe.freeze.set()
+    scheduler.release()
+    return results
+
+
+if __name__ == "__main__":
+    for name, duration in run().items():
+        print(f"{name:<24}: {duration:>12.0f} ns per action")
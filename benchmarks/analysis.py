@@ -0,0 +1,53 @@
+from time import perf_counter_ns
+
+from src.Lab import Lab
+
+# Populations thrive, runs are kept to a couple hundred ticks
+PARAMETERS = [
+    {"height": 100, "width": 100, "population_count": 1000, "duration": 2},
+    {"height": 500, "width": 500, "population_count": 20000, "duration": 1},
+]
+
+
+def run(
+    height: int = 500,
+    width: int = 500,
+    population_count: int = 20000,
+    duration=1,
+    tick_duration: float = 1e-2,
+) -> dict:
+    # Analysis of a seeded vectorized run, its logs being the same across commits
+    lab = Lab()
+    simulation = lab.experiment(
+        height,
+        width,
+        population_count,
+        max_total_duration=duration + 10,
+        max_simulation_duration=duration,
+        verbose=False,
+        engine="vectorized",
+        seed=0,
+        deterministic=True,
+        tick_duration=tick_duration,
+    )
+    results = {}
+    for name, analysis in (
+        ("get_statistics", lambda: lab.get_statistics(simulation, verbose=False)),
+        ("get_temporal_data", lambda: lab.get_temporal_data(simulation)),
+        (
+            "get_temporal_data_by_generation",
+            lambda: lab.get_temporal_data(simulation, by="generation"),
+        ),
+        ("get_spatial_data", lambda: lab.get_spatial_data(simulation)),
+        ("get_timeline", lambda: lab.get_timeline(simulation)),
+        ("get_agents_data", lambda: lab.get_agents_data(simulation)),
+    ):
+        start = perf_counter_ns()
+        analysis()
+        results[name] = perf_counter_ns() - start
+    return results
+
+
+if __name__ == "__main__":
+    for name, duration in run().items():
+        print(f"{name:<32}: {duration / 1e6:>12.3f} ms")
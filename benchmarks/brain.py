@@ -0,0 +1,30 @@
+import numpy as np
+from time import perf_counter_ns
+
+from src.Brain import Brain, BrainBatch
+
+PARAMETERS = [{"n": 1000}, {"n": 100000}]
+
+
+def run(n: int = 100000) -> dict:
+    rng = np.random.default_rng(0)
+    brains = [Brain(rng=rng) for _ in range(min(n, 1000))]
+    area = np.full((7, 7), -1, dtype=np.int32)
+
+    # One decision per call, as agents threads do
+    start = perf_counter_ns()
+    for i in range(n):
+        brains[i % len(brains)](area)
+    results = {"call": (perf_counter_ns() - start) / n}
+
+    # Decisions of the whole population at once, as the vectorized engine does
+    batch = BrainBatch.from_brains([brains[i % len(brains)] for i in range(n)], rng)
+    start = perf_counter_ns()
+    batch()
+    results["batch_call"] = (perf_counter_ns() - start) / n
+    return results
+
+
+if __name__ == "__main__":
+    for name, duration in run().items():
+        print(f"{name:<24}: {duration:>12.0f} ns per decision")
@@ -0,0 +1,57 @@
+import numpy as np
+from time import perf_counter_ns
+
+from src.ActionLog import SPAWN
+from src.Lab import Lab, Engines
+
+PARAMETERS = [
+    {"height": 50, "width": 50, "population_count": 100, "duration": 2},
+    {
+        "height": 500,
+        "width": 500,
+        "population_count": 10000,
+        "duration": 5,
+        "engines": ["threaded", "vectorized", "multiprocess"],
+    },
+]
+
+
+def run(
+    height: int = 500,
+    width: int = 500,
+    population_count: int = 10000,
+    duration=5,
+    engines: list = None,
+) -> dict:
+    # Actions per second of the whole run phase, for each engine. The pooled
+    # engine runs in simulated time, its throughput is the one of the run.
+    results = {}
+    for engine in [Engines(e) for e in engines] if engines else Engines:
+        start = perf_counter_ns()
+        simulation = Lab().experiment(
+            height,
+            width,
+            population_count,
+            max_total_duration=duration + 10,
+            max_simulation_duration=duration,
+            verbose=False,
+            engine=engine.value,
+            seed=0,
+        )
+        results[f"{engine.value}_total"] = perf_counter_ns() - start
+        timings = simulation["timings"]
+        codes = simulation["universe"].action_log.to_array()["code"]
+        running = (
+            results[f"{engine.value}_total"] / 1e9
+            if engine == Engines.pooled
+            else (timings["run"] - timings["start_initial_population"]) / 1e9
+        )
+        results[f"{engine.value}_actions_per_second"] = (
+            int(np.count_nonzero(codes < SPAWN)) / running
+        )
+    return results
+
+
+if __name__ == "__main__":
+    for name, value in run().items():
+        print(f"{name:<32}: {value:>16.0f}")
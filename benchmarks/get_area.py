@@ -0,0 +1,87 @@
+import numpy as np
+from time import perf_counter_ns
+
+from src.Universe import Universe
+from src.Position import Position
+
+PARAMETERS = [
+    {"height": 100, "width": 100, "scope": 3},
+    {"height": 1000, "width": 1000, "scope": 3},
+    {"height": 1000, "width": 1000, "scope": 10},
+]
+
+
+def concatenate_area(universe: Universe, pos: Position, scope: int) -> np.array:
+    # Former Universe.get_area, concatenating whole rows and columns of the space
+    area = np.full(shape=(2 * scope + 1, 2 * scope + 1), fill_value=None, dtype=object)
+    area = universe.space
+
+    top_overflow = 0
+    if pos.y - scope < 0:
+        top_overflow = scope - pos.y
+        bot = area[universe.height - top_overflow : universe.height, :]
+        area = np.concatenate((bot, area), axis=0)
+    elif pos.y + scope >= universe.height:
+        bot_overflow = pos.y + scope + 1 - universe.height
+        top = area[0:bot_overflow, :]
+        area = np.concatenate((area, top), axis=0)
+
+    left_overflow = 0
+    if pos.x - scope < 0:
+        left_overflow = scope - pos.x
+        right = area[:, universe.width - left_overflow : universe.width]
+        area = np.concatenate((right, area), axis=1)
+    elif pos.x + scope >= universe.width:
+        right_overflow = pos.x + scope + 1 - universe.width
+        left = area[:, 0:right_overflow]
+        area = np.concatenate((area, left), axis=1)
+
+    return area[
+        pos.y - scope + top_overflow : pos.y + scope + 1 + top_overflow,
+        pos.x - scope + left_overflow : pos.x + scope + 1 + left_overflow,
+    ]
+
+
+def run(height: int = 1000, width: int = 1000, scope: int = 3, n: int = 1000) -> dict:
+    rng = np.random.default_rng(0)
+    universe = Universe(height=height, width=width)
+    universe.space[:] = rng.integers(-1, 100, size=(height, width))
+
+    # Interior positions and positions close to the borders
+    positions = {
+        "interior": [
+            Position(y=int(y), x=int(x))
+            for y, x in rng.integers(scope, min(height, width) - scope, size=(n, 2))
+        ],
+        "border": [
+            Position(y=int(y), x=int(x)) for y, x in rng.integers(0, scope, size=(n, 2))
+        ],
+    }
+
+    results = {}
+    for name, batch in positions.items():
+        for pos in batch:
+            assert np.array_equal(
+                concatenate_area(universe, pos, scope), universe.get_area(pos, scope)
+            )
+        for method, get_area in (
+            ("concatenate", lambda pos: concatenate_area(universe, pos, scope)),
+            ("get_area", lambda pos: universe.get_area(pos, scope)),
+        ):
+            start = perf_counter_ns()
+            for pos in batch:
+                get_area(pos)
+            results[f"{name}_{method}"] = (perf_counter_ns() - start) / n
+
+        ys = np.array([pos.y for pos in batch])
+        xs = np.array([pos.x for pos in batch])
+        start = perf_counter_ns()
+        universe.get_areas(ys, xs, scope)
+        results[f"{name}_get_areas"] = (perf_counter_ns() - start) / n
+
+    return results
+
+
+if __name__ == "__main__":
+    for name, duration in run().items():
+        print(f"{name:<24}: {duration:>12.0f} ns per area")
@@ -0,0 +1,20 @@
+from time import perf_counter_ns
+
+from src.Universe import Universe, LockStrategies
+
+PARAMETERS = [{"height": 100, "width": 100}, {"height": 1000, "width": 1000}]
+
+
+def run(height: int = 1000, width: int = 1000, n: int = 20) -> dict:
+    results = {}
+    for strategy in LockStrategies:
+        start = perf_counter_ns()
+        for _ in range(n):
+            Universe(height=height, width=width, lock_strategy=strategy.value)
+        results[f"construction_{strategy.value}"] = (perf_counter_ns() - start) / n
+    return results
+
+
+if __name__ == "__main__":
+    for name, duration in run().items():
+        print(f"{name:<24}: {duration:>12.0f} ns per universe")
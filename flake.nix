@@ -41,6 +41,7 @@
                       tifffile
                       pyvis
                       imageio  # GIF rendering
+                      pyarrow  # Parquet sinks
                       godot_4
                     ])))
                     libsForQt5.qt5.qtwayland
@@ -1,10 +1,16 @@
 extends Control
 
-var header
-var timeline
-var agents
-var timestamps
-var positions
+# Binary layout written by Lab.export, little endian
+const HEADER_SIZE = 16
+const INDEX_ENTRY_SIZE = 24
+const FRAME_RECORD_SIZE = 12
+const ACTION_RECORD_SIZE = 16
+const AGENT_RECORD_SIZE = 12
+
+var meta
+var agents_file
+var frames_file
+var actions_file
 
 
 func _on_pick_csv_button_pressed():
@@ -12,29 +18,38 @@ func _on_pick_csv_button_pressed():
 
 
 func _on_csv_file_dialog_dir_selected(dir):
-	read_timeline(dir.path_join("timeline.json"))
-	read_timestamp(dir.path_join("timestamps.json"))
-	read_positions(dir.path_join("positions.json"))
-	load_agents_data(dir.path_join("agents_data.json"))
+	meta = JSON.parse_string(FileAccess.get_file_as_string(dir.path_join("meta.json")))
+	agents_file = FileAccess.open(dir.path_join("agents.bin"), FileAccess.READ)
+	frames_file = FileAccess.open(dir.path_join("frames.bin"), FileAccess.READ)
+	actions_file = FileAccess.open(dir.path_join("actions.bin"), FileAccess.READ)
+	%Timeline.max_value = meta["frames_count"] - 1
+	%CurrentActions.columns = 4  # id, decision, time, success
+
+
+func read_index(file, frame):
+	# Time, first record and records count of a frame
+	file.seek(HEADER_SIZE + frame * INDEX_ENTRY_SIZE)
+	var time = file.get_64()
+	var offset = file.get_64()
+	var count = file.get_32()
+	return [time, offset, count]
 
 
-func read_timeline(path):
-	var temp = FileAccess.get_file_as_string(path)
-	timeline = JSON.parse_string(temp)
-	%Timeline.max_value = timeline.size() - 1
-	%CurrentActions.columns = timeline[0][0].size()
+func seek_records(file, frame, record_size):
+	# Moves to the first record of the frame, returns its index entry
+	var index = read_index(file, frame)
+	var records_start = HEADER_SIZE + meta["frames_count"] * INDEX_ENTRY_SIZE
+	file.seek(records_start + index[1] * record_size)
+	return index
 
-func load_agents_data(path):
-	var temp = FileAccess.get_file_as_string(path)
-	agents = JSON.parse_string(temp)
 
-func read_timestamp(path):
-	var temp = FileAccess.get_file_as_string(path)
-	timestamps = JSON.parse_string(temp)
+func get_color(id):
+	agents_file.seek(id * AGENT_RECORD_SIZE + 8)
+	var r = agents_file.get_8()
+	var g = agents_file.get_8()
+	var b = agents_file.get_8()
+	return Color8(r, g, b)
 
-func read_positions(path):
-	var temp = FileAccess.get_file_as_string(path)
-	positions = JSON.parse_string(temp)
 
 func _on_timeline_value_changed(value):
 	# Actions & timestamps
@@ -44,37 +59,43 @@ func _on_timeline_value_changed(value):
 			%CurrentActions.remove_child(n)
 			n.queue_free()
 
-	%Timestamps.text = str(timestamps[value]) + " <= time < " + str(timestamps[value+1])
-	for action in timeline[value]:
-		for k_attr in action:
+	var next_time = "END"
+	if value + 1 < meta["frames_count"]:
+		next_time = str(read_index(actions_file, value + 1)[0])
+	var index = seek_records(actions_file, value, ACTION_RECORD_SIZE)
+	%Timestamps.text = str(index[0]) + " <= time < " + next_time
+	var records = []
+	for i in index[2]:
+		var id = actions_file.get_32()
+		var code = actions_file.get_8()
+		var success = actions_file.get_8() == 1
+		actions_file.get_16()  # Padding
+		var time = actions_file.get_64()
+		records.append([id, meta["action_names"][code], time, success])
+	for record in records:
+		var color = get_color(record[0])
+		for attribute in record:
 			var action_attribute = Label.new()
-			action_attribute.text = str(action[k_attr])
+			action_attribute.text = str(attribute)
 			action_attribute.add_theme_font_size_override("font_size", 22)
-			var color = agents[str(action["id"])]["color"]
-			action_attribute.modulate = Color(color[0]/255, color[1]/255, color[2]/255)
+			action_attribute.modulate = color
 			%CurrentActions.add_child(action_attribute)
-	
+
 	# Map
 	var population = %Map/Population.get_children()
 	if population:
 		for n in population:
 			%Map/Population.remove_child(n)
 			n.queue_free()
-	
-	for id in positions[value]:
-		var pos = positions[value][id]
-		var color = agents[id]["color"]
-		
+
+	index = seek_records(frames_file, value, FRAME_RECORD_SIZE)
+	var agents = []
+	for i in index[2]:
+		agents.append([frames_file.get_32(), frames_file.get_32(), frames_file.get_32()])
+	for agent in agents:
 		const AGENT = preload("res://agent.tscn")
 		var new_agent = AGENT.instantiate()
-		new_agent.position = Vector2(pos[1], pos[0]) * 40
-		new_agent.modulate = Color(color[0]/255, color[1]/255, color[2]/255)
-		new_agent.get_child(-1).text = id
+		new_agent.position = Vector2(agent[2], agent[1]) * 40
+		new_agent.modulate = get_color(agent[0])
+		new_agent.get_child(-1).text = str(agent[0])
 		%Map/Population.add_child(new_agent)
-
-
-
-
-
-
-
@@ -0,0 +1,177 @@
+import numpy as np
+import pandas as pd
+
+from .Brain import ABILITIES
+
+# Abilities are encoded by their declaration order
+CODES = {ability: code for code, ability in enumerate(ABILITIES)}
+# Lifecycle events share the action codes space
+SPAWN, START, DIE = len(ABILITIES), len(ABILITIES) + 1, len(ABILITIES) + 2
+ACTION_NAMES = [a.value for a in ABILITIES] + ["spawn", "start", "die"]
+
+# Reaction and decision times are -1 for lifecycle events
+ACTION_DTYPE = np.dtype(
+    [
+        ("id", np.int64),
+        ("code", np.int8),
+        ("time", np.int64),
+        ("success", bool),
+        ("reaction_time", np.int64),
+        ("decision_time", np.int64),
+    ]
+)
+MOVE_DTYPE = np.dtype(
+    [("id", np.int64), ("time", np.int64), ("y", np.int32), ("x", np.int32)]
+)
+# Chunk size of the streamed logs of agents, bounding the rows each one holds
+STREAM_CHUNK_SIZE = 256
+
+
+def actions_dataframe(array: np.ndarray) -> pd.DataFrame:
+    # Frame over the columns of an actions array, decisions named
+    return pd.DataFrame(
+        {
+            "id": array["id"],
+            "decision": pd.Categorical.from_codes(array["code"], ACTION_NAMES),
+            "action_time": array["time"],
+            "action_success": array["success"],
+            "reaction_time": array["reaction_time"],
+            "decision_time": array["decision_time"],
+        },
+        copy=False,
+    )
+
+
+class ActionLog:
+    """
+    Append-only log of actions, stored in chunks of preallocated typed arrays.
+    A log is written by a single thread: threaded agents own theirs, engines
+    own one for the population. Logs are merged by time once the run is over.
+    Given on_flush, full chunks are handed to it instead of being kept, and
+    keep their initial size: rows do not wait in an ever larger buffer.
+    """
+
+    dtype: np.dtype = ACTION_DTYPE
+
+    def __init__(
+        self, chunk_size: int = 16, max_chunk_size: int = 2**16, on_flush=None
+    ):
+        self.chunk_size = chunk_size
+        self.max_chunk_size = max_chunk_size
+        self.on_flush = on_flush
+        self.flushed: int = 0  # Rows handed to on_flush
+        self.chunks: list = []  # Full chunks
+        self.buffer: np.ndarray = np.empty(chunk_size, dtype=self.dtype)
+        self.index: int = 0  # Used rows of the buffer
+
+    @classmethod
+    def from_array(cls, array: np.ndarray):
+        # Log over an existing array, without copy
+        log = cls()
+        log.buffer, log.index = array, len(array)
+        return log
+
+    def _flush(self) -> None:
+        # Kept chunks grow geometrically, small logs staying small
+        if self.on_flush is not None:
+            self.on_flush(self.buffer[: self.index])
+            self.flushed += self.index
+            size = self.chunk_size
+        else:
+            self.chunks.append(self.buffer)
+            size = min(2 * len(self.buffer), self.max_chunk_size)
+        self.buffer = np.empty(max(size, 1), dtype=self.dtype)
+        self.index = 0
+
+    def flush(self) -> None:
+        # Hands the rows still buffered to on_flush
+        if self.on_flush is not None and self.index:
+            self._flush()
+
+    def append(self, *values) -> None:
+        # One row, values in the order of the dtype fields
+        if self.index == len(self.buffer):
+            self._flush()
+        self.buffer[self.index] = values
+        self.index += 1
+
+    def extend(self, *columns) -> None:
+        # Batch of rows, one column per dtype field, scalars being broadcasted
+        n = len(columns[0])
+        columns = {
+            name: np.broadcast_to(column, n)
+            for name, column in zip(self.dtype.names, columns)
+        }
+        written = 0
+        while written < n:
+            if self.index == len(self.buffer):
+                self._flush()
+            k = min(n - written, len(self.buffer) - self.index)
+            for name, column in columns.items():
+                self.buffer[name][self.index : self.index + k] = column[
+                    written : written + k
+                ]
+            self.index += k
+            written += k
+
+    def to_array(self) -> np.ndarray:
+        # Structured array of the rows kept. Chunks are consolidated on the first
+        # call, the following ones return views.
+        if self.chunks:
+            array = np.concatenate(self.chunks + [self.buffer[: self.index]])
+            self.chunks = []
+            self.buffer, self.index = array, len(array)
+        return self.buffer[: self.index]
+
+    def rows(self, start: int = 0) -> np.ndarray:
+        # Copy of the rows kept from start on, only the chunks holding them
+        # being read and left as they are
+        arrays, offset = [], 0
+        for chunk in self.chunks + [self.buffer[: self.index]]:
+            if offset + len(chunk) > start:
+                arrays.append(chunk[max(start - offset, 0) :])
+            offset += len(chunk)
+        return np.concatenate(arrays) if arrays else np.empty(0, dtype=self.dtype)
+
+    def to_dataframe(self) -> pd.DataFrame:
+        return actions_dataframe(self.to_array())
+
+    @classmethod
+    def merge(cls, logs: list):
+        # Logs are each sorted by time: the stable sort of their concatenation
+        # merges the sorted runs, O(n log k) for k logs
+        arrays = [log.to_array() for log in logs]
+        if not arrays:
+            return cls()
+        merged = np.concatenate(arrays)
+        return cls.from_array(merged[np.argsort(merged["time"], kind="stable")])
+
+    def split(self) -> dict:
+        # Per agent logs, views over the log sorted by agent
+        array = self.to_array()
+        array = array[np.argsort(array["id"], kind="stable")]
+        ids, starts = np.unique(array["id"], return_index=True)
+        bounds = np.append(starts, len(array))
+        return {
+            int(id): self.from_array(array[start:stop])
+            for id, start, stop in zip(ids, bounds[:-1], bounds[1:])
+        }
+
+    def __len__(self):
+        return self.flushed + sum(len(c) for c in self.chunks) + self.index
+
+    @property
+    def nbytes(self) -> int:
+        return sum(c.nbytes for c in self.chunks) + self.buffer.nbytes
+
+
+class MoveLog(ActionLog):
+    """
+    Log of the positions taken by agents: spawns and successful moves
+    """
+
+    dtype: np.dtype = MOVE_DTYPE
+
+    def to_dataframe(self) -> pd.DataFrame:
+        array = self.to_array()
+        return pd.DataFrame({name: array[name] for name in self.dtype.names})
@@ -1,13 +1,27 @@
 import threading
 import numpy as np
-from random import randint, choice
-from time import sleep, perf_counter_ns
-import statistics
+from time import perf_counter_ns
 
-from .Brain import Abilities
+from .ActionLog import ActionLog, MoveLog, CODES, SPAWN, START, DIE, STREAM_CHUNK_SIZE
+from .Brain import Abilities, Brain
 from .Phenome import Phenome
 from .Universe import Universe
 from .Position import Position
+from .Sink import broadcast
+from .Snapshot import rng_to_dict, rng_from_dict
+
+
+def describe_durations(durations, name: str) -> dict:
+    # Summary of a series of durations, None when not defined
+    durations = np.asarray(durations)
+    n = len(durations)
+    return {
+        f"min_{name}_duration": durations.min().item() if n else None,
+        f"max_{name}_duration": durations.max().item() if n else None,
+        f"mean_{name}_duration": durations.mean().item() if n else None,
+        f"median_{name}_duration": np.median(durations).item() if n else None,
+        f"std_{name}_duration": durations.std(ddof=1).item() if n > 1 else None,
+    }
 
 
 class Agent(threading.Thread):  # TODO make this ABC
@@ -22,6 +36,9 @@ class Agent(threading.Thread):  # TODO make this ABC
         start_date: int = None,
         start_on_birth: bool = False,
         start_barrier: threading.Barrier = None,
+        rng: np.random.Generator = None,
+        scheduler=None,
+        sinks: list = None,
         debug: bool = False,
     ):
         super().__init__()
@@ -29,54 +46,73 @@ class Agent(threading.Thread):  # TODO make this ABC
         self.debug = debug
 
         # Agent properties
+        # Randomness, the agent own stream
+        self.rng = rng if rng is not None else np.random.default_rng()
+
+        # Constants
+        self.initial_phenome = phenome if phenome is not None else Phenome(rng=self.rng)
+        self.generation = generation
+        self.parents = [p.id for p in parents if isinstance(p, Agent)]  # Ids
+
         # Experiment related
-        # Add to population dict
+        # Add to population store and dict
         self.universe = universe
         with universe.population_lock:
-            self.id = len(universe.population)
+            self.id = universe.population_store.append_phenome(
+                self.initial_phenome,
+                generation=generation,
+                parent=self.parents[0] if self.parents else -1,
+                y=initial_position.y,
+                x=initial_position.x,
+            )
             universe.population[self.id] = self
         self.stop = threading.Event()
         self.start_barrier = start_barrier
-
-        # Constants
-        self.initial_phenome = phenome if phenome is not None else Phenome()
-        self.generation = generation
-        self.parents = parents
+        self.scheduler = scheduler  # Deterministic turns instead of threads racing
+        self.sinks = sinks  # Logs are streamed to them instead of being kept
         # Set once
         self.death_date = None
         self.start_date = start_date
 
         # Evolutives
-        self.phenome = self.initial_phenome.copy()
+        self.phenome = self.initial_phenome.copy(rng=self.rng)
         self.energy = energy if energy else self.phenome.energy_capacity
         self.position = initial_position
-        self.path = []  # remove and post-compute with actions
-        self.actions: list = []
-        self.children = []
+        if sinks:  # Streamed in small chunks, rows on disk stay recent
+            self.path = MoveLog(STREAM_CHUNK_SIZE, on_flush=broadcast(sinks, "moves"))
+            self.actions = ActionLog(
+                STREAM_CHUNK_SIZE, on_flush=broadcast(sinks, "actions")
+            )
+        else:
+            self.path = MoveLog()
+            self.actions = ActionLog()
+        self.children = []  # Ids, agents are not pinned by their parent
 
         # Adding to universe
         self.birth_success = True
-        with universe.space_locks[initial_position.tuple]:
+        with universe.get_lock(initial_position):
             self.spawn_date = self.universe.get_time()
-            self.actions.append(
-                {
-                    "id": self.id,
-                    "decision": "spawn",
-                    "action_time": self.spawn_date,
-                    "action_success": True,
-                    # "reaction_time": 0,
-                    # "decision_time": 0,
-                }
-            )
+            self.actions.append(self.id, SPAWN, self.spawn_date, True, -1, -1)
 
             if self.universe.is_valid(initial_position):
                 self.universe[initial_position] = self
-                self.path.append((self.spawn_date, self.position))
-                if start_on_birth:  # Autostart
-                    self.start()
+                if self.universe.metrics is not None:
+                    self.universe.metrics.count("births")
+                self.path.append(
+                    self.id, self.spawn_date, initial_position.y, initial_position.x
+                )
+                self.sync()
+                if start_on_birth:  # Autostart, or handed to a pool scheduler
+                    if self.scheduler is not None and self.scheduler.pooled:
+                        self.scheduler.admit(self)
+                    else:
+                        self.start()
             else:
-                self.die()
                 self.birth_success = False
+                self.die()
+                self.flush()
+                if universe.release_dead:
+                    universe.retire(self)
 
         # Debug
         if self.debug:
@@ -85,79 +121,114 @@ class Agent(threading.Thread):  # TODO make this ABC
     def run(self):
         if self.start_barrier:
             self.start_barrier.wait()
-        self.start_date = self.universe.get_time()
-        self.actions.append(
-            {
-                "id": self.id,
-                "decision": "start",
-                "action_time": self.start_date,
-                "action_success": True,
-                # "reaction_time": 0,
-                # "decision_time": 0,
-            }
+        # Scheduled agents may start running after the time of their birth turn
+        self.begin(
+            self.spawn_date if self.scheduler is not None else self.universe.get_time()
         )
 
-        if self.debug:
-            print(f"Agent {self.id} start running")
-
         # Lifetime
+        profiler = self.universe.profiler  # Phases timed only when profiling
+        marks = None
         while not self.stop.is_set() and not self.universe.freeze.is_set():
-            # Minimal energy loss
-            self.energy -= 3
+            if profiler is not None:
+                marks = [perf_counter_ns()]
+            if self.scheduler is not None and not self.scheduler.wait_turn(self):
+                break
 
             # Reaction time set up to set agents speed dependent of their phenome instead of
             # the CPU core its thread is running on
-            sleep(self.phenome.reaction_time)  # TODO rework
-            reaction_time = self.universe.get_time()
+            if self.scheduler is None:
+                self.universe.clock.sleep(self.phenome.reaction_time)  # TODO rework
+            self.act(marks)
 
-            # Decision making taking into account environment and self
-            decision = self.phenome.brain(
-                self.universe.get_area(self.position, self.phenome.scope)
-            )
-            decision_time = self.universe.get_time()
-
-            # Decision -> Action
-            action_success = False
-            match decision:
-                case Abilities.idle:
-                    action_success, action_time = self.idle()
-                case Abilities.move_bot:
-                    action_success, action_time = self.move(Position(1, 0))
-                case Abilities.move_top:
-                    action_success, action_time = self.move(Position(-1, 0))
-                case Abilities.move_left:
-                    action_success, action_time = self.move(Position(0, -1))
-                case Abilities.move_right:
-                    action_success, action_time = self.move(Position(0, 1))
-                case Abilities.eat_bot:
-                    action_success, action_time = self.eat(Position(1, 0))
-                case Abilities.eat_top:
-                    action_success, action_time = self.eat(Position(-1, 0))
-                case Abilities.eat_left:
-                    action_success, action_time = self.eat(Position(0, -1))
-                case Abilities.eat_right:
-                    action_success, action_time = self.eat(Position(0, 1))
-                case Abilities.reproduce:
-                    action_success, action_time = self.reproduce()
-
-            self.actions.append(
-                {
-                    "id": self.id,
-                    # "reaction_time": reaction_time,
-                    # "decision_time": decision_time,
-                    "decision": decision.value,
-                    "action_time": action_time,
-                    "action_success": action_success,
-                }
+            if self.scheduler is not None:
+                self.scheduler.end_turn()
+        self.finish()
+
+        # Counts of the thread kept, its shards released
+        for counters in (self.universe.metrics, self.universe.profiler):
+            if counters is not None:
+                counters.retire()
+
+    def begin(self, start_date: int) -> None:
+        self.start_date = start_date
+        self.actions.append(self.id, START, self.start_date, True, -1, -1)
+
+        if self.debug:
+            print(f"Agent {self.id} start running")
+
+    def act(self, marks: list = None) -> None:
+        # One iteration of the lifetime, once the reaction time elapsed. When
+        # profiling, marks holds the time the agent started waiting at.
+        # Minimal energy loss
+        self.energy -= 3
+        reaction_time = self.universe.get_time()
+        round_start = perf_counter_ns()
+        if marks is not None:
+            marks.append(round_start)
+
+        # Decision making taking into account environment and self
+        area = self.universe.get_area(self.position, self.phenome.scope)
+        if marks is not None:
+            marks.append(perf_counter_ns())
+        decision = self.phenome.brain(area)
+        decision_time = self.universe.get_time()
+        if marks is not None:
+            marks.append(perf_counter_ns())
+
+        # Decision -> Action
+        action_success = False
+        match decision:
+            case Abilities.idle:
+                action_success, action_time = self.idle()
+            case Abilities.move_bot:
+                action_success, action_time = self.move(Position(1, 0))
+            case Abilities.move_top:
+                action_success, action_time = self.move(Position(-1, 0))
+            case Abilities.move_left:
+                action_success, action_time = self.move(Position(0, -1))
+            case Abilities.move_right:
+                action_success, action_time = self.move(Position(0, 1))
+            case Abilities.eat_bot:
+                action_success, action_time = self.eat(Position(1, 0))
+            case Abilities.eat_top:
+                action_success, action_time = self.eat(Position(-1, 0))
+            case Abilities.eat_left:
+                action_success, action_time = self.eat(Position(0, -1))
+            case Abilities.eat_right:
+                action_success, action_time = self.eat(Position(0, 1))
+            case Abilities.reproduce:
+                action_success, action_time = self.reproduce()
+        if marks is not None:
+            marks.append(perf_counter_ns())
+            self.universe.profiler.observe_round(marks)
+
+        self.actions.append(
+            self.id,
+            CODES[decision],
+            action_time,
+            action_success,
+            reaction_time,
+            decision_time,
+        )
+        if self.universe.metrics is not None:
+            self.universe.metrics.count_action(CODES[decision])
+            self.universe.metrics.observe(
+                "round_duration", perf_counter_ns() - round_start
             )
 
-            # Energy boundings
-            if self.energy < 1:
-                self.die()
-            self.energy = min(self.energy, self.phenome.energy_capacity)
+        # Energy boundings
+        if self.energy < 1:
+            self.die()
+        self.energy = min(self.energy, self.phenome.energy_capacity)
 
+    def finish(self) -> None:
         # Stop the agent for monitoring
         self.stop.set()
+        self.sync()
+        self.flush()
+        if self.universe.release_dead:
+            self.universe.retire(self)
 
     # SIMULATION
     def idle(self) -> tuple[bool, int]:
@@ -171,7 +242,7 @@ class Agent(threading.Thread):  # TODO make this ABC
         self.energy -= 2
         success = False
         new_pos = self.universe.wrap_position(self.position + relative_pos)
-        with self.universe.space_locks[new_pos.tuple]:
+        with self.universe.get_lock(new_pos):
             move_time = self.universe.get_time()
             if self.universe.is_valid(new_pos):
                 success = True
@@ -182,14 +253,14 @@ class Agent(threading.Thread):  # TODO make this ABC
 
                 # Update self attributes
                 self.position = new_pos
-                self.path.append((move_time, new_pos))
+                self.path.append(self.id, move_time, new_pos.y, new_pos.x)
 
         return success, move_time
 
     def eat(self, relative_pos: Position) -> bool:
         success = False
         eat_pos = self.universe.wrap_position(self.position + relative_pos)
-        with self.universe.space_locks[eat_pos.tuple]:
+        with self.universe.get_lock(eat_pos):
             eat_time = self.universe.get_time()
             if (  # Do not compare color
                 isinstance(self.universe[eat_pos], Agent)
@@ -218,18 +289,29 @@ class Agent(threading.Thread):  # TODO make this ABC
 
         # Newborn to life if possible
         if possible_positions:
-            child_pos = choice(possible_positions)
+            child_pos = possible_positions[self.rng.integers(len(possible_positions))]
             if self.universe.is_valid(child_pos):
+                child_rng = self.rng.spawn(1)[0]
+                mutation = self.universe.mutation
                 child = Agent(
                     universe=self.universe,
                     initial_position=child_pos,
                     generation=self.generation + 1,
-                    phenome=self.initial_phenome.copy(),  # TODO Use phenome.mutate()
+                    phenome=(
+                        self.initial_phenome.mutate(
+                            mutation, child_rng, self.universe.max_scope
+                        )
+                        if mutation is not None
+                        else self.initial_phenome.copy(rng=child_rng)
+                    ),
                     energy=self.energy // 2,
                     start_on_birth=True,
                     parents=[self],
+                    rng=child_rng,
+                    scheduler=self.scheduler,
+                    sinks=self.sinks,
                 )
-                self.children.append(child)
+                self.children.append(child.id)
                 birth_success = child.birth_success
 
         return birth_success, reproduction_time
@@ -237,120 +319,120 @@ class Agent(threading.Thread):  # TODO make this ABC
     def die(self):
         self.stop.set()
         self.death_date = self.universe.get_time()
-        self.universe[self.position] = None  # Remove itself from universe
-        self.actions.append(
-            {
-                "id": self.id,
-                "decision": "die",
-                "action_time": self.death_date,
-                "action_success": True,
-                # "reaction_time": 0,
-                # "decision_time": 0,
-            }
-        )
+        if self.universe.space[self.position.tuple] == self.id:
+            self.universe[self.position] = None  # Remove itself from universe
+        self.actions.append(self.id, DIE, self.death_date, True, -1, -1)
+        if self.birth_success and self.universe.metrics is not None:
+            self.universe.metrics.count("deaths")
 
         if self.debug:
             print(f"Agent {self.id} died")
+        self.sync()
 
     # UTILITIES
-    def copy(self):
-        # TODO
-        pass
-
-    # DATA
-    def get_data(self) -> dict:
-        # Attributes and lifespan
-        data = {
-            "id": self.id,
-            "generation": self.generation,
-            "parents_count": 1 if self.parents is None else len(self.parents),
-            "dead": False if self.death_date is None else True,
-            "lifespan": self.universe.culmination - self.spawn_date
-            if self.death_date is None
-            else self.death_date - self.spawn_date,
-            "children_count": len(self.children),
-            "birth_success": self.birth_success,
-            "travelled_distance": max(len(self.path) - 1, 0),
+    def get_state(self) -> dict:
+        # What the population store does not hold exactly, for snapshots
+        return {
+            "rng": rng_to_dict(self.rng),
+            "energy": self.energy,
+            "initial_weights": self.initial_phenome.brain.weights,
+            "weights": self.phenome.brain.weights,
         }
 
-        # Activity track TODO def func
-        data["actions_count"] = len(self.actions)
-
-        decision_durations = [
-            b - a
-            for b, a in zip(
-                self.actions["decision_time"], self.actions["reaction_time"]
-            )
-        ]
-        data["min_decision_duration"] = (
-            None if len(decision_durations) < 1 else min(decision_durations)
-        )
-        data["max_decision_duration"] = (
-            None if len(decision_durations) < 1 else max(decision_durations)
-        )
-        data["mean_decision_duration"] = (
-            None if len(decision_durations) < 1 else statistics.mean(decision_durations)
-        )
-        data["median_decision_duration"] = (
-            None
-            if len(decision_durations) < 1
-            else statistics.median(decision_durations)
-        )
-        data["std_decision_duration"] = (
-            None
-            if len(decision_durations) < 2
-            else statistics.stdev(decision_durations)
+    @classmethod
+    def restore(
+        cls,
+        universe: Universe,
+        id: int,
+        state: dict,
+        actions: ActionLog = None,
+        path: MoveLog = None,
+        scheduler=None,
+        sinks: list = None,
+    ):
+        # Living agent of a snapshot, from its population store row, state and
+        # logs. Children ids are set by the caller.
+        view = universe.population_store[id]
+        agent = cls.__new__(cls)
+        threading.Thread.__init__(agent)
+        agent.daemon = True
+        agent.debug = False
+        agent.rng = rng_from_dict(state["rng"])
+        agent.initial_phenome = view.phenome
+        agent.initial_phenome.brain = Brain.from_weights(state["initial_weights"])
+        agent.generation = view.generation
+        agent.parents = [view.parent] if view.parent >= 0 else []
+        agent.universe = universe
+        agent.id = id
+        agent.stop = threading.Event()
+        agent.start_barrier = None
+        agent.scheduler = scheduler
+        agent.sinks = sinks
+        agent.death_date = None
+        agent.start_date = view.start_date
+        agent.phenome = agent.initial_phenome.copy(rng=agent.rng)
+        agent.phenome.brain = Brain.from_weights(state["weights"], rng=agent.rng)
+        agent.energy = state["energy"]
+        agent.position = view.position
+        chunk_size = STREAM_CHUNK_SIZE if sinks else 16
+        agent.path = path if path is not None else MoveLog(chunk_size)
+        agent.actions = actions if actions is not None else ActionLog(chunk_size)
+        if sinks:  # Rows already streamed still count
+            agent.path.on_flush = broadcast(sinks, "moves")
+            agent.actions.on_flush = broadcast(sinks, "actions")
+            agent.path.flushed = view.travelled_distance + 1 - len(agent.path)
+            agent.actions.flushed = view.actions_count - len(agent.actions)
+        agent.children = []
+        agent.birth_success = True
+        agent.spawn_date = view.spawn_date
+        with universe.population_lock:
+            universe.population[id] = agent
+        return agent
+
+    def sync(self) -> None:
+        # Write the evolutive state to the population store
+        self.universe.population_store.update(
+            self.id,
+            energy=self.energy,
+            y=self.position.y,
+            x=self.position.x,
+            spawn_date=self.spawn_date,
+            start_date=-1 if self.start_date is None else self.start_date,
+            death_date=-1 if self.death_date is None else self.death_date,
+            birth_success=self.birth_success,
+            children_count=len(self.children),
+            travelled_distance=max(len(self.path) - 1, 0),
+            actions_count=len(self.actions),
         )
 
-        action_durations = [
-            b - a
-            for b, a in zip(self.actions["action_time"], self.actions["decision_time"])
-        ]
-        data["min_action_duration"] = (
-            None if len(action_durations) < 1 else min(action_durations)
-        )
-        data["max_action_duration"] = (
-            None if len(action_durations) < 1 else max(action_durations)
-        )
-        data["mean_action_duration"] = (
-            None if len(action_durations) < 1 else statistics.mean(action_durations)
-        )
-        data["median_action_duration"] = (
-            None if len(action_durations) < 1 else statistics.median(action_durations)
-        )
-        data["std_action_duration"] = (
-            None if len(action_durations) < 2 else statistics.stdev(action_durations)
-        )
+    def flush(self) -> None:
+        # Streams the logs still buffered
+        self.actions.flush()
+        self.path.flush()
 
-        # Meta-data
-        round_timers = [a for a in self.actions["action_time"]]
-        round_durations = [
-            round_timers[i + 1] - round_timers[i] for i in range(len(round_timers) - 1)
-        ]
-        data["min_round_duration"] = (
-            None if len(round_durations) < 1 else min(round_durations)
-        )
-        data["max_round_duration"] = (
-            None if len(round_durations) < 1 else max(round_durations)
-        )
-        data["mean_round_duration"] = (
-            None if len(round_durations) < 1 else statistics.mean(round_durations)
-        )
-        data["median_round_duration"] = (
-            None if len(round_durations) < 1 else statistics.median(round_durations)
+    # DATA
+    def get_activity_data(self) -> dict:
+        # Durations between the timestamps of the actions
+        data = {"id": self.id}
+        actions = self.actions.to_array()
+        timed = actions[actions["reaction_time"] >= 0]
+        data.update(
+            describe_durations(
+                timed["decision_time"] - timed["reaction_time"], "decision"
+            )
         )
-        data["std_round_duration"] = (
-            None if len(round_durations) < 2 else statistics.stdev(round_durations)
+        data.update(
+            describe_durations(timed["time"] - timed["decision_time"], "action")
         )
-
+        data.update(describe_durations(np.diff(actions["time"]), "round"))
         return data
 
     # VISUALIZATION
     @property
     def array_path(self):  # TODO rework
         array_path = np.zeros((self.universe.height, self.universe.width))
-        for step in self.path:
-            array_path[step.tuple] = 255
+        path = self.path.to_array()
+        array_path[path["y"], path["x"]] = 255
         return array_path
 
     # REPRESENTATION
@@ -372,10 +454,10 @@ class Agent(threading.Thread):  # TODO make this ABC
         data = {
             "id": self.id,
             "generation": self.generation,
-            "parents": [p.id for p in self.parents if isinstance(p, Agent)],
+            "parents": list(self.parents),
             "start_date": self.start_date,
             "death_date": self.death_date,
-            "children": [c.id for c in self.children],
+            "children": list(self.children),
             "birth_success": self.birth_success,
         }
         data.update(self.phenome.to_dict())
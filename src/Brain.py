@@ -1,5 +1,10 @@
-from random import random, choices
+import numpy as np
+from bisect import bisect_right
 from enum import Enum
+from itertools import accumulate
+
+# Stream used by brains created without their own
+default_rng = np.random.default_rng()
 
 
 class Abilities(
@@ -17,18 +22,69 @@ class Abilities(
     eat_right = "eat_right"
 
 
+ABILITIES = list(Abilities)
+
+
 class Brain:
-    def __init__(self, weights=None) -> None:
-        weights = weights if weights else [random() for _ in range(len(Abilities))]
+    def __init__(self, weights=None, rng: np.random.Generator = None) -> None:
+        self.rng = rng if rng is not None else default_rng
+        weights = (
+            weights if weights is not None else self.rng.random(len(Abilities)).tolist()
+        )
         self.weights = [w / sum(weights) for w in weights]
+        self.cumulated_weights = list(accumulate(self.weights))
 
     def __call__(self, inputs: list):
-        action = choices([pa for pa in Abilities], self.weights)
-        return action[0]
+        draw = self.rng.random() * self.cumulated_weights[-1]
+        action = min(bisect_right(self.cumulated_weights, draw), len(Abilities) - 1)
+        return ABILITIES[action]
+
+    @classmethod
+    def from_weights(cls, weights: list, rng: np.random.Generator = None):
+        # Weights already normalized are kept as they are, restores are exact
+        brain = cls.__new__(cls)
+        brain.rng = rng if rng is not None else default_rng
+        brain.weights = list(weights)
+        brain.cumulated_weights = list(accumulate(brain.weights))
+        return brain
+
+    def copy(self, rng: np.random.Generator = None):
+        return Brain(weights=self.weights, rng=rng)
+
+    def mutate(self, mutation, rng: np.random.Generator = None):
+        # Copy with mutated weights only, see Mutation
+        rng = rng if rng is not None else self.rng
+        genome = {"weights": np.array([self.weights])}
+        weights = mutation.mutate(genome, rng)["weights"][0]
+        return Brain(weights=weights.tolist(), rng=rng)
+
+
+class BrainBatch:
+    """
+    Brains of a whole population, one row of weights per agent.
+    Decisions are sampled at once and returned as abilities codes.
+    """
+
+    def __init__(self, weights: np.ndarray, rng: np.random.Generator = None) -> None:
+        self.rng = rng if rng is not None else default_rng
+        self.weights = np.asarray(weights)
+        assert self.weights.ndim == 2 and self.weights.shape[1] == len(Abilities)
+
+    @classmethod
+    def from_brains(cls, brains: list[Brain], rng: np.random.Generator = None):
+        return cls(np.array([b.weights for b in brains]), rng=rng)
+
+    def scores(self, inputs: np.ndarray = None) -> np.ndarray:
+        # (N, len(Abilities)) unnormalized probabilities. Input dependent brains
+        # override this, inputs being the (N, 2 * scope + 1, 2 * scope + 1)
+        # perception windows of Universe.get_areas.
+        return self.weights
 
-    def copy(self):
-        return Brain(weights=self.weights)
+    def __call__(self, inputs: np.ndarray = None) -> np.ndarray:
+        assert inputs is None or len(inputs) == len(self)
+        cumulated = np.cumsum(self.scores(inputs), axis=1)
+        draws = self.rng.random(len(self)) * cumulated[:, -1]
+        return np.minimum((draws[:, None] >= cumulated).sum(axis=1), len(Abilities) - 1)
 
-    def mutate(self):  # TODO mutation rate and strength?
-        # TODO use copy?
-        pass
+    def __len__(self):
+        return len(self.weights)
@@ -0,0 +1,64 @@
+from enum import Enum
+from time import sleep, perf_counter_ns
+
+
+class Clocks(Enum):
+    wall = "wall"  # Nanoseconds elapsed since genesis
+    virtual = "virtual"  # Simulated time, jumping from an event to the next one
+    scaled = "scaled"  # Wall clock time running faster or slower by a factor
+
+
+class WallClock:
+    """
+    Time elapsed since the genesis of the universe
+    """
+
+    def __init__(self, genesis: int = None):
+        self.genesis: int = genesis if genesis is not None else perf_counter_ns()
+
+    def now(self) -> int:
+        return perf_counter_ns() - self.genesis
+
+    def sleep(self, duration: float) -> None:
+        # Waits for a duration of clock time, in s
+        sleep(duration)
+
+
+class ScaledClock(WallClock):
+    """
+    Wall clock running scale times faster, slower when scale is below 1
+    """
+
+    def __init__(self, scale: float, genesis: int = None):
+        assert scale > 0
+        super().__init__(genesis)
+        self.scale: float = scale
+
+    def now(self) -> int:
+        return int((perf_counter_ns() - self.genesis) * self.scale)
+
+    def sleep(self, duration: float) -> None:
+        sleep(duration / self.scale)
+
+
+class VirtualClock:
+    """
+    Simulated time, only moved forward by the run loop. Runs go as fast as
+    the CPU allows and are replayed identically.
+    """
+
+    def __init__(self, time: int = 0):
+        self.time: int = time
+
+    def now(self) -> int:
+        return self.time
+
+    def advance(self, duration: int) -> None:
+        self.time += duration
+
+    def advance_to(self, time: int) -> None:
+        self.time = max(self.time, time)
+
+    def sleep(self, duration: float) -> None:
+        # Time only flows through the run loop
+        pass
@@ -0,0 +1,314 @@
+import numpy as np
+from time import perf_counter_ns
+
+from .ActionLog import ActionLog, MoveLog, CODES, SPAWN, START, DIE
+from .Agent import Agent
+from .Brain import Abilities, ABILITIES, BrainBatch
+from .Phenome import Phenome
+from .Position import Position
+from .PopulationStore import AgentView
+from .Sink import broadcast
+from .Snapshot import Snapshot, rng_to_dict, rng_from_dict
+from .Universe import Universe
+
+# Relative positions targeted by directional abilities, indexed by code
+DIRECTIONS = {
+    Abilities.move_bot: (1, 0),
+    Abilities.move_top: (-1, 0),
+    Abilities.move_left: (0, -1),
+    Abilities.move_right: (0, 1),
+    Abilities.eat_bot: (1, 0),
+    Abilities.eat_top: (-1, 0),
+    Abilities.eat_left: (0, -1),
+    Abilities.eat_right: (0, 1),
+}
+DY = np.array([DIRECTIONS.get(a, (0, 0))[0] for a in ABILITIES])
+DX = np.array([DIRECTIONS.get(a, (0, 0))[1] for a in ABILITIES])
+MOVE_CODES = [CODES[a] for a in ABILITIES if a.name.startswith("move")]
+EAT_CODES = [CODES[a] for a in ABILITIES if a.name.startswith("eat")]
+
+# Reproduction candidates, the 8 surrounding cells
+NEIGHBOURS_Y = np.array([-1, -1, -1, 0, 0, 1, 1, 1])
+NEIGHBOURS_X = np.array([-1, 0, 1, -1, 1, -1, 0, 1])
+
+# Inherited from the parent row on reproduction
+PHENOME_COLUMNS = [
+    "reaction_time",
+    "speed",
+    "energy_capacity",
+    "scope",
+    "color",
+    "weights",
+]
+
+
+class VectorizedEngine:
+    """
+    Synchronous alternative to the one-thread-per-agent model.
+    The whole population lives in the universe population store and is advanced
+    one tick at a time, conflicts being resolved deterministically in favour of
+    the lowest id.
+    """
+
+    def __init__(
+        self,
+        universe: Universe,
+        rng: np.random.Generator = None,
+        sinks: list = None,
+    ):
+        self.universe = universe
+        self.store = universe.population_store
+        self.rng = rng if rng is not None else np.random.default_rng()
+        self.ticks = 0
+
+        # Space, agent ids or -1 when empty
+        self.space = universe.space
+
+        # Logs, streamed to the sinks instead of being kept if any
+        self.log = ActionLog(
+            chunk_size=1024, on_flush=broadcast(sinks, "actions") if sinks else None
+        )
+        self.moves = MoveLog(
+            chunk_size=1024, on_flush=broadcast(sinks, "moves") if sinks else None
+        )
+        # Logs rows held by the previous snapshots
+        self.captured: dict = {"actions": 0, "moves": 0}
+
+    # POPULATION
+    def spawn_initial_population(self, positions: np.ndarray) -> None:
+        # Equivalent to default phenomes, drawn at once
+        template = Phenome()
+        n = len(positions)
+        weights = self.rng.random((n, len(ABILITIES)))
+        weights /= weights.sum(axis=1, keepdims=True)
+        self._spawn(
+            y=positions[:, 0].astype(np.int64),
+            x=positions[:, 1].astype(np.int64),
+            energy=template.energy_capacity,
+            generation=0,
+            parent=-1,
+            reaction_time=template.reaction_time,
+            speed=template.speed,
+            energy_capacity=template.energy_capacity,
+            scope=template.scope,
+            color=self.rng.integers(5, 253, size=(n, 3)),
+            weights=weights,
+        )
+
+    def _spawn(self, y: np.ndarray, x: np.ndarray, **values) -> np.ndarray:
+        t = self.universe.get_time()
+        ids = self.store.append(
+            n=len(y), y=y, x=x, spawn_date=t, birth_success=True, **values
+        )
+        self.space[y, x] = ids
+
+        self._log_actions(ids, SPAWN, t, True)
+        self.moves.extend(ids, t, y, x)
+        if self.universe.metrics is not None:
+            self.universe.metrics.count("births", len(ids))
+        return ids
+
+    def _log_actions(
+        self, ids, codes, t, successes, reaction_time=-1, decision_time=-1
+    ) -> None:
+        self.store.actions_count[ids] += 1
+        self.log.extend(ids, codes, t, successes, reaction_time, decision_time)
+
+    # SIMULATION
+    def step(self) -> bool:
+        # Advance the whole population by one tick, returns False once extinct
+        store = self.store
+        active = self._get_active()
+        if active.size == 0:
+            return False
+        tick_start = perf_counter_ns()
+        t = self.universe.get_time()
+        height, width = self.space.shape
+        energy = store.energy
+
+        # Newborns start on their first tick
+        starting = active[store.start_date[active] < 0]
+        store.start_date[starting] = t
+        self._log_actions(starting, START, t, True)
+
+        # Minimal energy loss
+        energy[active] -= 3
+
+        # Decisions, sampled at once for the whole population
+        decisions = BrainBatch(store.weights[active], rng=self.rng)()
+        decision_time = self.universe.get_time()
+        successes = np.zeros(active.size, dtype=bool)
+        target_y = (store.y[active] + DY[decisions]) % height
+        target_x = (store.x[active] + DX[decisions]) % width
+
+        # Idle
+        idle = np.flatnonzero(decisions == CODES[Abilities.idle])
+        energy[active[idle]] += 1
+        successes[idle] = True
+
+        # Eat, a prey is shared by no one: the lowest id wins
+        eat = np.flatnonzero(np.isin(decisions, EAT_CODES))
+        preys = self.space[target_y[eat], target_x[eat]]
+        edible = preys >= 0
+        edible[edible] = np.any(
+            store.color[preys[edible]] != store.color[active[eat[edible]]], axis=1
+        )
+        eat, preys = eat[edible], preys[edible]
+        preys, first = np.unique(preys, return_index=True)
+        eat = eat[first]
+        energy[active[eat]] += energy[preys]
+        energy[preys] = 0
+        successes[eat] = True
+
+        # Move, only toward cells empty at the beginning of the phase
+        move = np.flatnonzero(np.isin(decisions, MOVE_CODES))
+        energy[active[move]] -= 2
+        move = move[self.space[target_y[move], target_x[move]] < 0]
+        _, first = np.unique(target_y[move] * width + target_x[move], return_index=True)
+        move = np.sort(move[first])
+        movers = active[move]
+        self.space[store.y[movers], store.x[movers]] = -1
+        store.y[movers], store.x[movers] = target_y[move], target_x[move]
+        self.space[store.y[movers], store.x[movers]] = movers
+        store.travelled_distance[movers] += 1
+        successes[move] = True
+        self.moves.extend(movers, t, store.y[movers], store.x[movers])
+
+        # Reproduce in a random free surrounding cell
+        reproduce = np.flatnonzero(decisions == CODES[Abilities.reproduce])
+        parents = active[reproduce]
+        energy[parents] -= energy[parents] // 2
+        candidates_y = (store.y[parents, None] + NEIGHBOURS_Y) % height
+        candidates_x = (store.x[parents, None] + NEIGHBOURS_X) % width
+        free = self.space[candidates_y, candidates_x] < 0
+        keys = np.where(free, self.rng.random(free.shape), -1.0)
+        picks = keys.argmax(axis=1)
+        rows = np.flatnonzero(free.any(axis=1))
+        child_y = candidates_y[rows, picks[rows]]
+        child_x = candidates_x[rows, picks[rows]]
+        _, first = np.unique(child_y * width + child_x, return_index=True)
+        first = np.sort(first)
+        rows, child_y, child_x = rows[first], child_y[first], child_x[first]
+        parents = parents[rows]
+        successes[reproduce[rows]] = True
+        store.children_count[parents] += 1
+        children = {name: getattr(store, name)[parents] for name in PHENOME_COLUMNS}
+        if self.universe.mutation is not None and parents.size:
+            # Noise of all the births of the tick drawn at once
+            children = self.universe.mutation.mutate(
+                children, self.rng, self.universe.max_scope
+            )
+        # Half the parent energy, full capacity when nothing is left as agents do
+        children_energy = energy[parents] // 2
+        children_energy = np.where(
+            children_energy > 0, children_energy, children["energy_capacity"]
+        )
+        action_time = self.universe.get_time()
+        self._log_actions(active, decisions, action_time, successes, t, decision_time)
+
+        # Energy boundings
+        self.die(active[energy[active] < 1], action_time)
+        energy[active] = np.minimum(energy[active], store.energy_capacity[active])
+
+        # Newborns, may grow the store
+        if parents.size:
+            self._spawn(
+                y=child_y,
+                x=child_x,
+                energy=children_energy,
+                generation=store.generation[parents] + 1,
+                parent=parents,
+                **children,
+            )
+
+        self.ticks += 1
+        if self.universe.metrics is not None:
+            self.universe.metrics.count_actions(decisions)
+            self.universe.metrics.observe(
+                "tick_duration", perf_counter_ns() - tick_start
+            )
+        return True
+
+    def _get_active(self) -> np.ndarray:
+        # Ids of the agents acting this tick, sorted
+        return np.flatnonzero(self.store.alive)
+
+    def die(self, ids: np.ndarray, t: int) -> None:
+        self.store.death_date[ids] = t
+        self.space[self.store.y[ids], self.store.x[ids]] = -1
+        self._log_actions(ids, DIE, t, True)
+        if self.universe.metrics is not None:
+            self.universe.metrics.count("deaths", len(ids))
+
+    @property
+    def population_count(self) -> int:
+        return int(np.count_nonzero(self.store.alive))
+
+    # SNAPSHOTS
+    def capture(self) -> Snapshot:
+        # State between two ticks, with the logs rows logged since the previous
+        # snapshot unless streamed
+        arrays, logs = {}, {}
+        self.flush()
+        if self.log.on_flush is None:
+            for kind, log in (("actions", self.log), ("moves", self.moves)):
+                logs[kind] = [self.captured[kind], len(log)]
+                arrays[kind] = log.rows(self.captured[kind])
+                self.captured[kind] = len(log)
+        return Snapshot.capture(
+            self.universe,
+            {"ticks": self.ticks, "rng": rng_to_dict(self.rng), "logs": logs},
+            arrays,
+        )
+
+    def restore(self, snapshot: Snapshot) -> None:
+        # Engine state of a snapshot, space and store being the universe ones.
+        # The next snapshot holds the whole logs, its directory may be another.
+        self.ticks = snapshot.meta["ticks"]
+        self.rng = rng_from_dict(snapshot.meta["rng"])
+        if "actions" in snapshot.arrays and self.log.on_flush is None:
+            self.log = ActionLog.from_array(np.array(snapshot.arrays["actions"]))
+            self.moves = MoveLog.from_array(np.array(snapshot.arrays["moves"]))
+
+    # DATA
+    def flush(self) -> None:
+        # Streams the logs still buffered
+        self.log.flush()
+        self.moves.flush()
+
+    def publish(self) -> None:
+        # Hands the logs over to the universe for analysis, which reads them
+        # with the store only
+        if self.log.on_flush is None:  # Streamed logs are read from the sinks
+            self.universe.action_log, self.universe.move_log = self.log, self.moves
+
+    def materialize(self) -> None:
+        # Opt-in, maps one record carrying its path and actions per agent. Costly
+        # on large populations, get_agent reads views over the store otherwise.
+        universe = self.universe
+        records = [AgentRecord(self.store, id) for id in range(len(self.store))]
+        self.publish()
+
+        for id, log in self.log.split().items():
+            records[id].actions = log
+        for id, log in self.moves.split().items():
+            records[id].path = log
+
+        with universe.population_lock:
+            universe.population.update(enumerate(records))
+
+
+class AgentRecord(AgentView):
+    """
+    Store view carrying the path and actions logged by the vectorized engine
+    """
+
+    __slots__ = ("path", "actions", "position")
+
+    def __init__(self, store, id: int):
+        super().__init__(store, id)
+        self.path = MoveLog()
+        self.actions = ActionLog()
+        self.position = Position(y=int(store.y[id]), x=int(store.x[id]))
+
+    get_activity_data = Agent.get_activity_data
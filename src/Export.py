@@ -0,0 +1,141 @@
+import os
+import json
+import numpy as np
+from enum import Enum
+
+
+class ExportFormats(Enum):
+    npz = "npz"
+    parquet = "parquet"
+    arrow = "arrow"
+
+
+# Binary layout read by the Godot viewer, little endian.
+# frames.bin and actions.bin: header, index of one entry per frame, records.
+# agents.bin: one record per agent, row index and agent id being the same.
+BINARY_VERSION = 1
+HEADER_DTYPE = np.dtype(
+    [
+        ("magic", "S4"),
+        ("version", "<u4"),
+        ("frames_count", "<u4"),
+        ("record_size", "<u4"),
+    ]
+)
+INDEX_DTYPE = np.dtype(
+    [("time", "<i8"), ("offset", "<u8"), ("count", "<u4"), ("padding", "<u4")]
+)
+FRAME_RECORD_DTYPE = np.dtype([("id", "<i4"), ("y", "<i4"), ("x", "<i4")])
+ACTION_RECORD_DTYPE = np.dtype(
+    [
+        ("id", "<i4"),
+        ("code", "u1"),
+        ("success", "u1"),
+        ("padding", "<u2"),
+        ("time", "<i8"),
+    ]
+)
+AGENT_RECORD_DTYPE = np.dtype(
+    [
+        ("id", "<i4"),
+        ("generation", "<i4"),
+        ("r", "u1"),
+        ("g", "u1"),
+        ("b", "u1"),
+        ("padding", "u1"),
+    ]
+)
+
+
+def write_table(path: str, name: str, columns: dict, format: ExportFormats) -> None:
+    # One compressed columnar file per table
+    match format:
+        case ExportFormats.npz:
+            np.savez_compressed(os.path.join(path, f"{name}.npz"), **columns)
+        case ExportFormats.parquet:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+
+            pq.write_table(
+                pa.table(columns),
+                os.path.join(path, f"{name}.parquet"),
+                compression="zstd",
+            )
+        case ExportFormats.arrow:
+            import pyarrow as pa
+            import pyarrow.feather as feather
+
+            feather.write_feather(
+                pa.table(columns),
+                os.path.join(path, f"{name}.arrow"),
+                compression="zstd",
+            )
+
+
+def write_indexed_records(
+    path: str,
+    magic: bytes,
+    times: np.ndarray,
+    offsets: np.ndarray,
+    records: np.ndarray,
+) -> None:
+    # Header, frames index then records, frame i spanning records
+    # [offsets[i], offsets[i + 1])
+    header = np.array(
+        [(magic, BINARY_VERSION, len(times), records.dtype.itemsize)],
+        dtype=HEADER_DTYPE,
+    )
+    index = np.zeros(len(times), dtype=INDEX_DTYPE)
+    index["time"] = times
+    index["offset"] = offsets[:-1]
+    index["count"] = np.diff(offsets)
+    with open(path, "wb") as file:
+        for array in (header, index, records):
+            file.write(array.tobytes())
+
+
+def write_gui_files(
+    path: str,
+    frames: dict,
+    frames_index: dict,
+    actions: dict,
+    agents: dict,
+    meta: dict,
+) -> None:
+    # Compact binary files the viewer seeks into, frame by frame
+    frame_records = np.zeros(len(frames["id"]), dtype=FRAME_RECORD_DTYPE)
+    for name in FRAME_RECORD_DTYPE.names:
+        frame_records[name] = frames[name]
+    frame_offsets = np.append(frames_index["frame_offset"], len(frame_records)).astype(
+        np.int64
+    )
+    write_indexed_records(
+        os.path.join(path, "frames.bin"),
+        b"GMSF",
+        frames_index["time"],
+        frame_offsets,
+        frame_records,
+    )
+
+    action_records = np.zeros(len(actions["id"]), dtype=ACTION_RECORD_DTYPE)
+    for name in ["id", "code", "success", "time"]:
+        action_records[name] = actions[name]
+    action_offsets = np.append(
+        frames_index["action_offset"], len(action_records)
+    ).astype(np.int64)
+    write_indexed_records(
+        os.path.join(path, "actions.bin"),
+        b"GMSA",
+        frames_index["time"],
+        action_offsets,
+        action_records,
+    )
+
+    agent_records = np.zeros(len(agents["id"]), dtype=AGENT_RECORD_DTYPE)
+    for name in ["id", "generation", "r", "g", "b"]:
+        agent_records[name] = agents[name]
+    with open(os.path.join(path, "agents.bin"), "wb") as file:
+        file.write(agent_records.tobytes())
+
+    with open(os.path.join(path, "meta.json"), "w") as file:
+        json.dump({"version": BINARY_VERSION, **meta}, file)
@@ -1,21 +1,51 @@
+import os
 import threading
+import warnings
 import numpy as np
 import pandas as pd
-from random import randint
-from time import sleep
+from time import sleep, perf_counter_ns
 from matplotlib import pyplot as plt
 import seaborn as sns
 from math import ceil
+from itertools import product
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from enum import Enum
 from tqdm import tqdm
 
-from .Universe import Universe
+from .Universe import Universe, LockStrategies
+from .Clock import Clocks, WallClock, ScaledClock, VirtualClock
+from .ActionLog import ActionLog, MoveLog, ACTION_NAMES
 from .Agent import Agent
+from .Engine import VectorizedEngine
+from .Export import ExportFormats, write_table, write_gui_files
+from .Lineage import Lineage
+from .Metrics import Metrics
+from .Mutation import Mutation
+from .Profiler import Profiler
+from .Partition import PartitionedSimulation
 from .Position import Position
+from .ResultCache import ResultCache
+from .Scheduler import TurnScheduler, EventScheduler
+from .Snapshot import Snapshot, Snapshotter, clock_from_dict
+from .Video import VideoWriter
 
 
 class Distributions(Enum):
     random = "random"
+    clustered = "clustered"
+    uniform_grid = "uniform_grid"
+    density_map = "density_map"
+
+
+class Engines(Enum):
+    threaded = "threaded"
+    pooled = "pooled"  # Agents without threads, run by a pool in simulated time
+    vectorized = "vectorized"
+    multiprocess = "multiprocess"
+
+
+# Aggregates of the statistics tables
+STATISTICS = ["min", "max", "mean", "median", "std"]
 
 
 class Lab:
@@ -28,8 +58,62 @@ class Lab:
         max_total_duration: int,
         max_simulation_duration: int,
         verbose: bool = True,
+        engine: str = Engines.threaded.value,
+        lock_strategy: str = LockStrategies.cell.value,
+        workers: int = None,
+        population_capacity: int = None,
+        seed: int = None,
+        deterministic: bool = False,
+        tick_duration: float = 1e-4,
+        distribution: str = Distributions.random.value,
+        density_map: np.ndarray = None,
+        sinks: list = None,
+        metrics: bool = False,
+        metrics_port: int = None,
+        profile: bool = False,
+        profile_window: tuple = None,
+        clock: str = None,
+        time_scale: float = 1.0,
+        snapshot_path: str = None,
+        snapshot_interval: float = None,
+        mutation: Mutation = None,
+        release_dead: bool = False,
     ) -> dict:
         assert initial_population_count <= height * width
+        if engine not in [e.value for e in Engines]:
+            raise ValueError(f"Possible engines: {[e.value for e in Engines]}")
+        engine = Engines(engine)
+        if distribution not in [d.value for d in Distributions]:
+            raise ValueError(
+                f"Possible distributions: {[d.value for d in Distributions]}"
+            )
+        if deterministic and engine == Engines.multiprocess:
+            raise ValueError(
+                f"Possible deterministic engines: {[Engines.threaded.value, Engines.pooled.value, Engines.vectorized.value]}"
+            )
+        # Durations are clock time, deterministic and pooled runs being virtual
+        virtual = deterministic or engine == Engines.pooled
+        if clock is None:
+            clock = Clocks.virtual.value if virtual else Clocks.wall.value
+        if clock not in [c.value for c in Clocks]:
+            raise ValueError(f"Possible clocks: {[c.value for c in Clocks]}")
+        clock = Clocks(clock)
+        if virtual and clock != Clocks.virtual:
+            raise ValueError(
+                f"Possible clocks of deterministic or pooled runs: {[Clocks.virtual.value]}"
+            )
+        if engine == Engines.multiprocess and clock != Clocks.wall:
+            raise ValueError(f"Possible multiprocess clocks: {[Clocks.wall.value]}")
+        # Agents threads and worker processes have no consistent state between
+        # two ticks to capture
+        if snapshot_path is not None and engine not in (
+            Engines.pooled,
+            Engines.vectorized,
+        ):
+            raise ValueError(
+                f"Possible snapshot engines: {[Engines.pooled.value, Engines.vectorized.value]}"
+            )
+        rng = np.random.default_rng(seed)
 
         # Init outputs
         parameters = {
@@ -38,24 +122,334 @@ class Lab:
             "initial_population_count": initial_population_count,
             "max_total_duration": max_total_duration,
             "max_simulation_duration": max_simulation_duration,
+            "engine": engine.value,
+            "lock_strategy": lock_strategy,
+            "workers": workers,
+            "seed": seed,
+            "deterministic": deterministic,
+            "distribution": distribution,
+            "clock": clock.value,
+            "time_scale": time_scale,
+            "mutation": mutation.to_dict() if mutation is not None else None,
+            "release_dead": release_dead,
         }
         timings = {}
 
         # Universe
         if verbose:
             print("Generating universe...", end="\t")
-        universe = Universe(height=height, width=width)
+        match clock:
+            case Clocks.wall:
+                universe_clock = WallClock()
+            case Clocks.virtual:  # Advanced by the run loop, event by event
+                universe_clock = VirtualClock()
+            case Clocks.scaled:
+                universe_clock = ScaledClock(time_scale)
+        universe = Universe(
+            height=height,
+            width=width,
+            lock_strategy=lock_strategy,
+            clock=universe_clock,
+        )
+        universe.mutation = mutation
+        # Dead agents objects are released, analysis reads the store and logs
+        universe.release_dead = release_dead
+        self.universe = universe  # Can be polled while the experiment runs
+        if metrics or metrics_port is not None:
+            # Multiprocess workers do not report, only the parent process does
+            universe.metrics = Metrics()
+            if metrics_port is not None:
+                port = universe.metrics.serve(metrics_port)
+                if verbose:
+                    print(f"Serving metrics on http://127.0.0.1:{port}/metrics")
+        # Phases durations, and threads stacks sampled between the (start, stop)
+        # seconds of the window after the universe creation
+        samplers = []
+        if profile or profile_window is not None:
+            universe.profiler = Profiler()
+            if profile_window is not None:
+                samplers = [
+                    threading.Timer(
+                        profile_window[0], universe.profiler.start_sampling
+                    ),
+                    threading.Timer(profile_window[1], universe.profiler.stop_sampling),
+                ]
+                for sampler in samplers:
+                    sampler.daemon = True
+                    sampler.start()
+        # State written every interval of clock time, and once the run is over
+        snapshots = (
+            Snapshotter(snapshot_path, snapshot_interval) if snapshot_path else None
+        )
         timings["init_universe"] = universe.get_time()
         if verbose:
             print(f": Done in {(timings['init_universe'] / 1e9):.3f} s")
 
         # Invoke population
+        positions = self._generate_initial_positions(
+            height,
+            width,
+            initial_population_count,
+            verbose,
+            distribution=Distributions(distribution),
+            rng=rng,
+            density_map=density_map,
+        )
+        match engine:
+            case Engines.threaded:
+                self._run_threaded(
+                    universe,
+                    positions,
+                    max_total_duration,
+                    max_simulation_duration,
+                    timings,
+                    verbose,
+                    rng,
+                    TurnScheduler(universe) if clock == Clocks.virtual else None,
+                    int(tick_duration * 1e9),
+                    sinks,
+                )
+            case Engines.pooled:
+                self._run_pooled(
+                    universe,
+                    positions,
+                    max_total_duration,
+                    max_simulation_duration,
+                    timings,
+                    verbose,
+                    rng,
+                    EventScheduler(
+                        universe,
+                        1 if deterministic else workers if workers else os.cpu_count(),
+                        int(tick_duration * 1e9),
+                    ),
+                    sinks,
+                    snapshots,
+                    parameters,
+                )
+            case Engines.vectorized:
+                self._run_vectorized(
+                    universe,
+                    positions,
+                    max_total_duration,
+                    max_simulation_duration,
+                    timings,
+                    verbose,
+                    rng,
+                    int(tick_duration * 1e9),
+                    sinks,
+                    snapshots,
+                    parameters,
+                )
+            case Engines.multiprocess:
+                self._run_multiprocess(
+                    universe,
+                    positions,
+                    max_total_duration,
+                    max_simulation_duration,
+                    timings,
+                    verbose,
+                    workers if workers else min(os.cpu_count(), height // 2),
+                    population_capacity,
+                    rng,
+                    sinks,
+                )
+
+        # Streamed logs, written up to the last event
+        for sink in sinks or []:
+            sink.close()
+        if universe.metrics is not None:
+            universe.metrics.close()  # Final values stay readable
+        if universe.profiler is not None:
+            for sampler in samplers:
+                sampler.cancel()
+            universe.profiler.stop_sampling()
+            if verbose:
+                print(f"Phases durations (ns)\t:\n{universe.profiler.summary()}")
+
+        if verbose:
+            print(
+                f"Simulation succeed...\t: Returning data... Done in {(timings['stop'] / 1e9):.3f} s"
+            )
+
+        return {
+            "parameters": parameters,
+            "timings": timings,
+            "universe": universe,
+            "sinks": sinks,
+            "metrics": universe.metrics,
+            "profiler": universe.profiler,
+        }
+
+    def resume(
+        self,
+        snapshot: str | Snapshot,
+        max_simulation_duration: int = None,
+        verbose: bool = True,
+        sinks: list = None,
+        snapshot_path: str = None,
+        snapshot_interval: float = None,
+    ) -> dict:
+        # Goes on with a snapshotted run, a snapshot directory or the latest one
+        # of a snapshots directory, until its simulation duration is reached.
+        # The duration, counted from the start of the run, can be extended.
+        if not isinstance(snapshot, Snapshot):
+            snapshot = Snapshot.read(snapshot)
+        meta = snapshot.meta
+        parameters = dict(meta["parameters"])
+        timings = dict(meta["timings"])
+        run = meta["run"]
+        engine = Engines(parameters["engine"])
+        simulation_duration = (
+            max_simulation_duration
+            if max_simulation_duration is not None
+            else run["simulation_duration"]
+        )
+        parameters["max_simulation_duration"] = simulation_duration
+
+        # Universe
+        if verbose:
+            print("Restoring universe...", end="\t")
+        universe = Universe(
+            height=meta["height"],
+            width=meta["width"],
+            lock_strategy=meta["lock_strategy"],
+            clock=clock_from_dict(meta["clock"]),
+        )
+        universe.space[...] = snapshot.arrays["space"]
+        universe.population_store = snapshot.to_store()
+        if parameters.get("mutation") is not None:
+            universe.mutation = Mutation(**parameters["mutation"])
+        universe.release_dead = parameters.get("release_dead", False)
+        self.universe = universe
+        snapshots = (
+            Snapshotter(snapshot_path, snapshot_interval) if snapshot_path else None
+        )
+        if verbose:
+            print(f": Done at {(universe.get_time() / 1e9):.3f} s")
+
+        # Run
+        match engine:
+            case Engines.pooled:
+                scheduler = EventScheduler(
+                    universe, run["workers"], run["tick_duration"]
+                )
+                scheduler.restore(snapshot, sinks)
+                self._loop_pooled(
+                    universe,
+                    scheduler,
+                    run["start_running"],
+                    simulation_duration,
+                    timings,
+                    verbose,
+                    sinks,
+                    snapshots,
+                    parameters,
+                )
+            case Engines.vectorized:
+                vectorized_engine = VectorizedEngine(universe, sinks=sinks)
+                vectorized_engine.restore(snapshot)
+                self._loop_vectorized(
+                    universe,
+                    vectorized_engine,
+                    run["start_running"],
+                    simulation_duration,
+                    timings,
+                    verbose,
+                    run["tick_duration"],
+                    snapshots,
+                    parameters,
+                )
+
+        for sink in sinks or []:
+            sink.close()
+        if verbose:
+            print(
+                f"Simulation succeed...\t: Returning data... Done in {(timings['stop'] / 1e9):.3f} s"
+            )
+
+        return {
+            "parameters": parameters,
+            "timings": timings,
+            "universe": universe,
+            "sinks": sinks,
+            "metrics": universe.metrics,
+            "profiler": universe.profiler,
+        }
+
+    def sweep(
+        self,
+        param_grid: dict,
+        repeats: int = 1,
+        workers: int = None,
+        cache_path: str = None,
+        verbose: bool = True,
+    ) -> pd.DataFrame:
+        # Experiments over the product of the grid values, lists being swept and
+        # other values fixed, each repeated with seeds 0 to repeats - 1 unless
+        # the grid gives seeds. Runs are spread over a pool of processes, the
+        # ones in the cache are not run again and the others are cached as soon
+        # as they end. Returns one row per run: parameters then summary.
+        grid = {
+            name: values if isinstance(values, list) else [values]
+            for name, values in param_grid.items()
+        }
+        seeds = grid.pop("seed", list(range(repeats)))
+        configurations = [
+            {**dict(zip(grid, values)), "seed": seed}
+            for values in product(*grid.values())
+            for seed in seeds
+        ]
+        cache = ResultCache(cache_path) if cache_path else None
+        results = [cache.get(c) if cache else None for c in configurations]
+        pending = [i for i, result in enumerate(results) if result is None]
+
+        if pending:
+            pool = ProcessPoolExecutor(
+                max_workers=workers if workers else os.cpu_count()
+            )
+            try:
+                futures = {
+                    pool.submit(_summarize_experiment, configurations[i]): i
+                    for i in pending
+                }
+                for future in tqdm(
+                    as_completed(futures),
+                    desc="Running sweep\t\t",
+                    total=len(pending),
+                    disable=not verbose,
+                    colour="cyan",
+                ):
+                    i = futures[future]
+                    results[i] = future.result()
+                    if cache is not None:
+                        cache.put(configurations[i], results[i])
+            finally:  # A failed run stops the sweep, completed ones stay cached
+                pool.shutdown(cancel_futures=True)
+        return pd.DataFrame(
+            [
+                {**configuration, **result}
+                for configuration, result in zip(configurations, results)
+            ]
+        )
+
+    def _run_threaded(
+        self,
+        universe: Universe,
+        positions: np.ndarray,
+        max_total_duration: int,
+        max_simulation_duration: int,
+        timings: dict,
+        verbose: bool,
+        rng: np.random.Generator,
+        scheduler: TurnScheduler,
+        tick_duration: int,
+        sinks: list,
+    ) -> None:
         self._invoke_initial_population(
-            universe, height, width, initial_population_count, verbose
+            universe, positions, verbose, rng, scheduler, sinks
         )
-        assert (
-            np.sum(universe.space != None) == initial_population_count
-        )  # Positions are uniques
+        assert universe.occupancy == len(positions)  # Positions are uniques
         timings["invoke_initial_population"] = universe.get_time()
 
         # Start population
@@ -68,23 +462,32 @@ class Lab:
         start_running = universe.get_time()
         total_duration_remaining = max_total_duration - max(0, int(start_running / 1e9))
         simulation_duration = min(total_duration_remaining, max_simulation_duration)
+        if scheduler is not None:
+            early_stop = self._run_rounds(
+                universe, scheduler, simulation_duration, tick_duration, verbose
+            )
         for i in tqdm(
             range(simulation_duration, 0, -1),
             desc="Running simulation\t",
-            disable=not verbose,
+            disable=not verbose or scheduler is not None,
             colour="yellow",
         ):
+            if scheduler is not None:
+                break
             if threading.active_count() <= non_agents_threads:
                 if verbose:
                     print(f"Simulation early stop\t: All entities died.")
                 early_stop = True
                 break
-            t = (universe.get_time() - start_running) / 1e9  # Avoiding time drift
-            sleep(max(1 + simulation_duration - i - t, 0))
+            # Avoiding time drift, waiting in clock time as t is read from it
+            t = (universe.get_time() - start_running) / 1e9
+            universe.clock.sleep(max(1 + simulation_duration - i - t, 0))
         timings["run"] = universe.get_time()
 
         # Stop
         universe.freeze.set()
+        if scheduler is not None:
+            scheduler.release()
         first_iteration = True
         active_agents = threading.active_count() - non_agents_threads
         while active_agents > 0:
@@ -97,54 +500,413 @@ class Lab:
             active_agents = threading.active_count() - non_agents_threads
         universe.culmination = universe.get_time()
         timings["stop"] = universe.culmination
+        if not sinks:  # Streamed logs are read from the sinks
+            actions, paths = universe.get_logs()
+            universe.action_log = ActionLog.merge(actions)
+            universe.move_log = MoveLog.merge(paths)
 
-        if verbose:
-            print(
-                f"Simulation succeed...\t: Returning data... Done in {(timings['stop'] / 1e9):.3f} s"
+    def _run_pooled(
+        self,
+        universe: Universe,
+        positions: np.ndarray,
+        max_total_duration: int,
+        max_simulation_duration: int,
+        timings: dict,
+        verbose: bool,
+        rng: np.random.Generator,
+        scheduler: EventScheduler,
+        sinks: list,
+        snapshots: Snapshotter = None,
+        parameters: dict = None,
+    ) -> None:
+        self._invoke_initial_population(
+            universe, positions, verbose, rng, scheduler, sinks
+        )
+        assert universe.occupancy == len(positions)  # Positions are uniques
+        timings["invoke_initial_population"] = universe.get_time()
+        with universe.population_lock:
+            for agent in list(universe.population.values()):
+                scheduler.admit(agent)
+        timings["start_initial_population"] = universe.get_time()
+
+        start_running = universe.get_time()
+        total_duration_remaining = max_total_duration - max(0, int(start_running / 1e9))
+        simulation_duration = min(total_duration_remaining, max_simulation_duration)
+        self._loop_pooled(
+            universe,
+            scheduler,
+            start_running,
+            simulation_duration,
+            timings,
+            verbose,
+            sinks,
+            snapshots,
+            parameters,
+        )
+
+    def _loop_pooled(
+        self,
+        universe: Universe,
+        scheduler: EventScheduler,
+        start_running: int,
+        simulation_duration: int,
+        timings: dict,
+        verbose: bool,
+        sinks: list,
+        snapshots: Snapshotter = None,
+        parameters: dict = None,
+    ) -> None:
+        # Run, slot by slot of simulated time, from start or from a snapshot
+        run = {
+            "start_running": start_running,
+            "simulation_duration": simulation_duration,
+            "tick_duration": scheduler.slot_duration,
+            "workers": scheduler.workers,
+        }
+        deadline = start_running + simulation_duration * 10**9
+        with tqdm(
+            total=simulation_duration,
+            desc="Running simulation\t",
+            disable=not verbose,
+            colour="yellow",
+        ) as progress:
+            while universe.get_time() < deadline:
+                if not scheduler.run_slot():
+                    if verbose:
+                        print(f"Simulation early stop\t: All entities died.")
+                    break
+                elapsed = (universe.get_time() - start_running) / 1e9
+                progress.update(min(int(elapsed), simulation_duration) - progress.n)
+                if snapshots is not None and snapshots.due(universe.get_time()):
+                    self._snapshot(
+                        snapshots,
+                        scheduler.capture(bool(sinks)),
+                        parameters,
+                        timings,
+                        run,
+                    )
+        timings["run"] = universe.get_time()
+        if snapshots is not None:  # Final state, a run can be resumed further
+            self._snapshot(
+                snapshots, scheduler.capture(bool(sinks)), parameters, timings, run
             )
+            snapshots.close()
 
-        return {"parameters": parameters, "timings": timings, "universe": universe}
+        # Stop
+        universe.freeze.set()
+        scheduler.release()
+        universe.culmination = universe.get_time()
+        timings["stop"] = universe.culmination
+        if not sinks:  # Streamed logs are read from the sinks
+            actions, paths = universe.get_logs()
+            universe.action_log = ActionLog.merge(actions)
+            universe.move_log = MoveLog.merge(paths)
 
-    def _generate_position(self, positions: list[Position], height: int, width: int):
-        new_pos = Position(y=randint(0, height - 1), x=randint(0, width - 1))
-        if new_pos not in positions:
-            return new_pos
-        else:
-            return self._generate_position(positions, height, width)
+    def _run_vectorized(
+        self,
+        universe: Universe,
+        positions: np.ndarray,
+        max_total_duration: int,
+        max_simulation_duration: int,
+        timings: dict,
+        verbose: bool,
+        rng: np.random.Generator,
+        tick_duration: int,
+        sinks: list,
+        snapshots: Snapshotter = None,
+        parameters: dict = None,
+    ) -> None:
+        engine = VectorizedEngine(universe, rng=rng, sinks=sinks)
+        engine.spawn_initial_population(positions)
+        assert engine.population_count == len(positions)  # Positions are uniques
+        timings["invoke_initial_population"] = universe.get_time()
+        timings["start_initial_population"] = universe.get_time()
 
-    def _invoke_initial_population(
+        start_running = universe.get_time()
+        total_duration_remaining = max_total_duration - max(0, int(start_running / 1e9))
+        simulation_duration = min(total_duration_remaining, max_simulation_duration)
+        self._loop_vectorized(
+            universe,
+            engine,
+            start_running,
+            simulation_duration,
+            timings,
+            verbose,
+            tick_duration,
+            snapshots,
+            parameters,
+        )
+
+    def _loop_vectorized(
         self,
         universe: Universe,
+        engine: VectorizedEngine,
+        start_running: int,
+        simulation_duration: int,
+        timings: dict,
+        verbose: bool,
+        tick_duration: int,
+        snapshots: Snapshotter = None,
+        parameters: dict = None,
+    ) -> None:
+        # Run, one tick of the whole population at a time, from start or from a
+        # snapshot
+        run = {
+            "start_running": start_running,
+            "simulation_duration": simulation_duration,
+            "tick_duration": tick_duration,
+        }
+        with tqdm(
+            total=simulation_duration,
+            desc="Running simulation\t",
+            disable=not verbose,
+            colour="yellow",
+        ) as progress:
+            elapsed = (universe.get_time() - start_running) / 1e9
+            while elapsed < simulation_duration:
+                if not engine.step():
+                    if verbose:
+                        print(f"Simulation early stop\t: All entities died.")
+                    break
+                if isinstance(universe.clock, VirtualClock):
+                    universe.clock.advance(tick_duration)
+                elapsed = (universe.get_time() - start_running) / 1e9
+                progress.update(min(int(elapsed), simulation_duration) - progress.n)
+                if snapshots is not None and snapshots.due(universe.get_time()):
+                    self._snapshot(
+                        snapshots, engine.capture(), parameters, timings, run
+                    )
+        timings["run"] = universe.get_time()
+        timings["ticks"] = engine.ticks
+        if snapshots is not None:  # Final state, a run can be resumed further
+            self._snapshot(snapshots, engine.capture(), parameters, timings, run)
+            snapshots.close()
+
+        # Stop
+        universe.freeze.set()
+        universe.culmination = universe.get_time()
+        timings["stop"] = universe.culmination
+        engine.flush()
+        engine.publish()
+
+    def _snapshot(
+        self,
+        snapshots: Snapshotter,
+        snapshot: Snapshot,
+        parameters: dict,
+        timings: dict,
+        run: dict,
+    ) -> None:
+        # Written in the background, with what resuming the run needs
+        snapshot.meta.update(parameters=parameters, timings=dict(timings), run=run)
+        snapshots.submit(snapshot, snapshot.meta["clock"]["time"])
+
+    def _run_multiprocess(
+        self,
+        universe: Universe,
+        positions: np.ndarray,
+        max_total_duration: int,
+        max_simulation_duration: int,
+        timings: dict,
+        verbose: bool,
+        workers: int,
+        population_capacity: int,
+        rng: np.random.Generator,
+        sinks: list,
+    ) -> None:
+        # Without a capacity, the shared store grows between runs when full
+        simulation = PartitionedSimulation(
+            universe,
+            workers,
+            (
+                population_capacity
+                if population_capacity
+                else 4 * universe.height * universe.width
+            ),
+            rng,
+            sinks,
+        )
+        simulation.spawn_initial_population(positions)
+        assert simulation.population_count == len(positions)  # Positions are uniques
+        timings["invoke_initial_population"] = universe.get_time()
+        timings["start_initial_population"] = universe.get_time()
+
+        # Run, one worker process per band of the universe
+        start_running = universe.get_time()
+        total_duration_remaining = max_total_duration - max(0, int(start_running / 1e9))
+        simulation_duration = min(total_duration_remaining, max_simulation_duration)
+        deadline = start_running + simulation_duration * 10**9
+        with tqdm(
+            total=simulation_duration,
+            desc=f"Running simulation\t",
+            disable=not verbose,
+            colour="yellow",
+        ) as progress:
+            while True:
+                simulation.run(
+                    deadline=deadline,
+                    progress=lambda: progress.update(
+                        min(
+                            int((universe.get_time() - start_running) / 1e9),
+                            simulation_duration,
+                        )
+                        - progress.n
+                    ),
+                )
+                if not simulation.full or population_capacity:
+                    break
+                simulation.grow(2 * simulation.store.capacity)
+        timings["truncated"] = simulation.full
+        if simulation.full:
+            warnings.warn(
+                f"Simulation stopped early, population store full: {simulation.store.capacity} agents",
+                RuntimeWarning,
+            )
+        timings["run"] = universe.get_time()
+        timings["ticks"] = simulation.ticks
+
+        # Stop
+        universe.freeze.set()
+        universe.culmination = universe.get_time()
+        timings["stop"] = universe.culmination
+        simulation.merge()
+
+    def _run_rounds(
+        self,
+        universe: Universe,
+        scheduler: TurnScheduler,
+        simulation_duration: int,
+        tick_duration: int,
+        verbose: bool,
+    ) -> bool:
+        # Virtual time run, agents act one at a time by rounds of simulated time.
+        # Returns True on early stop.
+        deadline = universe.get_time() + simulation_duration * 10**9
+        with tqdm(
+            total=simulation_duration,
+            desc="Running simulation\t",
+            disable=not verbose,
+            colour="yellow",
+        ) as progress:
+            while universe.get_time() < deadline:
+                tick_start = perf_counter_ns()
+                if not scheduler.run_round():
+                    if verbose:
+                        print(f"Simulation early stop\t: All entities died.")
+                    return True
+                if universe.metrics is not None:
+                    universe.metrics.observe(
+                        "tick_duration", perf_counter_ns() - tick_start
+                    )
+                universe.clock.advance(tick_duration)
+                progress.update(
+                    min(int(universe.get_time() / 1e9), simulation_duration)
+                    - progress.n
+                )
+        return False
+
+    def _generate_initial_positions(
+        self,
         height: int,
         width: int,
         initial_population_count: int,
         verbose: bool,
         distribution: Distributions = Distributions.random,
-    ) -> None:
-        positions = []
+        rng: np.random.Generator = None,
+        density_map: np.ndarray = None,
+        clusters_count: int = 8,
+        clusters_spread: float = None,
+    ) -> np.ndarray:
+        # Unique cells, drawn at once. Returns an (n, 2) array of (y, x)
+        rng = rng if rng is not None else np.random.default_rng()
+        n = initial_population_count
+        if verbose:
+            print("Generating positions...", end="\t")
         match distribution:
             case Distributions.random:
-                for _ in tqdm(
-                    range(initial_population_count),
-                    desc="Generating positions\t",
-                    disable=not verbose,
-                    colour="magenta",
+                cells = rng.choice(height * width, size=n, replace=False)
+            case Distributions.uniform_grid:
+                # Evenly spaced lattice, randomly shifted on the torus
+                rows = max(1, min(height, ceil((n * height / width) ** 0.5)))
+                columns = ceil(n / rows)
+                if columns > width:
+                    rows, columns = ceil(n / width), width
+                ys = (np.arange(rows) * height // rows + rng.integers(height)) % height
+                xs = (
+                    np.arange(columns) * width // columns + rng.integers(width)
+                ) % width
+                cells = (ys[:, None] * width + xs[None, :]).ravel()[:n]
+            case Distributions.clustered:
+                # Gaussian blobs around random centers, distances wrapped on the torus
+                spread = (
+                    clusters_spread
+                    if clusters_spread is not None
+                    else max(1.0, min(height, width) / 16)
+                )
+                density = np.zeros((height, width))
+                dy = np.arange(height)
+                dx = np.arange(width)
+                for cy, cx in zip(
+                    rng.integers(height, size=clusters_count),
+                    rng.integers(width, size=clusters_count),
                 ):
-                    positions.append(self._generate_position(positions, height, width))
+                    ry = np.minimum(np.abs(dy - cy), height - np.abs(dy - cy))
+                    rx = np.minimum(np.abs(dx - cx), width - np.abs(dx - cx))
+                    # Separable gaussian, one outer product per cluster
+                    density += np.outer(
+                        np.exp(-(ry**2) / spread**2 / 2),
+                        np.exp(-(rx**2) / spread**2 / 2),
+                    )
+                cells = self._sample_cells(density + 1e-12, n, rng)
+            case Distributions.density_map:
+                assert density_map is not None and density_map.shape == (height, width)
+                assert np.count_nonzero(density_map > 0) >= n
+                cells = self._sample_cells(density_map, n, rng)
             case _:
                 raise ValueError(
                     f"Possible distributions: {[d.name for d in Distributions]}"
                 )
-        start_barrier = threading.Barrier(parties=initial_population_count)
-        for pos in tqdm(
-            positions, "Invoking population\t", disable=not verbose, colour="blue"
+        positions = np.stack(np.divmod(cells, width), axis=1)
+        if verbose:
+            print(f": {n} positions")
+        return positions
+
+    def _sample_cells(
+        self, density: np.ndarray, n: int, rng: np.random.Generator
+    ) -> np.ndarray:
+        # Weighted sampling without replacement, keeps the n largest log(u) / w keys
+        with np.errstate(divide="ignore"):
+            keys = np.log(rng.random(density.size)) / density.ravel()
+        return np.argpartition(keys, -n)[-n:] if n else np.empty(0, dtype=np.int64)
+
+    def _invoke_initial_population(
+        self,
+        universe: Universe,
+        positions: np.ndarray,
+        verbose: bool,
+        rng: np.random.Generator = None,
+        scheduler: TurnScheduler | EventScheduler = None,
+        sinks: list = None,
+    ) -> None:
+        # One independent random stream per agent
+        rng = rng if rng is not None else np.random.default_rng()
+        start_barrier = threading.Barrier(parties=len(positions))
+        for (y, x), agent_rng in tqdm(
+            zip(positions, rng.spawn(len(positions))),
+            "Invoking population\t",
+            total=len(positions),
+            disable=not verbose,
+            colour="blue",
         ):
             Agent(
                 universe=universe,
-                initial_position=pos,
+                initial_position=Position(y=int(y), x=int(x)),
                 generation=0,
                 parents=["universe"],
                 start_barrier=start_barrier,
+                rng=agent_rng,
+                scheduler=scheduler,
+                sinks=sinks,
             )
 
     def _start_initial_population(self, universe, verbose: bool) -> None:
@@ -171,19 +933,62 @@ class Lab:
     # ANALYSIS
     def get_statistics(self, simulation: dict, verbose: bool = True) -> dict:
         # TODO copy the universe to not alter it
-        # Individuals statistics
-        agents_statistics = []
-        for a_id, agent in tqdm(
-            simulation["universe"].population.items(),
-            desc="Computing agents statistics\t",
-            disable=not verbose,
-            colour="red",
-        ):
-            agents_statistics.append(agent.get_data())
-
-        agents_statistics_df = pd.DataFrame(agents_statistics)
+        # Individuals statistics, attributes and lifespan from the store
+        universe = simulation["universe"]
+        store = universe.population_store
+        dead = store.column("death_date") >= 0
+        agents_statistics_df = pd.DataFrame(
+            {
+                "id": store.column("id"),
+                "generation": store.column("generation"),
+                "parents_count": 1,
+                "dead": dead,
+                "lifespan": np.where(
+                    dead, store.column("death_date"), universe.culmination
+                )
+                - store.column("spawn_date"),
+                "children_count": store.column("children_count"),
+                "birth_success": store.column("birth_success"),
+                "travelled_distance": store.column("travelled_distance"),
+                "actions_count": store.column("actions_count"),
+            }
+        )
         agents_statistics_df.set_index("id", inplace=True)
 
+        # Activity track, durations of every action aggregated per agent at once
+        actions = self._get_log(simulation, "actions").to_array()
+        actions = actions[np.argsort(actions["id"], kind="stable")]
+        timed = actions["reaction_time"] >= 0
+        same_agent = np.append(False, actions["id"][1:] == actions["id"][:-1])
+        durations = pd.DataFrame(
+            {
+                "id": actions["id"],
+                "decision_duration": np.where(
+                    timed, actions["decision_time"] - actions["reaction_time"], np.nan
+                ),
+                "action_duration": np.where(
+                    timed, actions["time"] - actions["decision_time"], np.nan
+                ),
+                "round_duration": np.where(
+                    same_agent, np.diff(actions["time"], prepend=0), np.nan
+                ),
+            }
+        )
+        activity_statistics = durations.groupby("id").agg(STATISTICS)
+        activity_statistics.columns = [
+            f"{statistic}_{data}" for data, statistic in activity_statistics.columns
+        ]
+        agents_statistics_df = agents_statistics_df.join(activity_statistics)
+
+        # Generation statistics
+        generation_statistics_df = agents_statistics_df.groupby("generation").agg(
+            agents_count=("dead", "size"),
+            **{
+                f"mean_{data}": (data, "mean")
+                for data in ["lifespan", "children_count", "travelled_distance"]
+            },
+        )
+
         # Population statistics
         computed_data = [
             "lifespan",
@@ -195,124 +1000,338 @@ class Lab:
             "mean_action_duration",
             "mean_round_duration",
         ]
-        population_statistics = []
-        for cp in computed_data:
-            population_statistics.append(
-                {
-                    "data": cp,
-                    "min": agents_statistics_df[cp].min(),
-                    "max": agents_statistics_df[cp].max(),
-                    "mean": agents_statistics_df[cp].mean(),
-                    "median": agents_statistics_df[cp].median(),
-                    "std": agents_statistics_df[cp].std(),
-                }
-            )
-        population_statistics_df = pd.DataFrame(population_statistics)
-        population_statistics_df.set_index("data", inplace=True)
+        population_statistics_df = (
+            agents_statistics_df[computed_data].astype(float).agg(STATISTICS).T
+        )
+        population_statistics_df.index.name = "data"
 
         return {
             "agents_statistics": agents_statistics_df,
+            "generation_statistics": generation_statistics_df,
             "population_statistics": population_statistics_df,
         }
 
-    def get_temporal_data(self, simulation):
-        # Population count timeline TODO its wrong
-        spawn_timeline = [
-            a.spawn_date for a in simulation["universe"].population.values()
-        ]
-        spawn_timeline.sort()
-        death_timeline = [
-            a.death_date
-            for a in simulation["universe"].population.values()
-            if a.death_date
-        ]
-        death_timeline.sort()
-
-        population_count = 0
-        population_timeline = []
-        while spawn_timeline or death_timeline:
-            # Trick to get min between the first element of two lists of different size
-            birth = float("inf") if not spawn_timeline else spawn_timeline[0]
-            death = float("inf") if not death_timeline else death_timeline[0]
-            if birth < death:
-                t = spawn_timeline.pop(0)
-                population_count += 1
-            else:
-                t = death_timeline.pop(0)
-                population_count -= 1
-            population_timeline.append({"t": t, "population_count": population_count})
-        population_timeline_df = pd.DataFrame(population_timeline)
-        population_timeline_df.set_index("t", inplace=True)
-
-        return population_timeline_df
-
-    def get_spatial_data(self, simulation):
-        # TODO look for a method to determine optimal linear time step
-        # Probably something like finding the GCD of all time steps
-
-        compressed_pos = []
-        timestamps = []
-        next_moves = [
-            a.path[0][0] for a in simulation["universe"].population.values() if a.path
-        ]
-        next_timestamp = None if not next_moves else min(next_moves)
-        disabled_agents = [a for a in simulation["universe"].population.values()]
-        enabled_agents = []
-
-        while next_timestamp < float("inf"):
-            # Timestamp
-            timestamps.append(next_timestamp)
-            next_moves = [
-                a.path[1][0]
-                for a in simulation["universe"].population.values()
-                if len(a.path) >= 2
+    def get_temporal_data(
+        self, simulation, by: str = None, interval: int = None
+    ) -> pd.DataFrame:
+        # Population count over time, swept from +1 / -1 events at the spawn and
+        # death dates of the agents born. Accepts a simulation or a universe, that
+        # can still be running (see Lab.universe). Counts can be broken down by
+        # generation or color, and resampled every interval ns.
+        universe = (
+            simulation["universe"] if isinstance(simulation, dict) else simulation
+        )
+        store = universe.population_store
+        n = store.count  # Rows appended while reading are left for the next poll
+        spawn_dates, death_dates = store.spawn_date[:n], store.death_date[:n]
+        born = store.birth_success[:n] & (spawn_dates >= 0)
+        dead = born & (death_dates >= 0)
+        rows = np.concatenate([np.flatnonzero(born), np.flatnonzero(dead)])
+        times = np.concatenate([spawn_dates[born], death_dates[dead]])
+        deltas = np.repeat(np.array([1, -1], dtype=np.int32), [born.sum(), dead.sum()])
+        order = np.argsort(times, kind="stable")
+        rows, times, deltas = rows[order], times[order], deltas[order]
+
+        # State once all the events of a same date happened
+        last = np.append(times[1:] != times[:-1], True)[: times.size]
+        match by:
+            case None:
+                columns = ["population_count"]
+                counts = np.cumsum(deltas)[last, None]
+            case "generation" | "color":
+                if by == "generation":
+                    groups = store.generation[:n][rows]
+                else:
+                    colors = store.color[:n][rows].astype(np.int32)
+                    groups = colors[:, 0] << 16 | colors[:, 1] << 8 | colors[:, 2]
+                columns, groups = np.unique(groups, return_inverse=True)
+                if by == "color":
+                    columns = [f"#{c:06x}" for c in columns]
+                # Changes of each group at each date, swept over the dates only
+                dates = np.cumsum(np.append(False, times[1:] != times[:-1]))
+                counts = np.zeros((np.count_nonzero(last), len(columns)), np.int64)
+                np.add.at(counts, (dates[: times.size], groups), deltas)
+                np.cumsum(counts, axis=0, out=counts)
+            case _:
+                raise ValueError(
+                    f"Possible breakdowns: {[None, 'generation', 'color']}"
+                )
+        times = times[last]
+
+        if interval is not None:
+            end = (
+                universe.culmination
+                if universe.culmination is not None
+                else universe.get_time()
+            )
+            grid = np.arange(0, end + 1, interval)
+            previous = np.searchsorted(times, grid, side="right") - 1
+            counts = np.vstack([np.zeros((1, len(columns)), counts.dtype), counts])
+            times, counts = grid, counts[previous + 1]  # 0 before the first event
+
+        return pd.DataFrame(counts, index=pd.Index(times, name="t"), columns=columns)
+
+    def _get_log(self, simulation: dict, kind: str) -> ActionLog:
+        # Merged log of the run, read back from the first sink when streamed
+        universe = simulation["universe"]
+        log = universe.action_log if kind == "actions" else universe.move_log
+        if log is None and simulation.get("sinks"):
+            log_class = ActionLog if kind == "actions" else MoveLog
+            array = simulation["sinks"][0].read(kind)
+            log = log_class.merge(
+                [] if array is None else [log_class.from_array(array)]
+            )
+        return log
+
+    def _get_path_events(self, simulation: dict, interval: int = None) -> tuple:
+        # Moves and deaths merged by time, once. Returns the frames times, then
+        # for each event: its frame, agent id and coordinates (-1 for a death).
+        # Frames are the events times, or every interval ns when resampling. An
+        # event shows from the first frame at or after it.
+        universe = simulation["universe"]
+        moves = self._get_log(simulation, "moves").to_array()
+        death_dates = universe.population_store.column("death_date")
+        dead = np.flatnonzero(death_dates >= 0)
+        dead = dead[np.argsort(death_dates[dead], kind="stable")]
+
+        # Two sorted streams, the stable sort merges them, moves first on ties
+        times = np.concatenate([moves["time"], death_dates[dead]])
+        order = np.argsort(times, kind="stable")
+        times = times[order]
+        ids = np.concatenate([moves["id"], dead])[order]
+        ys = np.concatenate([moves["y"], np.full(dead.size, -1, np.int32)])[order]
+        xs = np.concatenate([moves["x"], np.full(dead.size, -1, np.int32)])[order]
+
+        if interval is None:
+            frames_times = np.unique(times)
+        elif times.size:
+            frames_times = np.arange(times[0], times[-1] + interval, interval)
+        else:
+            frames_times = times
+        frames = np.searchsorted(frames_times, times)
+        return frames_times, frames, ids, ys, xs, len(universe.population_store)
+
+    def iter_frames(self, simulation: dict, interval: int = None):
+        # Frames one at a time: time, then ids and coordinates of the agents shown
+        frames_times, frames, ids, ys, xs, count = self._get_path_events(
+            simulation, interval
+        )
+        y = np.full(count, -1, dtype=np.int32)
+        x = np.full(count, -1, dtype=np.int32)
+        bounds = np.searchsorted(frames, np.arange(len(frames_times) + 1))
+        for frame, t in enumerate(frames_times):
+            events = slice(bounds[frame], bounds[frame + 1])
+            y[ids[events]], x[ids[events]] = ys[events], xs[events]
+            shown = np.flatnonzero(y >= 0)
+            yield int(t), shown, y[shown], x[shown]
+
+    def get_spatial_data(
+        self, simulation: dict, interval: int = None, dense: bool = False
+    ):
+        # Agents positions for each frame, see _get_path_events. Either frames
+        # times followed by inf and a dict of positions per frame, or with dense
+        # frames times and a (frames, agents, 2) array of positions, -1 when the
+        # agent is not shown.
+        if not dense:
+            timestamps, compressed_pos = [], []
+            for t, ids, ys, xs in self.iter_frames(simulation, interval):
+                timestamps.append(t)
+                compressed_pos.append(
+                    dict(zip(ids.tolist(), zip(ys.tolist(), xs.tolist())))
+                )
+            return timestamps + [float("inf")], compressed_pos
+
+        frames_times, frames, ids, ys, xs, count = self._get_path_events(
+            simulation, interval
+        )
+        # Last event of each agent at each frame, carried forward
+        last = np.full((len(frames_times), count), -1, dtype=np.int64)
+        last[frames, ids] = np.arange(len(ids))
+        last = np.maximum.accumulate(last, axis=0)
+        positions = np.stack([ys, xs], axis=1)[last]
+        positions[last < 0] = -1
+        return frames_times, positions
+
+    def get_timeline(self, simulation) -> pd.DataFrame:
+        # Actions of the whole population sorted by time
+        return self._get_log(simulation, "actions").to_dataframe()
+
+    def get_lineage(self, simulation: dict) -> Lineage:
+        return Lineage(simulation["universe"].population_store)
+
+    def get_agents_data(self, simulation) -> pd.DataFrame:
+        # One row per agent indexed by id, straight from the store columns,
+        # colors split by channel. Dates are -1 until they happen, the children
+        # ids are read from the lineage.
+        store = simulation["universe"].population_store
+        count = len(store)
+        columns = {
+            name: getattr(store, name)[:count]
+            for name in [
+                "generation",
+                "parent",
+                "spawn_date",
+                "start_date",
+                "death_date",
+                "birth_success",
+                "children_count",
+                "reaction_time",
+                "speed",
+                "energy_capacity",
+                "scope",
             ]
-            next_timestamp = float("inf") if not next_moves else min(next_moves)
-
-            # Enabling agents
-            next_disabled_agents = [a for a in disabled_agents]
-            for a in disabled_agents:
-                if a.path and a.path[0][0] < next_timestamp:
-                    enabled_agents.append(a)
-                    next_disabled_agents.remove(a)
-            disabled_agents = next_disabled_agents
-
-            # Updating enabled positions
-            next_enabled_agents = [a for a in enabled_agents]
-            for a in enabled_agents:
-                # TODO Dead ones can disapear before their last move
-                if a.death_date and a.death_date < next_timestamp:
-                    next_enabled_agents.remove(a)
-                elif a.path and a.path[0][0] < next_timestamp:
-                    a.position = a.path[0][1]
-                    a.path.pop(0)
-            enabled_agents = next_enabled_agents
-
-            # Create frame with enabled agents
-            frame_positions = {}
-            for a in enabled_agents:
-                frame_positions[a.id] = (a.position.y, a.position.x)
-            compressed_pos.append(frame_positions)
-
-        # Create a single struct with compressed positions and timestamps
-        return timestamps + [float("inf")], compressed_pos
-
-    def get_timeline(self, simulation):
-        timeline = []
-        for a in simulation["universe"].population.values():
-            timeline += a.actions
-
-        sorted_timeline = sorted(timeline, key=lambda x: x["action_time"])
-
-        return sorted_timeline
-
-    def get_agents_data(self, simulation):
-        agents_data = {}
-        for a in simulation["universe"].population.values():
-            agents_data[a.id] = a.to_dict()
-        return agents_data
+        }
+        columns.update(
+            r=store.color[:count, 0], g=store.color[:count, 1], b=store.color[:count, 2]
+        )
+        return pd.DataFrame(columns, index=pd.RangeIndex(count, name="id"))
+
+    # EXPORT
+    def export(
+        self,
+        simulation: dict,
+        path: str,
+        format: str = ExportFormats.npz.value,
+        interval: int = None,
+        gui: bool = True,
+        verbose: bool = True,
+        phylogeny: bool = True,
+    ) -> None:
+        # Frames, actions and agents as compressed columnar files, with a frames
+        # index: frame i shows the agents positions at frames_index time[i],
+        # along with the actions until the next frame. Frames can be resampled
+        # every interval ns. The phylogenetic tree goes to lineage.nwk.
+        if format not in [f.value for f in ExportFormats]:
+            raise ValueError(
+                f"Possible export formats: {[f.value for f in ExportFormats]}"
+            )
+        format = ExportFormats(format)
+        os.makedirs(path, exist_ok=True)
+        universe = simulation["universe"]
+
+        # Frames, one row per agent shown in a frame
+        if verbose:
+            print("Computing frames...", end="\t")
+        chunks = list(self.iter_frames(simulation, interval))
+        times = np.array([c[0] for c in chunks], dtype=np.int64)
+        counts = np.array([len(c[1]) for c in chunks], dtype=np.int64)
+        frames = {
+            "frame": np.repeat(np.arange(len(times), dtype=np.int32), counts),
+            "id": np.concatenate([np.empty(0, np.int64)] + [c[1] for c in chunks]),
+            "y": np.concatenate([np.empty(0, np.int32)] + [c[2] for c in chunks]),
+            "x": np.concatenate([np.empty(0, np.int32)] + [c[3] for c in chunks]),
+        }
+        if verbose:
+            print(f": {len(times)} frames")
+
+        # Actions, sorted by time, in the frame they happened during
+        actions = self._get_log(simulation, "actions").to_array()
+        action_offsets = np.searchsorted(actions["time"], times)
+        if len(action_offsets):
+            action_offsets[0] = 0  # Actions preceding the first frame
+        frames_index = {
+            "time": times,
+            "frame_offset": np.cumsum(counts) - counts,
+            "frame_count": counts,
+            "action_offset": action_offsets,
+            "action_count": np.diff(np.append(action_offsets, len(actions))),
+        }
+        actions = {name: actions[name] for name in actions.dtype.names}
+
+        # Agents metadata
+        store = universe.population_store
+        agents = {
+            name: store.column(name)
+            for name in [
+                "id",
+                "generation",
+                "parent",
+                "spawn_date",
+                "start_date",
+                "death_date",
+                "birth_success",
+                "children_count",
+                "travelled_distance",
+                "actions_count",
+            ]
+        }
+        colors = store.column("color")
+        agents.update(r=colors[:, 0], g=colors[:, 1], b=colors[:, 2])
+
+        for name, columns in (
+            ("frames", frames),
+            ("frames_index", frames_index),
+            ("actions", actions),
+            ("agents", agents),
+        ):
+            write_table(path, name, columns, format)
+        if phylogeny:
+            Lineage(store).write_newick(os.path.join(path, "lineage.nwk"))
+        if gui:
+            write_gui_files(
+                path,
+                frames,
+                frames_index,
+                actions,
+                agents,
+                {
+                    "height": universe.height,
+                    "width": universe.width,
+                    "frames_count": len(times),
+                    "agents_count": len(store),
+                    "action_names": ACTION_NAMES,
+                },
+            )
+        if verbose:
+            print(f"Exporting simulation...\t: Done in {path}")
 
     # VISUALIZATION
+    def render(
+        self,
+        simulation: dict,
+        path: str,
+        fps: float = 30,
+        scale: int = 1,
+        interval: int = None,
+        verbose: bool = True,
+    ) -> int:
+        # Video of the run, GIF or any format imageio writes, agents shown with
+        # their phenome color. Frames as in iter_frames, built one at a time by
+        # applying the moves and deaths to a space of ids, and encoded by a
+        # background process. Returns the count of frames.
+        universe = simulation["universe"]
+        frames_times, frames, ids, ys, xs, count = self._get_path_events(
+            simulation, interval
+        )
+        writer = VideoWriter(
+            path, universe.population_store.column("color"), fps=fps, scale=scale
+        )
+        space = np.full((universe.height, universe.width), -1, dtype=np.int32)
+        y = np.full(count, -1, dtype=np.int32)
+        x = np.full(count, -1, dtype=np.int32)
+        bounds = np.searchsorted(frames, np.arange(len(frames_times) + 1))
+        try:
+            for frame in tqdm(
+                range(len(frames_times)),
+                desc="Rendering frames\t",
+                disable=not verbose,
+                colour="magenta",
+            ):
+                # Last event of each agent within the frame
+                events = slice(bounds[frame], bounds[frame + 1])
+                agents, last = np.unique(ids[events][::-1], return_index=True)
+                agents_y, agents_x = ys[events][::-1][last], xs[events][::-1][last]
+
+                shown = agents[y[agents] >= 0]
+                space[y[shown], x[shown]] = -1
+                y[agents], x[agents] = agents_y, agents_x
+                placed = agents_y >= 0
+                space[agents_y[placed], agents_x[placed]] = agents[placed]
+                writer.write(space)
+        finally:
+            writer.close()
+        return writer.frames_count
+
     def plot_generation_stats(self, data):
         # Set up subplots
         fig, axes = plt.subplots(2, 3, figsize=(14, 10))
@@ -376,3 +1395,20 @@ class Lab:
 
         # Show plot
         plt.show()
+
+
+def _summarize_experiment(parameters: dict) -> dict:
+    # Sweep worker: one silent experiment, summarized by its population
+    # statistics as <statistic>_<data> columns
+    lab = Lab()
+    simulation = lab.experiment(**parameters, verbose=False)
+    statistics = lab.get_statistics(simulation, verbose=False)
+    summary = {
+        "agents_count": len(simulation["universe"].population_store),
+        "duration": simulation["timings"]["stop"],
+    }
+    for data, row in statistics["population_statistics"].iterrows():
+        summary.update(
+            {f"{statistic}_{data}": float(value) for statistic, value in row.items()}
+        )
+    return summary
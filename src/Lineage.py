@@ -0,0 +1,145 @@
+import numpy as np
+import pandas as pd
+
+from .PopulationStore import PopulationStore
+
+
+class Lineage:
+    """
+    Genealogy of the population, read over the append-only parent column of
+    the store: children are indexed CSR-style, the children of an agent being
+    children_ids[offsets[id]:offsets[id + 1]], sorted by id. Works on ids only,
+    agents objects can be released once dead.
+    """
+
+    def __init__(self, store: PopulationStore):
+        self.parent: np.ndarray = store.column("parent")
+        self.generation: np.ndarray = store.column("generation")
+        self.spawn_date: np.ndarray = store.column("spawn_date")
+        self.death_date: np.ndarray = store.column("death_date")
+        self.birth_success: np.ndarray = store.column("birth_success")
+
+        # Children grouped by parent, founders (parent -1) sorting first
+        order = np.argsort(self.parent, kind="stable")
+        founders_count = int(np.count_nonzero(self.parent < 0))
+        self.children_ids: np.ndarray = order[founders_count:]
+        self.offsets: np.ndarray = np.zeros(len(self.parent) + 1, dtype=np.int64)
+        np.cumsum(
+            np.bincount(self.parent[self.children_ids], minlength=len(self.parent)),
+            out=self.offsets[1:],
+        )
+
+    # QUERIES
+    @property
+    def founders(self) -> np.ndarray:
+        return np.flatnonzero(self.parent < 0)
+
+    def children(self, id: int) -> np.ndarray:
+        return self.children_ids[self.offsets[id] : self.offsets[id + 1]]
+
+    def _children_of(self, ids: np.ndarray) -> np.ndarray:
+        # Children of several agents at once, concatenated
+        starts, stops = self.offsets[ids], self.offsets[ids + 1]
+        counts = stops - starts
+        positions = np.arange(counts.sum()) + np.repeat(
+            starts - (np.cumsum(counts) - counts), counts
+        )
+        return self.children_ids[positions]
+
+    def ancestors(self, id: int) -> np.ndarray:
+        # From the parent to the founder
+        ancestors = []
+        id = self.parent[id]
+        while id >= 0:
+            ancestors.append(id)
+            id = self.parent[id]
+        return np.array(ancestors, dtype=np.int64)
+
+    def descendants(self, id: int) -> np.ndarray:
+        # Sorted ids, one generation at a time
+        generations = [np.empty(0, dtype=np.int64)]
+        frontier = np.array([id])
+        while frontier.size:
+            frontier = self._children_of(frontier)
+            generations.append(frontier)
+        return np.sort(np.concatenate(generations))
+
+    def is_ancestor(self, ancestor: int, id: int) -> bool:
+        # Ids grow with births, an ancestor is always older
+        id = self.parent[id]
+        while id > ancestor:
+            id = self.parent[id]
+        return id == ancestor
+
+    def founder_of(self) -> np.ndarray:
+        # Founder of every agent, by pointer jumping over the parents
+        founder = np.where(self.parent >= 0, self.parent, np.arange(len(self.parent)))
+        while True:
+            jumped = founder[founder]
+            if np.array_equal(jumped, founder):
+                return founder
+            founder = jumped
+
+    def surviving_descendants(self) -> pd.Series:
+        # Living descendants count of each founder
+        living = (self.death_date < 0) & self.birth_success & (self.parent >= 0)
+        counts = np.bincount(self.founder_of()[living], minlength=len(self.parent))
+        founders = self.founders
+        return pd.Series(counts[founders], index=pd.Index(founders, name="founder"))
+
+    # EXPORT
+    def to_dataframe(self) -> pd.DataFrame:
+        return pd.DataFrame(
+            {
+                "parent": self.parent,
+                "generation": self.generation,
+                "birth_time": self.spawn_date,
+            },
+            index=pd.RangeIndex(len(self.parent), name="id"),
+        )
+
+    def to_newick(self, roots: list = None) -> str:
+        # Phylogenetic tree of the founders, or of the given agents, branches
+        # lengths being the times between births in s. Built iteratively, deep
+        # trees do not reach the recursion limit.
+        roots = self.founders.tolist() if roots is None else list(roots)
+
+        def label(id: int) -> str:
+            parent = self.parent[id]
+            birth = self.spawn_date[id] - (
+                self.spawn_date[parent] if parent >= 0 else 0
+            )
+            return f"a_{id}:{birth / 1e9:g}"
+
+        tokens = []
+        stack = []  # Ids to open, ~id to close, None between siblings
+        for i, root in enumerate(reversed(roots)):
+            if i:
+                stack.append(None)
+            stack.append(root)
+        while stack:
+            item = stack.pop()
+            if item is None:
+                tokens.append(",")
+            elif item < 0:
+                tokens.append(")" + label(~item))
+            else:
+                children = self.children(item)
+                if not children.size:
+                    tokens.append(label(item))
+                    continue
+                tokens.append("(")
+                stack.append(~item)
+                for i, child in enumerate(children[::-1].tolist()):
+                    if i:
+                        stack.append(None)
+                    stack.append(child)
+        tree = "".join(tokens)
+        return f"({tree});" if len(roots) > 1 else f"{tree};"
+
+    def write_newick(self, path: str, roots: list = None) -> None:
+        with open(path, "w") as file:
+            file.write(self.to_newick(roots))
+
+    def __len__(self):
+        return len(self.parent)
@@ -0,0 +1,240 @@
+import threading
+import numpy as np
+from bisect import bisect_left
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from time import perf_counter_ns
+
+from .ActionLog import ACTION_NAMES
+
+COUNTERS = ["births", "deaths", "lock_acquisitions", "lock_contentions", "lock_wait"]
+HISTOGRAMS = ["tick_duration", "round_duration"]
+# Histograms upper bounds in ns, from 1 us to about 1 s
+BUCKETS = [10**3 * 4**k for k in range(11)]
+
+# Layout of a shard: actions by code, counters, then for each histogram its
+# buckets counts (the last one unbounded) and the sum of the observations
+ACTIONS_OFFSET = 0
+COUNTERS_OFFSET = len(ACTION_NAMES)
+HISTOGRAMS_OFFSET = COUNTERS_OFFSET + len(COUNTERS)
+HISTOGRAM_SIZE = len(BUCKETS) + 2
+SHARD_SIZE = HISTOGRAMS_OFFSET + len(HISTOGRAMS) * HISTOGRAM_SIZE
+COUNTERS_INDEX = {name: COUNTERS_OFFSET + i for i, name in enumerate(COUNTERS)}
+HISTOGRAMS_INDEX = {
+    name: HISTOGRAMS_OFFSET + i * HISTOGRAM_SIZE for i, name in enumerate(HISTOGRAMS)
+}
+
+
+class Sharded:
+    """
+    Counters of which every thread increments its own shard, without locking,
+    readers sum the shards. Readable from any thread while running. Threads
+    retire their shard once over, shards follow the live threads only.
+    """
+
+    def __init__(self, size: int):
+        self.size: int = size
+        self.shards_lock: threading.Lock = threading.Lock()
+        self.shards: dict = {}  # id -> shard of a live thread
+        self.retired: np.ndarray = np.zeros(size, np.int64)  # Finished threads sum
+        self.local = threading.local()
+
+    def _shard(self) -> list:
+        shard = getattr(self.local, "shard", None)
+        if shard is None:
+            shard = self.local.shard = [0] * self.size
+            with self.shards_lock:
+                self.shards[id(shard)] = shard
+        return shard
+
+    def retire(self) -> None:
+        # Folds the shard of the calling thread into the retired total, only
+        # its own thread writing it
+        shard = getattr(self.local, "shard", None)
+        if shard is None:
+            return
+        self.local.shard = None
+        with self.shards_lock:
+            self.retired += shard
+            del self.shards[id(shard)]
+
+    def totals(self) -> np.ndarray:
+        with self.shards_lock:
+            shards = list(self.shards.values())
+            retired = self.retired.copy()
+        return retired + np.sum(shards, axis=0, dtype=np.int64) if shards else retired
+
+
+class Metrics(Sharded):
+    """
+    Live metrics of a run
+    """
+
+    def __init__(self):
+        super().__init__(SHARD_SIZE)
+        self.start: int = perf_counter_ns()
+        self.previous: tuple = (self.start, np.zeros(len(ACTION_NAMES)))
+        self.server: ThreadingHTTPServer = None
+
+    # UPDATES
+    def count_action(self, code: int) -> None:
+        self._shard()[ACTIONS_OFFSET + code] += 1
+
+    def count_actions(self, codes: np.ndarray) -> None:
+        # Batch of actions codes
+        shard = self._shard()
+        for code, n in enumerate(np.bincount(codes, minlength=len(ACTION_NAMES))):
+            shard[ACTIONS_OFFSET + code] += int(n)
+
+    def count(self, name: str, n: int = 1) -> None:
+        self._shard()[COUNTERS_INDEX[name]] += n
+
+    def observe(self, name: str, duration: int) -> None:
+        # Duration in ns
+        shard = self._shard()
+        offset = HISTOGRAMS_INDEX[name]
+        shard[offset + bisect_left(BUCKETS, duration)] += 1
+        shard[offset + HISTOGRAM_SIZE - 1] += duration
+
+    # READING
+    def snapshot(self) -> dict:
+        # Current values, actions rates being measured since the previous snapshot
+        totals = self.totals()
+        now = perf_counter_ns()
+        actions = totals[ACTIONS_OFFSET:COUNTERS_OFFSET]
+        then, previous_actions = self.previous
+        self.previous = (now, actions)
+        counters = {name: int(totals[i]) for name, i in COUNTERS_INDEX.items()}
+        return {
+            "uptime": (now - self.start) / 1e9,
+            "actions": dict(zip(ACTION_NAMES, actions.tolist())),
+            "actions_per_second": dict(
+                zip(
+                    ACTION_NAMES,
+                    ((actions - previous_actions) / max(now - then, 1) * 1e9).tolist(),
+                )
+            ),
+            "population": counters["births"] - counters["deaths"],
+            **counters,
+            "histograms": {
+                name: totals[i : i + HISTOGRAM_SIZE].tolist()
+                for name, i in HISTOGRAMS_INDEX.items()
+            },
+        }
+
+    def to_prometheus(self) -> str:
+        # Prometheus text exposition format
+        snapshot = self.snapshot()
+        lines = []
+
+        def metric(name: str, kind: str, help: str, samples: list) -> None:
+            lines.append(f"# HELP gamasi_{name} {help}")
+            lines.append(f"# TYPE gamasi_{name} {kind}")
+            for labels, value in samples:
+                lines.append(f"gamasi_{name}{labels} {value}")
+
+        metric(
+            "actions_total",
+            "counter",
+            "Actions performed, by action.",
+            [('{action="%s"}' % a, n) for a, n in snapshot["actions"].items()],
+        )
+        metric(
+            "actions_per_second",
+            "gauge",
+            "Actions per second since the previous scrape, by action.",
+            [
+                ('{action="%s"}' % a, f"{r:.3f}")
+                for a, r in snapshot["actions_per_second"].items()
+            ],
+        )
+        metric("population", "gauge", "Living agents.", [("", snapshot["population"])])
+        metric("births_total", "counter", "Agents born.", [("", snapshot["births"])])
+        metric("deaths_total", "counter", "Agents dead.", [("", snapshot["deaths"])])
+        metric(
+            "lock_acquisitions_total",
+            "counter",
+            "Space locks acquired.",
+            [("", snapshot["lock_acquisitions"])],
+        )
+        metric(
+            "lock_contentions_total",
+            "counter",
+            "Space locks acquisitions that had to wait.",
+            [("", snapshot["lock_contentions"])],
+        )
+        metric(
+            "lock_wait_seconds_total",
+            "counter",
+            "Time spent waiting for space locks.",
+            [("", snapshot["lock_wait"] / 1e9)],
+        )
+        for name, values in snapshot["histograms"].items():
+            cumulated = np.cumsum(values[:-1]).tolist()
+            metric(
+                f"{name}_seconds",
+                "histogram",
+                f"Distribution of the {name.replace('_', ' ')}s.",
+                [('{le="%g"}' % (b / 1e9), c) for b, c in zip(BUCKETS, cumulated)]
+                + [('{le="+Inf"}', cumulated[-1])],
+            )
+            lines.append(f"gamasi_{name}_seconds_sum {values[-1] / 1e9}")
+            lines.append(f"gamasi_{name}_seconds_count {cumulated[-1]}")
+        return "\n".join(lines) + "\n"
+
+    # ENDPOINT
+    def serve(self, port: int = 0) -> int:
+        # Serves the metrics on localhost, returns the port
+        metrics = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                body = metrics.to_prometheus().encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self.server.server_address[1]
+
+    def close(self) -> None:
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+
+
+class MeasuredLock:
+    """
+    Space lock counting its acquisitions, contentions and waiting time
+    """
+
+    __slots__ = ("lock", "metrics", "profiler")
+
+    def __init__(self, lock: threading.Lock, metrics: Metrics, profiler=None):
+        self.lock = lock
+        self.metrics = metrics
+        self.profiler = profiler
+
+    def __enter__(self):
+        wait = 0
+        if not self.lock.acquire(blocking=False):
+            start = perf_counter_ns()
+            self.lock.acquire()
+            wait = perf_counter_ns() - start
+            if self.metrics is not None:
+                self.metrics.count("lock_wait", wait)
+                self.metrics.count("lock_contentions")
+        if self.metrics is not None:
+            self.metrics.count("lock_acquisitions")
+        if self.profiler is not None:
+            self.profiler.observe("lock_wait", wait)
+        return self
+
+    def __exit__(self, *args):
+        self.lock.release()
@@ -0,0 +1,115 @@
+import numpy as np
+from enum import Enum
+
+
+class Noises(Enum):
+    gaussian = "gaussian"  # value + strength * N(0, 1)
+    lognormal = "lognormal"  # value * exp(strength * N(0, 1)), keeps the sign
+    uniform = "uniform"  # value + strength * U(-1, 1)
+
+
+# Mutable traits, genome columns of the population store, with their default
+# noise and strength
+TRAITS = {
+    "reaction_time": (Noises.lognormal, 0.1),
+    "speed": (Noises.lognormal, 0.1),
+    "energy_capacity": (Noises.lognormal, 0.1),
+    "scope": (Noises.gaussian, 0.5),  # Cells
+    "color": (Noises.gaussian, 8.0),  # Channel levels
+    "weights": (Noises.gaussian, 0.02),  # Normalized weights
+}
+
+
+class Mutation:
+    """
+    Mutation of the offspring genomes. Each gene (trait value, color channel
+    or brain weight) mutates with probability rate, by a noise of its trait
+    scaled by strength. Genomes are batches of genome columns, one row per
+    newborn, all the noise of a batch being drawn at once.
+    """
+
+    def __init__(self, rate: float = 0.1, strength: float = 1.0, traits: dict = None):
+        # Traits settings override the defaults: trait -> noise, strength, rate
+        traits = traits if traits is not None else {}
+        if any(trait not in TRAITS for trait in traits):
+            raise ValueError(f"Possible traits: {list(TRAITS)}")
+        self.rate: float = rate
+        self.strength: float = strength
+        self.traits: dict = {}
+        for trait, (noise, trait_strength) in TRAITS.items():
+            settings = traits.get(trait, {})
+            noise = settings.get("noise", noise.value)
+            if noise not in [n.value for n in Noises]:
+                raise ValueError(f"Possible noises: {[n.value for n in Noises]}")
+            self.traits[trait] = {
+                "noise": Noises(noise),
+                "strength": settings.get("strength", trait_strength * strength),
+                "rate": settings.get("rate", rate),
+            }
+
+    def mutate(
+        self, genomes: dict, rng: np.random.Generator, max_scope: int = None
+    ) -> dict:
+        # Mutated copies of the genome columns, of all the traits or some of
+        # them, scopes being bounded by max_scope
+        mutated = {}
+        for trait, settings in self.traits.items():
+            if trait not in genomes:
+                continue
+            values = np.asarray(genomes[trait])
+            genes = values.astype(np.float64)
+            mutating = rng.random(genes.shape) < settings["rate"]
+            strength = settings["strength"]
+            match settings["noise"]:
+                case Noises.gaussian:
+                    genes += mutating * strength * rng.standard_normal(genes.shape)
+                case Noises.lognormal:
+                    genes *= np.exp(
+                        mutating * strength * rng.standard_normal(genes.shape)
+                    )
+                case Noises.uniform:
+                    genes += mutating * strength * rng.uniform(-1, 1, genes.shape)
+            mutated[trait] = genes
+        return self._bound(mutated, genomes, max_scope)
+
+    def _bound(self, mutated: dict, genomes: dict, max_scope: int) -> dict:
+        # Back to valid values and to the dtypes of the genomes
+        if "scope" in mutated:
+            mutated["scope"] = np.clip(np.rint(mutated["scope"]), 1, max_scope)
+        if "color" in mutated:
+            mutated["color"] = np.clip(np.rint(mutated["color"]), 0, 255)
+        if "weights" in mutated:  # Normalized, uniform when all vanished
+            weights = np.clip(mutated["weights"], 0, None)
+            totals = weights.sum(axis=-1, keepdims=True)
+            normalized = np.where(
+                totals > 0,
+                weights / np.where(totals > 0, totals, 1),
+                1 / weights.shape[-1],
+            )
+            # Unmutated rows kept as is, normalizing them again would drift
+            unchanged = (mutated["weights"] == genomes["weights"]).all(
+                axis=-1, keepdims=True
+            )
+            mutated["weights"] = np.where(unchanged, mutated["weights"], normalized)
+        return {
+            trait: genes.astype(np.asarray(genomes[trait]).dtype)
+            for trait, genes in mutated.items()
+        }
+
+    def to_dict(self) -> dict:
+        return {
+            "rate": self.rate,
+            "strength": self.strength,
+            "traits": {
+                trait: {**settings, "noise": settings["noise"].value}
+                for trait, settings in self.traits.items()
+            },
+        }
+
+    def __repr__(self):
+        # Stable, sweeps cache results by it
+        return (
+            "Mutation("
+            + ", ".join(f"{k}={v!r}" for k, v in self.to_dict().items())
+            + ")"
+        )
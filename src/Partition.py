@@ -0,0 +1,322 @@
+import multiprocessing as mp
+import numpy as np
+from multiprocessing.shared_memory import SharedMemory
+from threading import BrokenBarrierError
+from time import sleep
+
+from .ActionLog import ActionLog, MoveLog
+from .Clock import WallClock
+from .Engine import VectorizedEngine
+from .Mutation import Mutation
+from .PopulationStore import PopulationStore, COLUMNS
+from .Universe import Universe
+
+
+def _attach(name: str = None, size: int = 0) -> SharedMemory:
+    # Create a block, or attach an existing one. Only the creator unlinks it.
+    if name is None:
+        return SharedMemory(create=True, size=max(size, 1))
+    return SharedMemory(name=name)
+
+
+class SharedPopulationStore(PopulationStore):
+    """
+    Population store with a fixed capacity, its columns living in shared memory.
+    Rows are reserved through a counter shared by every process.
+    """
+
+    def __init__(self, capacity: int, names: dict = None, counter=None):
+        self.capacity: int = capacity
+        self.counter = counter if counter is not None else mp.Value("q", 0)
+        self.lock = self.counter.get_lock()
+        self.blocks: dict = {}
+        for name, (dtype, shape, fill) in COLUMNS.items():
+            shape = (capacity, *shape)
+            block = _attach(
+                None if names is None else names[name],
+                int(np.prod(shape)) * np.dtype(dtype).itemsize,
+            )
+            column = np.ndarray(shape, dtype=dtype, buffer=block.buf)
+            if names is None:
+                column[:] = fill
+            self.blocks[name] = block
+            setattr(self, name, column)
+
+    @property
+    def count(self) -> int:
+        return self.counter.value
+
+    @count.setter
+    def count(self, value: int) -> None:
+        self.counter.value = value
+
+    @property
+    def names(self) -> dict:
+        return {name: block.name for name, block in self.blocks.items()}
+
+    def _grow(self, capacity: int) -> None:
+        raise MemoryError(f"Shared population store is full: {self.capacity} agents")
+
+    def close(self, unlink: bool = False) -> None:
+        for name in COLUMNS:
+            setattr(self, name, None)
+        for block in self.blocks.values():
+            block.close()
+            if unlink:
+                block.unlink()
+
+
+class PartitionWorker(VectorizedEngine):
+    """
+    Vectorized engine restricted to the agents standing in a band of rows.
+    Agents crossing the band edges are picked up by the neighbouring worker
+    through the shared space.
+    """
+
+    def __init__(self, universe: Universe, start: int, stop: int, **kwargs):
+        super().__init__(universe, **kwargs)
+        self.start, self.stop = start, stop
+        self.active: np.ndarray = np.empty(0, dtype=np.int64)
+
+    def select(self) -> int:
+        # Agents of the band before any phase of the tick, agents moving or born
+        # into a later phase band acting on the next tick only. Returns their count.
+        band = self.space[self.start : self.stop]
+        self.active = np.sort(band[band >= 0]).astype(np.int64)
+        return self.active.size
+
+    def _get_active(self) -> np.ndarray:
+        # Eaten agents stay in the space, they are dropped once dead only
+        return self.active[self.store.alive[self.active]]
+
+
+def get_bands(height: int, workers: int) -> tuple[list, list]:
+    # Rows bounds and phase of each band, adjacent bands never sharing a phase.
+    # Bands are at least 2 rows high so that same phase bands never reach the
+    # same cell (moves, eats and births have a radius of 1).
+    assert height >= 2 * workers
+    bounds = np.linspace(0, height, workers + 1).astype(int)
+    phases = [i % 2 for i in range(workers)]
+    if workers > 1 and workers % 2:
+        phases[-1] = 2  # Torus with an odd count of bands
+    return list(zip(bounds[:-1], bounds[1:])), phases
+
+
+def _work(
+    index: int,
+    capacity: int,
+    band: tuple[int, int],
+    phase: int,
+    phases_count: int,
+    height: int,
+    width: int,
+    genesis: int,
+    deadline: int,
+    space_name: str,
+    store_names: dict,
+    counter,
+    barrier,
+    running,
+    populations,
+    results,
+    rng: np.random.Generator,
+    streaming: bool,
+    mutation: Mutation,
+) -> None:
+    space_block = _attach(space_name)
+    store = SharedPopulationStore(capacity, store_names, counter)
+    universe = Universe(height=height, width=width, clock=WallClock(genesis))
+    universe.space = np.ndarray((height, width), dtype=np.int32, buffer=space_block.buf)
+    universe.population_store = store
+    universe.mutation = mutation
+    worker = PartitionWorker(universe, *band, rng=rng)
+    if streaming:  # Logs chunks are forwarded to the sinks of the parent
+        worker.log.on_flush = lambda array: results.put(("actions", array))
+        worker.moves.on_flush = lambda array: results.put(("moves", array))
+
+    error = None
+    ticks = 0
+    try:
+        worker.select()
+        barrier.wait()  # Workers start at different times
+        while True:
+            for p in range(phases_count):
+                if p == phase:
+                    worker.step()
+                barrier.wait()
+            # Space is still until the next tick, its agents are selected now
+            populations[index] = worker.select()
+            barrier.wait()
+            if index == 0:  # A tick gives birth to one agent per cell at most
+                running.value = (
+                    universe.get_time() < deadline
+                    and sum(populations[:]) > 0
+                    and store.count + height * width <= capacity
+                )
+            barrier.wait()
+            ticks += 1
+            if not running.value:
+                break
+    except BrokenBarrierError:
+        pass  # Another worker failed
+    except Exception as e:
+        error = repr(e)
+        barrier.abort()
+
+    worker.flush()
+    results.put(
+        ("result", index, ticks, worker.log.to_array(), worker.moves.to_array(), error)
+    )
+    worker.space = universe.space = None
+    store.close()
+    space_block.close()
+
+
+class PartitionedSimulation:
+    """
+    Runs the vectorized engine over a torus split in bands of rows, one worker
+    process per band. Space and population are shared, the results are merged
+    back into a regular universe.
+    """
+
+    def __init__(
+        self,
+        universe: Universe,
+        workers: int,
+        population_capacity: int,
+        rng: np.random.Generator = None,
+        sinks: list = None,
+    ):
+        self.universe = universe
+        self.rng = rng if rng is not None else np.random.default_rng()
+        self.sinks = sinks
+        self.bands, self.phases = get_bands(universe.height, workers)
+        self.space_block = _attach(size=universe.space.nbytes)
+        self.space = np.ndarray(
+            universe.space.shape, dtype=np.int32, buffer=self.space_block.buf
+        )
+        self.space[:] = universe.space
+        self.store = SharedPopulationStore(population_capacity)
+
+        # Engine of the parent process, used to invoke and merge the population
+        self.shared_universe = Universe(
+            height=universe.height, width=universe.width, clock=universe.clock
+        )
+        self.shared_universe.space = self.space
+        self.shared_universe.population_store = self.store
+        self.engine = VectorizedEngine(
+            self.shared_universe, rng=self.rng, sinks=self.sinks
+        )
+        self.ticks = 0
+        self.full = False
+
+    def spawn_initial_population(self, positions: np.ndarray) -> None:
+        self.engine.spawn_initial_population(positions)
+
+    @property
+    def population_count(self) -> int:
+        return self.engine.population_count
+
+    def run(self, deadline: int, progress=None) -> None:
+        workers = len(self.bands)
+        barrier = mp.Barrier(workers)
+        running = mp.Value("b", True)
+        populations = mp.Array("q", workers)
+        results = mp.Queue()
+        rngs = self.rng.spawn(workers)  # One stream per worker
+        processes = [
+            mp.Process(
+                target=_work,
+                args=(
+                    index,
+                    self.store.capacity,
+                    band,
+                    phase,
+                    max(self.phases) + 1,
+                    self.universe.height,
+                    self.universe.width,
+                    self.universe.clock.genesis,
+                    deadline,
+                    self.space_block.name,
+                    self.store.names,
+                    self.store.counter,
+                    barrier,
+                    running,
+                    populations,
+                    results,
+                    rngs[index],
+                    bool(self.sinks),
+                    self.universe.mutation,
+                ),
+                daemon=True,
+            )
+            for index, (band, phase) in enumerate(zip(self.bands, self.phases))
+        ]
+        for process in processes:
+            process.start()
+
+        # Results are collected before joining, queues are not flushed otherwise.
+        # Streamed logs chunks go through the same queue, ahead of the results.
+        outputs = []
+        while len(outputs) < workers:
+            if progress is not None:
+                progress()
+            if not results.empty():
+                kind, *output = results.get()
+                if kind == "result":
+                    outputs.append(output)
+                else:
+                    for sink in self.sinks:
+                        sink.submit(kind, output[0])
+            elif not any(p.is_alive() for p in processes) and results.empty():
+                raise RuntimeError("Partition workers exited without results")
+            else:
+                sleep(1e-2)
+        for process in processes:
+            process.join()
+
+        errors = [f"worker {o[0]}: {o[4]}" for o in outputs if o[4] is not None]
+        if errors:
+            raise RuntimeError(f"Partitioned simulation failed, {errors}")
+        self.ticks += max(o[1] for o in outputs)
+        # Stopped early, the next tick could have overflowed the shared store
+        self.full = (
+            self.store.count + self.universe.height * self.universe.width
+            > self.store.capacity
+            and self.universe.get_time() < deadline
+        )
+
+        # Logs of migrating agents are spread over workers, merged by time
+        if self.sinks:
+            self.engine.flush()
+        else:
+            self.engine.log = ActionLog.merge(
+                [self.engine.log] + [ActionLog.from_array(o[2]) for o in outputs]
+            )
+            self.engine.moves = MoveLog.merge(
+                [self.engine.moves] + [MoveLog.from_array(o[3]) for o in outputs]
+            )
+
+    def grow(self, capacity: int) -> None:
+        # Moves the population into a larger shared store, between runs only
+        store = SharedPopulationStore(capacity)
+        count = self.store.count
+        for name in COLUMNS:
+            getattr(store, name)[:count] = getattr(self.store, name)[:count]
+        store.count = count
+        self.store.close(unlink=True)
+        self.store = self.shared_universe.population_store = self.engine.store = store
+        self.full = False
+
+    def merge(self) -> None:
+        # Copy the shared state into the universe, then release shared memory
+        self.universe.space[:] = self.space
+        self.universe.population_store = self.store.copy()
+        engine = VectorizedEngine(self.universe)
+        engine.log, engine.moves = self.engine.log, self.engine.moves
+        engine.publish()
+
+        self.engine.space = self.shared_universe.space = self.space = None
+        self.store.close(unlink=True)
+        self.space_block.close()
+        self.space_block.unlink()
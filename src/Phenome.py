@@ -1,6 +1,6 @@
-from random import randint
+import numpy as np
 
-from .Brain import Brain
+from .Brain import Brain, default_rng
 
 
 class Phenome:
@@ -12,29 +12,56 @@ class Phenome:
         scope: int = 3,
         color: tuple = None,
         brain: Brain = None,
+        rng: np.random.Generator = None,
     ):
+        rng = rng if rng is not None else default_rng
         self.reaction_time: float = reaction_time
         self.speed: int = speed
         self.energy_capacity: int = energy_capacity
         self.scope: int = scope
         self.color: tuple = (
-            color if color else (randint(5, 252), randint(5, 252), randint(5, 252))
+            color if color else tuple(rng.integers(5, 253, size=3).tolist())
         )
-        self.brain: Brain = brain if brain else Brain()
+        self.brain: Brain = brain if brain else Brain(rng=rng)
 
-    def copy(self):
+    def copy(self, rng: np.random.Generator = None):
         return Phenome(
             reaction_time=self.reaction_time,
             speed=self.speed,
             energy_capacity=self.energy_capacity,
             scope=self.scope,
             color=self.color,
-            brain=self.brain.copy(),
+            brain=self.brain.copy(rng=rng),
         )
 
-    def mutate(self):
-        # TODO
-        pass
+    def genome(self) -> dict:
+        # Traits as genome columns of one row, see Mutation
+        return {
+            "reaction_time": np.array([self.reaction_time]),
+            "speed": np.array([self.speed]),
+            "energy_capacity": np.array([self.energy_capacity]),
+            "scope": np.array([self.scope]),
+            "color": np.array([self.color], dtype=np.uint8),
+            "weights": np.array([self.brain.weights]),
+        }
+
+    @classmethod
+    def from_genome(cls, genome: dict, rng: np.random.Generator = None):
+        return cls(
+            reaction_time=genome["reaction_time"][0].item(),
+            speed=genome["speed"][0].item(),
+            energy_capacity=genome["energy_capacity"][0].item(),
+            scope=genome["scope"][0].item(),
+            color=tuple(genome["color"][0].tolist()),
+            brain=Brain(weights=genome["weights"][0].tolist(), rng=rng),
+        )
+
+    def mutate(self, mutation, rng: np.random.Generator = None, max_scope: int = None):
+        # Mutated copy, see Mutation
+        genome = mutation.mutate(
+            self.genome(), rng if rng is not None else default_rng, max_scope
+        )
+        return Phenome.from_genome(genome, rng=rng)
 
     def to_dict(self):  # TODO refactor
         return {
@@ -0,0 +1,176 @@
+import threading
+import numpy as np
+import pandas as pd
+
+from .Brain import Abilities, Brain
+from .Phenome import Phenome
+from .Position import Position
+
+# Columns: dtype, row shape and fill value
+COLUMNS = {
+    "id": (np.int64, (), -1),
+    "generation": (np.int32, (), 0),
+    "parent": (np.int64, (), -1),  # -1 for the universe
+    "energy": (np.float32, (), 0),
+    "y": (np.int32, (), 0),
+    "x": (np.int32, (), 0),
+    "spawn_date": (np.int64, (), -1),
+    "start_date": (np.int64, (), -1),
+    "death_date": (np.int64, (), -1),
+    "birth_success": (bool, (), False),
+    "children_count": (np.int32, (), 0),
+    "travelled_distance": (np.int32, (), 0),
+    "actions_count": (np.int32, (), 0),
+    # Phenome
+    "reaction_time": (np.float64, (), 0),
+    "speed": (np.float32, (), 0),
+    "energy_capacity": (np.float32, (), 0),
+    "scope": (np.int16, (), 0),
+    "color": (np.uint8, (3,), 0),
+    "weights": (np.float32, (len(Abilities),), 0),
+}
+DATE_COLUMNS = ["spawn_date", "start_date", "death_date"]
+
+
+class PopulationStore:
+    """
+    Columnar storage of the population, one row per agent ever spawned.
+    Row index and agent id are the same.
+    """
+
+    def __init__(self, capacity: int = 1024):
+        self.lock: threading.Lock = threading.Lock()
+        self.count: int = 0
+        self.capacity: int = 0
+        self._grow(capacity)
+
+    def _grow(self, capacity: int) -> None:
+        for name, (dtype, shape, fill) in COLUMNS.items():
+            column = np.full((capacity, *shape), fill, dtype=dtype)
+            if self.capacity:
+                column[: self.count] = getattr(self, name)[: self.count]
+            setattr(self, name, column)
+        self.capacity = capacity
+
+    def append(self, n: int = 1, **values) -> np.ndarray:
+        # Reserve n rows filled with values, returns their ids
+        with self.lock:
+            if self.count + n > self.capacity:
+                self._grow(max(2 * self.capacity, self.count + n))
+            ids = np.arange(self.count, self.count + n)
+            self.count += n
+            self.id[ids] = ids
+            for name, value in values.items():
+                getattr(self, name)[ids] = value
+        return ids
+
+    def append_phenome(self, phenome: Phenome, **values) -> int:
+        # Single row from a phenome object
+        return int(
+            self.append(
+                reaction_time=phenome.reaction_time,
+                speed=phenome.speed,
+                energy_capacity=phenome.energy_capacity,
+                scope=phenome.scope,
+                color=phenome.color,
+                weights=phenome.brain.weights,
+                **values,
+            )[0]
+        )
+
+    def update(self, id: int, **values) -> None:
+        with self.lock:
+            for name, value in values.items():
+                getattr(self, name)[id] = value
+
+    def column(self, name: str) -> np.ndarray:
+        # View over the used rows
+        return getattr(self, name)[: self.count]
+
+    @property
+    def alive(self) -> np.ndarray:
+        return self.column("death_date") < 0
+
+    def to_dataframe(self) -> pd.DataFrame:
+        data = {
+            name: self.column(name)
+            for name, (_, shape, _) in COLUMNS.items()
+            if not shape
+        }
+        data["color"] = [tuple(c) for c in self.column("color").tolist()]
+        return pd.DataFrame(data).set_index("id")
+
+    def copy(self):
+        # In memory copy of the used rows
+        store = PopulationStore(capacity=max(self.count, 1))
+        for name in COLUMNS:
+            getattr(store, name)[: self.count] = self.column(name)
+        store.count = self.count
+        return store
+
+    def __getitem__(self, id: int):
+        return AgentView(self, id)
+
+    def __iter__(self):
+        return (AgentView(self, id) for id in range(self.count))
+
+    def __len__(self):
+        return self.count
+
+    @property
+    def nbytes(self) -> int:
+        return sum(getattr(self, name).nbytes for name in COLUMNS)
+
+
+class AgentView:
+    """
+    Lightweight agent, read over a row of the population store
+    """
+
+    __slots__ = ("store", "id")
+
+    def __init__(self, store: PopulationStore, id: int):
+        self.store = store
+        self.id = id
+
+    def __getattr__(self, name: str):
+        if name not in COLUMNS:
+            raise AttributeError(name)
+        value = getattr(self.store, name)[self.id]
+        if name in DATE_COLUMNS:
+            return None if value < 0 else int(value)
+        return value.tolist() if isinstance(value, np.ndarray) else value.item()
+
+    @property
+    def position(self) -> Position:
+        return Position(y=self.y, x=self.x)
+
+    @property
+    def phenome(self) -> Phenome:
+        return Phenome(
+            reaction_time=self.reaction_time,
+            speed=self.speed,
+            energy_capacity=self.energy_capacity,
+            scope=self.scope,
+            color=tuple(self.color),
+            brain=Brain(weights=self.weights),
+        )
+
+    def to_dict(self, children: list = None) -> dict:
+        # Children can be given when already grouped by the caller
+        if children is None:
+            children = np.flatnonzero(self.store.column("parent") == self.id).tolist()
+        data = {
+            "id": self.id,
+            "generation": self.generation,
+            "parents": [] if self.parent < 0 else [self.parent],
+            "start_date": self.start_date,
+            "death_date": self.death_date,
+            "children": children,
+            "birth_success": self.birth_success,
+        }
+        data.update(self.phenome.to_dict())
+        return data
+
+    def __repr__(self):
+        return f"a_{self.id}"
@@ -0,0 +1,115 @@
+import os
+import sys
+import json
+import threading
+import numpy as np
+import pandas as pd
+from bisect import bisect_left
+from collections import Counter
+from time import sleep
+
+from .Metrics import Sharded, BUCKETS, HISTOGRAM_SIZE
+
+# Phases of an agent lifetime loop iteration, then space locks waits within actions
+PHASES = ["sleep", "perception", "decision", "action", "lock_wait"]
+PHASES_INDEX = {phase: i * HISTOGRAM_SIZE for i, phase in enumerate(PHASES)}
+
+
+class Profiler(Sharded):
+    """
+    Opt-in per phase durations histograms of the agents loop, and a sampling
+    profiler of the threads stacks that can be started and stopped at will
+    """
+
+    def __init__(self, sampling_interval: float = 1e-3):
+        super().__init__(len(PHASES) * HISTOGRAM_SIZE)
+        self.sampling_interval: float = sampling_interval
+        self.samples: Counter = Counter()  # Collapsed stack -> samples count
+        self.sampling: threading.Event = threading.Event()
+        self.sampler: threading.Thread = None
+
+    # PHASES
+    def observe(self, phase: str, duration: int) -> None:
+        # Duration in ns
+        shard = self._shard()
+        offset = PHASES_INDEX[phase]
+        shard[offset + bisect_left(BUCKETS, duration)] += 1
+        shard[offset + HISTOGRAM_SIZE - 1] += duration
+
+    def observe_round(self, marks: list) -> None:
+        # Consecutive times separating the loop phases, from sleep to action
+        for phase, start, stop in zip(PHASES, marks, marks[1:]):
+            self.observe(phase, stop - start)
+
+    def histograms(self) -> dict:
+        # Phase -> buckets counts, the last bucket being unbounded, and sum in ns
+        totals = self.totals()
+        return {
+            phase: {
+                "counts": totals[i : i + HISTOGRAM_SIZE - 1].tolist(),
+                "sum": int(totals[i + HISTOGRAM_SIZE - 1]),
+            }
+            for phase, i in PHASES_INDEX.items()
+        }
+
+    def summary(self) -> pd.DataFrame:
+        # Durations per phase in ns, quantiles being buckets upper bounds
+        bounds = np.array(BUCKETS + [np.inf])
+        rows = {}
+        for phase, histogram in self.histograms().items():
+            counts = np.array(histogram["counts"])
+            count = int(counts.sum())
+            cumulated = np.cumsum(counts)
+            rows[phase] = {
+                "count": count,
+                "total": histogram["sum"],
+                "mean": histogram["sum"] / count if count else None,
+                **{
+                    f"p{int(q * 100)}": (
+                        bounds[np.searchsorted(cumulated, q * count)] if count else None
+                    )
+                    for q in (0.5, 0.9, 0.99)
+                },
+            }
+        return pd.DataFrame.from_dict(rows, orient="index")
+
+    # SAMPLING
+    def start_sampling(self) -> None:
+        if self.sampler is not None:
+            return
+        self.sampling.set()
+        self.sampler = threading.Thread(target=self._sample, daemon=True)
+        self.sampler.start()
+
+    def stop_sampling(self) -> None:
+        if self.sampler is None:
+            return
+        self.sampling.clear()
+        self.sampler.join()
+        self.sampler = None
+
+    def _sample(self) -> None:
+        # Stacks of all the other threads, every sampling interval
+        own = threading.get_ident()
+        while self.sampling.is_set():
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                    frame = frame.f_back
+                self.samples[";".join(reversed(stack))] += 1
+            sleep(self.sampling_interval)
+
+    # DUMP
+    def dump(self, path: str) -> None:
+        # Phases histograms as JSON, and samples as collapsed stacks next to it,
+        # readable by flame graph tools
+        with open(path, "w") as file:
+            json.dump({"buckets": BUCKETS, "phases": self.histograms()}, file, indent=2)
+        if self.samples:
+            with open(f"{os.path.splitext(path)[0]}.stacks", "w") as file:
+                for stack, count in self.samples.most_common():
+                    file.write(f"{stack} {count}\n")
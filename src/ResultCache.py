@@ -0,0 +1,53 @@
+import os
+import json
+import hashlib
+import numpy as np
+
+
+def _encode(value):
+    # JSON fallback, arrays by the hash of their content
+    if isinstance(value, np.ndarray):
+        data = np.ascontiguousarray(value)
+        return f"array:{data.dtype}:{data.shape}:{hashlib.sha1(data.tobytes()).hexdigest()}"
+    if isinstance(value, np.generic):
+        return value.item()
+    return repr(value)
+
+
+class ResultCache:
+    """
+    On-disk results of experiments, one JSON file per run keyed by the hash of
+    its parameters, seed included. Files are written aside then moved, a sweep
+    interrupted at any point leaves only complete results.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+
+    @staticmethod
+    def key(parameters: dict) -> str:
+        encoded = json.dumps(parameters, sort_keys=True, default=_encode)
+        return hashlib.sha1(encoded.encode()).hexdigest()
+
+    def _file(self, parameters: dict) -> str:
+        return os.path.join(self.path, f"{self.key(parameters)}.json")
+
+    def get(self, parameters: dict) -> dict:
+        # Cached result, None when the run is not done yet
+        try:
+            with open(self._file(parameters)) as file:
+                return json.load(file)["result"]
+        except FileNotFoundError:
+            return None
+
+    def put(self, parameters: dict, result: dict) -> None:
+        path = self._file(parameters)
+        with open(f"{path}.tmp", "w") as file:
+            json.dump(
+                {"parameters": parameters, "result": result}, file, default=_encode
+            )
+        os.replace(f"{path}.tmp", path)
+
+    def __contains__(self, parameters: dict) -> bool:
+        return os.path.exists(self._file(parameters))
@@ -0,0 +1,245 @@
+import heapq
+import threading
+import numpy as np
+from time import perf_counter_ns
+from concurrent.futures import ThreadPoolExecutor
+
+from .ActionLog import ActionLog, MoveLog
+from .Agent import Agent
+from .Clock import VirtualClock
+from .Engine import AgentRecord
+from .Lineage import Lineage
+from .Snapshot import Snapshot
+from .Universe import Universe
+
+# Scheduled agents of a snapshot
+QUEUE_DTYPE = np.dtype([("slot", np.int64), ("id", np.int64), ("due", np.int64)])
+
+
+class TurnScheduler:
+    """
+    Deterministic scheduling of agents threads: agents act one at a time, by
+    rounds, in the order of their ids. Newborns join the next round.
+    """
+
+    pooled = False  # Agents run their own thread
+
+    def __init__(self, universe: Universe):
+        self.universe = universe
+        self.condition: threading.Condition = threading.Condition()
+        self.turn: int = None  # Id of the agent allowed to act
+
+    def wait_turn(self, agent) -> bool:
+        # Blocks the agent until its turn, returns False if the universe froze
+        with self.condition:
+            self.condition.wait_for(
+                lambda: self.turn == agent.id or self.universe.freeze.is_set()
+            )
+            return not self.universe.freeze.is_set()
+
+    def end_turn(self) -> None:
+        with self.condition:
+            self.turn = None
+            self.condition.notify_all()
+
+    def give_turn(self, id: int) -> None:
+        # Blocks until the agent ended its turn
+        with self.condition:
+            self.turn = id
+            self.condition.notify_all()
+            self.condition.wait_for(lambda: self.turn is None)
+
+    def run_round(self) -> int:
+        # One turn per living agent, returns the count of turns given
+        with self.universe.population_lock:
+            ids = sorted(
+                id
+                for id, agent in self.universe.population.items()
+                if not agent.stop.is_set()
+            )
+        for id in ids:
+            self.give_turn(id)
+        return len(ids)
+
+    def release(self) -> None:
+        # Wake up waiting agents once the universe froze
+        with self.condition:
+            self.condition.notify_all()
+
+
+class EventScheduler:
+    """
+    Agents without threads, woken in virtual time once their reaction time
+    elapsed and run by a bounded pool of workers. Simulated time advances slot
+    by slot, agents due in the same slot acting concurrently. Agents keep their
+    exact due time, slots only batching them: speeds are honored over time.
+    """
+
+    pooled = True  # Agents are run by the scheduler workers
+
+    def __init__(self, universe: Universe, workers: int, slot_duration: int):
+        self.universe = universe
+        self.slot_duration: int = slot_duration  # ns
+        self.queue: list = []  # (slot, id, due, agent) heap, due in ns
+        self.queue_lock: threading.Lock = threading.Lock()
+        self.workers: int = workers
+        self.pool = ThreadPoolExecutor(max_workers=workers)
+        assert isinstance(universe.clock, VirtualClock)
+        self.clock: VirtualClock = universe.clock
+        # Logs of the previous snapshot: rows of the agents scheduled then, and
+        # counts of the agents and of the retired logs
+        self.captured: dict = {}  # id -> actions and moves rows
+        self.captured_agents: int = 0
+        self.captured_retired: int = 0
+        self.captured_rows: dict = {"actions": 0, "moves": 0}  # Merged logs
+
+    def admit(self, agent) -> None:
+        # Starts an agent at the current simulated time
+        agent.begin(self.universe.get_time())
+        self.push(agent, self.universe.get_time())
+
+    def push(self, agent, time: int) -> None:
+        # Due once its reaction time elapsed since time, its previous due time,
+        # in the first slot starting at or after it
+        due = time + int(agent.phenome.reaction_time * 1e9)
+        slot = -(-due // self.slot_duration)
+        with self.queue_lock:
+            heapq.heappush(self.queue, (slot, agent.id, due, agent))
+
+    def _act(self, agents: list) -> None:
+        profiler = self.universe.profiler  # Phases timed only when profiling
+        for due, agent in agents:
+            agent.act([perf_counter_ns()] if profiler is not None else None)
+            if agent.stop.is_set():
+                agent.finish()
+            else:
+                self.push(agent, due)
+
+    def run_slot(self) -> int:
+        # Advances time to the next slot having due agents and runs them,
+        # returns the count of agents run
+        with self.queue_lock:
+            if not self.queue:
+                return 0
+            slot = self.queue[0][0]
+            agents = []
+            while self.queue and self.queue[0][0] == slot:
+                agents.append(heapq.heappop(self.queue)[2:])
+        self.clock.advance_to(slot * self.slot_duration)
+        # One batch of agents per worker, a single worker runs them by ids order
+        for future in [
+            self.pool.submit(self._act, agents[i :: self.workers])
+            for i in range(self.workers)
+        ]:
+            future.result()
+        return len(agents)
+
+    # SNAPSHOTS
+    def capture(self, streamed: bool = False) -> Snapshot:
+        # State between two slots, logs being kept unless streamed up to it
+        with self.queue_lock:
+            queue = sorted(self.queue)
+        for *_, agent in queue:
+            agent.sync()
+            agent.flush()
+        meta = {
+            "agents": {str(agent.id): agent.get_state() for *_, agent in queue},
+            "logs": {},
+        }
+        arrays = {
+            "queue": np.array(
+                [(slot, id, due) for slot, id, due, _ in queue], dtype=QUEUE_DTYPE
+            )
+        }
+        if not streamed:
+            actions, moves, logs = self._capture_logs(queue)
+            arrays.update(actions=actions, moves=moves)
+            meta["logs"] = logs
+        return Snapshot.capture(self.universe, meta, arrays)
+
+    def _capture_logs(self, queue: list) -> tuple:
+        # Rows logged since the previous snapshot, merged by time as get_logs
+        # would: only the agents scheduled then, born or retired since may have
+        # logged some
+        universe = self.universe
+        with universe.population_lock:
+            ids = set(self.captured)
+            ids.update(range(self.captured_agents, len(universe.population_store)))
+            logs = [
+                (id, universe.population[id].actions, universe.population[id].path)
+                for id in ids
+                if id in universe.population
+            ]
+            logs += universe.retired_logs[self.captured_retired :]
+            self.captured_agents = len(universe.population_store)
+            self.captured_retired = len(universe.retired_logs)
+        logs.sort(key=lambda log: log[0])
+        actions, moves = [], []
+        for id, action_log, move_log in logs:
+            captured_actions, captured_moves = self.captured.get(id, (0, 0))
+            actions.append(ActionLog.from_array(action_log.rows(captured_actions)))
+            moves.append(MoveLog.from_array(move_log.rows(captured_moves)))
+        self.captured = {
+            agent.id: (len(agent.actions), len(agent.path)) for *_, agent in queue
+        }
+
+        actions = ActionLog.merge(actions).to_array()
+        moves = MoveLog.merge(moves).to_array()
+        bounds = {}
+        for kind, rows in (("actions", len(actions)), ("moves", len(moves))):
+            start = self.captured_rows[kind]
+            bounds[kind] = [start, start + rows]
+            self.captured_rows[kind] += rows
+        return actions, moves, bounds
+
+    def restore(self, snapshot: Snapshot, sinks: list = None) -> None:
+        # Scheduled agents of a snapshot, the dead ones being records of their
+        # logs, or only their logs once released. Space and store are the
+        # universe ones.
+        universe = self.universe
+        store = universe.population_store
+        actions, moves = {}, {}
+        if "actions" in snapshot.arrays:
+            actions = ActionLog.from_array(np.array(snapshot.arrays["actions"])).split()
+            moves = MoveLog.from_array(np.array(snapshot.arrays["moves"])).split()
+        queue = snapshot.arrays["queue"]
+        scheduled = set(queue["id"].tolist())
+        lineage = Lineage(store)
+        for id in range(len(store)):
+            if id in scheduled:
+                agent = Agent.restore(
+                    universe,
+                    id,
+                    snapshot.meta["agents"][str(id)],
+                    actions.get(id),
+                    moves.get(id),
+                    scheduler=self,
+                    sinks=sinks,
+                )
+                agent.children = lineage.children(id).tolist()
+            elif universe.release_dead:
+                if id in actions:
+                    universe.retired_logs.append(
+                        (id, actions[id], moves.get(id, MoveLog()))
+                    )
+            else:
+                record = AgentRecord(store, id)
+                record.actions = actions.get(id, record.actions)
+                record.path = moves.get(id, record.path)
+                universe.population[id] = record
+
+        population = universe.population
+        with self.queue_lock:
+            self.queue = [
+                (slot, id, due, population[id]) for slot, id, due in queue.tolist()
+            ]
+            heapq.heapify(self.queue)
+
+    def release(self) -> None:
+        # Stops the agents still scheduled once the universe froze
+        self.pool.shutdown()
+        with self.queue_lock:
+            agents = [agent for *_, agent in self.queue]
+            self.queue = []
+        for agent in agents:
+            agent.finish()
@@ -0,0 +1,155 @@
+import os
+import queue
+import threading
+import numpy as np
+import pandas as pd
+from time import perf_counter
+
+# Kinds of events flushed to the sinks
+KINDS = ["actions", "moves"]
+
+
+class Sink:
+    """
+    Destination of the events flushed while the simulation runs.
+    Batches are written by a background thread, each one to its own part file
+    so that a crash leaves every written batch readable. The queue is bounded:
+    producers wait when the writer falls behind, memory stays bounded.
+    """
+
+    extension: str = None
+
+    def __init__(
+        self,
+        path: str,
+        batch_size: int = 2**16,
+        flush_interval: float = 1.0,
+        max_pending: int = 64,
+    ):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.error: Exception = None
+        for kind in KINDS:
+            os.makedirs(os.path.join(path, kind), exist_ok=True)
+        # Numbering goes on after the parts already written, by a resumed run
+        self.parts = {kind: len(self._part_paths(kind)) for kind in KINDS}
+
+        self.queue: queue.Queue = queue.Queue(maxsize=max_pending)
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def submit(self, kind: str, array: np.ndarray) -> None:
+        if len(array):
+            self.queue.put((kind, array))
+
+    def _run(self) -> None:
+        # Gather batches per kind, write them once large or old enough
+        pending = {kind: [] for kind in KINDS}
+        rows = {kind: 0 for kind in KINDS}  # Pending rows, small chunks add up
+        last_flush = perf_counter()
+        while True:
+            try:
+                item = self.queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                item = ()
+            if item is None:
+                break
+            if item:
+                pending[item[0]].append(item[1])
+                rows[item[0]] += len(item[1])
+            for kind, arrays in pending.items():
+                if arrays and (
+                    rows[kind] >= self.batch_size
+                    or perf_counter() - last_flush >= self.flush_interval
+                ):
+                    self._write_part(kind, arrays)
+                    pending[kind], rows[kind] = [], 0
+            if perf_counter() - last_flush >= self.flush_interval:
+                last_flush = perf_counter()
+        for kind, arrays in pending.items():
+            if arrays:
+                self._write_part(kind, arrays)
+
+    def _write_part(self, kind: str, arrays: list) -> None:
+        path = os.path.join(
+            self.path, kind, f"part-{self.parts[kind]:06d}.{self.extension}"
+        )
+        try:
+            self.write(path + ".tmp", np.concatenate(arrays))
+            os.replace(path + ".tmp", path)  # Never leaves a truncated part
+            self.parts[kind] += 1
+        except Exception as e:  # Reported on close, the run goes on
+            self.error = e
+
+    def write(self, path: str, array: np.ndarray) -> None:
+        raise NotImplementedError
+
+    def read(self, kind: str) -> np.ndarray:
+        raise NotImplementedError
+
+    def _part_paths(self, kind: str) -> list[str]:
+        directory = os.path.join(self.path, kind)
+        return sorted(
+            os.path.join(directory, name)
+            for name in os.listdir(directory)
+            if name.endswith(self.extension)
+        )
+
+    def close(self) -> None:
+        # Writes the pending batches, then stops the writer
+        self.queue.put(None)
+        self.thread.join()
+        if self.error is not None:
+            raise self.error
+
+
+class NpySink(Sink):
+    """
+    Batches as .npy files of the log structured arrays, no extra dependency
+    """
+
+    extension = "npy"
+
+    def write(self, path: str, array: np.ndarray) -> None:
+        with open(path, "wb") as file:
+            np.save(file, array)
+
+    def read(self, kind: str) -> np.ndarray:
+        parts = [np.load(path) for path in self._part_paths(kind)]
+        return np.concatenate(parts) if parts else None
+
+
+class ParquetSink(Sink):
+    """
+    Batches as parquet files, readable at once with pandas.read_parquet(path/kind)
+    """
+
+    extension = "parquet"
+
+    def __init__(self, path: str, **kwargs):
+        import pyarrow  # Optional dependency, fails before the run starts
+
+        super().__init__(path, **kwargs)
+
+    def write(self, path: str, array: np.ndarray) -> None:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        table = pa.table({name: array[name] for name in array.dtype.names})
+        pq.write_table(table, path)
+
+    def read(self, kind: str) -> np.ndarray:
+        parts = [pd.read_parquet(path) for path in self._part_paths(kind)]
+        if not parts:
+            return None
+        return pd.concat(parts).to_records(index=False)
+
+
+def broadcast(sinks: list[Sink], kind: str):
+    # Flush callback of a log, forwarding its chunks to every sink
+    def submit(array: np.ndarray) -> None:
+        for sink in sinks:
+            sink.submit(kind, array)
+
+    return submit
@@ -0,0 +1,225 @@
+import os
+import json
+import shutil
+import threading
+import numpy as np
+
+from .ActionLog import ACTION_DTYPE, MOVE_DTYPE
+from .Clock import Clocks, WallClock, ScaledClock, VirtualClock
+from .PopulationStore import PopulationStore, COLUMNS
+
+SNAPSHOT_VERSION = 2
+# Logs written incrementally, as parts shared by the snapshots of a directory
+LOGS_DTYPES = {"actions": ACTION_DTYPE, "moves": MOVE_DTYPE}
+
+
+def rng_to_dict(rng: np.random.Generator) -> dict:
+    # Generator state, with the seed sequence its children are spawned from
+    seed_seq = rng.bit_generator.seed_seq
+    return {
+        "state": rng.bit_generator.state,
+        "entropy": seed_seq.entropy,
+        "spawn_key": list(seed_seq.spawn_key),
+        "pool_size": seed_seq.pool_size,
+        "n_children_spawned": seed_seq.n_children_spawned,
+    }
+
+
+def rng_from_dict(data: dict) -> np.random.Generator:
+    seed_seq = np.random.SeedSequence(
+        data["entropy"],
+        spawn_key=data["spawn_key"],
+        pool_size=data["pool_size"],
+        n_children_spawned=data["n_children_spawned"],
+    )
+    bit_generator = getattr(np.random, data["state"]["bit_generator"])(seed_seq)
+    bit_generator.state = data["state"]
+    return np.random.Generator(bit_generator)
+
+
+def clock_to_dict(clock: WallClock | ScaledClock | VirtualClock) -> dict:
+    if isinstance(clock, VirtualClock):
+        return {"type": Clocks.virtual.value, "time": clock.now()}
+    if isinstance(clock, ScaledClock):
+        return {"type": Clocks.scaled.value, "time": clock.now(), "scale": clock.scale}
+    return {"type": Clocks.wall.value, "time": clock.now()}
+
+
+def clock_from_dict(data: dict) -> WallClock | ScaledClock | VirtualClock:
+    # Clock going on from the time of the snapshot
+    match Clocks(data["type"]):
+        case Clocks.virtual:
+            return VirtualClock(data["time"])
+        case Clocks.scaled:
+            clock = ScaledClock(data["scale"])
+            clock.genesis -= int(data["time"] / data["scale"])
+            return clock
+        case Clocks.wall:
+            clock = WallClock()
+            clock.genesis -= data["time"]
+            return clock
+
+
+class Snapshot:
+    """
+    State of a run between two ticks: space, population store, random
+    generators, clock and logs. Captured in memory by copies, then written as
+    one .npy file per array next to a meta.json, and read back memory-mapped.
+    Logs only hold the rows logged since the previous snapshot, meta["logs"]
+    giving their bounds: they are appended as parts to the logs directory next
+    to the snapshots, read back up to the rows of the snapshot.
+    """
+
+    def __init__(self, meta: dict, arrays: dict):
+        self.meta: dict = meta
+        self.arrays: dict = arrays  # Name -> array, store columns as store.<name>
+
+    @classmethod
+    def capture(cls, universe, meta: dict, arrays: dict) -> "Snapshot":
+        store = universe.population_store
+        arrays = {
+            "space": universe.space.copy(),
+            **{f"store.{name}": store.column(name).copy() for name in COLUMNS},
+            **arrays,
+        }
+        meta = {
+            "version": SNAPSHOT_VERSION,
+            "height": universe.height,
+            "width": universe.width,
+            "lock_strategy": universe.lock_strategy.value,
+            "clock": clock_to_dict(universe.clock),
+            **meta,
+        }
+        return cls(meta, arrays)
+
+    @staticmethod
+    def _write_array(path: str, array: np.ndarray) -> None:
+        out = np.lib.format.open_memmap(
+            path, mode="w+", dtype=array.dtype, shape=array.shape
+        )
+        out[...] = array
+        out.flush()
+        del out
+
+    def write(self, path: str) -> None:
+        # Written aside then moved, never leaves a partial snapshot. Logs parts
+        # are written first, a snapshot only refers to complete parts.
+        logs = self.meta.get("logs", {})
+        for kind, (start, stop) in logs.items():
+            if stop > start:
+                directory = os.path.join(os.path.dirname(path), "logs", kind)
+                os.makedirs(directory, exist_ok=True)
+                part = os.path.join(directory, f"part-{start:020d}.npy")
+                self._write_array(part + ".tmp", self.arrays[kind])
+                os.replace(part + ".tmp", part)
+
+        tmp = path + ".tmp"
+        shutil.rmtree(tmp, ignore_errors=True)
+        os.makedirs(tmp)
+        for name, array in self.arrays.items():
+            if name not in logs:
+                self._write_array(os.path.join(tmp, f"{name}.npy"), array)
+        with open(os.path.join(tmp, "meta.json"), "w") as file:
+            json.dump(self.meta, file)
+        os.replace(tmp, path)
+
+    @classmethod
+    def read(cls, path: str) -> "Snapshot":
+        # A snapshot directory, or the latest snapshot of a snapshots directory
+        if not os.path.exists(os.path.join(path, "meta.json")):
+            snapshots = sorted(
+                name
+                for name in os.listdir(path)
+                if name.startswith("snapshot-") and not name.endswith(".tmp")
+            )
+            if not snapshots:
+                raise FileNotFoundError(f"No snapshot in {path}")
+            path = os.path.join(path, snapshots[-1])
+        with open(os.path.join(path, "meta.json")) as file:
+            meta = json.load(file)
+        arrays = {
+            name[:-4]: np.load(os.path.join(path, name), mmap_mode="r")
+            for name in os.listdir(path)
+            if name.endswith(".npy")
+        }
+        for kind, (_, stop) in meta.get("logs", {}).items():
+            arrays[kind] = cls._read_log(
+                os.path.join(os.path.dirname(path), "logs", kind), kind, stop
+            )
+        return cls(meta, arrays)
+
+    @staticmethod
+    def _read_log(directory: str, kind: str, stop: int) -> np.ndarray:
+        # Rows of a log up to stop, each part starting where the previous ends
+        parts, offset = [], 0
+        while offset < stop:
+            part = np.load(
+                os.path.join(directory, f"part-{offset:020d}.npy"), mmap_mode="r"
+            )
+            parts.append(part[: stop - offset])
+            offset += len(part)
+        return np.concatenate(parts) if parts else np.empty(0, LOGS_DTYPES[kind])
+
+    def to_store(self) -> PopulationStore:
+        count = len(self.arrays["store.id"])
+        store = PopulationStore(capacity=max(count, 1))
+        for name in COLUMNS:
+            getattr(store, name)[:count] = self.arrays[f"store.{name}"]
+        store.count = count
+        return store
+
+
+class Snapshotter:
+    """
+    Writes snapshots every interval of clock time on a background thread,
+    keeping the latest ones, only the final one without interval. A snapshot
+    waits for the previous one to be written, at most one is held in memory.
+    """
+
+    def __init__(self, path: str, interval: float = None, keep: int = 2):
+        self.path = path
+        self.interval: int = None if interval is None else int(interval * 1e9)  # ns
+        self.keep = keep
+        self.next: int = None
+        self.thread: threading.Thread = None
+        self.error: Exception = None
+        os.makedirs(path, exist_ok=True)
+
+    def due(self, time: int) -> bool:
+        # Never when only the final state is kept
+        if self.interval is None:
+            return False
+        if self.next is None:
+            self.next = time + self.interval
+        return time >= self.next
+
+    def submit(self, snapshot: Snapshot, time: int) -> None:
+        self.wait()
+        self.next = None if self.interval is None else time + self.interval
+        self.thread = threading.Thread(
+            target=self._write, args=(snapshot, time), daemon=True
+        )
+        self.thread.start()
+
+    def _write(self, snapshot: Snapshot, time: int) -> None:
+        try:
+            snapshot.write(os.path.join(self.path, f"snapshot-{time:020d}"))
+            snapshots = sorted(
+                name
+                for name in os.listdir(self.path)
+                if name.startswith("snapshot-") and not name.endswith(".tmp")
+            )
+            for name in snapshots[: -self.keep]:
+                shutil.rmtree(os.path.join(self.path, name), ignore_errors=True)
+        except Exception as e:  # Reported on close, the run goes on
+            self.error = e
+
+    def wait(self) -> None:
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+
+    def close(self) -> None:
+        self.wait()
+        if self.error is not None:
+            raise self.error
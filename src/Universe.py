@@ -1,8 +1,19 @@
 import threading
 import numpy as np
-from time import perf_counter_ns
-
+from enum import Enum
+from .ActionLog import ActionLog, MoveLog
+from .Clock import WallClock, ScaledClock, VirtualClock
+from .Metrics import Metrics, MeasuredLock
+from .Mutation import Mutation
+from .Profiler import Profiler
 from .Position import Position
+from .PopulationStore import PopulationStore
+
+
+class LockStrategies(Enum):
+    cell = "cell"  # One lock per cell, created on first use
+    striped = "striped"  # A fixed number of locks shared by hashed cells
+    tile = "tile"  # One lock per square tile of cells, created on first use
 
 
 # TODO get space...
@@ -11,28 +22,96 @@ class Universe:
     This class control and lock time, space and population
     """
 
-    def __init__(self, height: int, width: int):  # TODO add a 3rd dimension
+    def __init__(  # TODO add a 3rd dimension
+        self,
+        height: int,
+        width: int,
+        lock_strategy: str = LockStrategies.cell.value,
+        stripes_count: int = 1024,
+        tile_size: int = 8,
+        clock: WallClock | ScaledClock | VirtualClock = None,
+    ):
         self.freeze: threading.Event = threading.Event()
 
         # Time
-        self.genesis = perf_counter_ns()
+        self.clock = clock if clock is not None else WallClock()
+        self.culmination: int = None  # End of the run
 
         # Space
         self.height: int = height
         self.width: int = width
-        self.space: np.array = np.full(
-            shape=(self.height, self.width), fill_value=None, dtype=object
+        self.space: np.array = np.full(  # Agents ids, -1 when empty
+            shape=(self.height, self.width), fill_value=-1, dtype=np.int32
         )
-        self.space_locks: np.array = np.empty(
-            shape=(self.height, self.width), dtype=object
+
+        # Space locks
+        if lock_strategy not in [s.value for s in LockStrategies]:
+            raise ValueError(
+                f"Possible lock strategies: {[s.value for s in LockStrategies]}"
+            )
+        self.lock_strategy: LockStrategies = LockStrategies(lock_strategy)
+        self.stripes_count: int = stripes_count
+        self.tile_size: int = tile_size
+        self.space_locks_lock: threading.Lock = threading.Lock()
+        self.space_locks: dict | list = (
+            [threading.Lock() for _ in range(self.stripes_count)]
+            if self.lock_strategy == LockStrategies.striped
+            else {}
         )
-        for y in range(self.height):
-            for x in range(self.width):
-                self.space_locks[y, x] = threading.Lock()
 
         # Population
-        self.population: dict = {}
+        self.population: dict = {}  # Optional id -> agent object mapping
         self.population_lock: threading.Lock = threading.Lock()
+        # Dead agents objects released, the logs they kept unless streamed
+        self.release_dead: bool = False
+        self.retired_logs: list = []
+        self.population_store: PopulationStore = PopulationStore()
+        # Merged logs, once the run is over
+        self.action_log: ActionLog = None
+        self.move_log: MoveLog = None
+
+        # Offspring genomes mutation, copied as they are otherwise
+        self.mutation: Mutation = None
+
+        # Live metrics and phases profiling, when measured
+        self.metrics: Metrics = None
+        self.profiler: Profiler = None
+
+    def get_lock(self, pos: Position) -> threading.Lock:
+        # Lock guarding the given (wrapped) position, depending on the strategy
+        match self.lock_strategy:
+            case LockStrategies.striped:
+                lock = self.space_locks[
+                    (pos.y * self.width + pos.x) % self.stripes_count
+                ]
+            case LockStrategies.cell | LockStrategies.tile:
+                key = (
+                    pos.tuple
+                    if self.lock_strategy == LockStrategies.cell
+                    else (pos.y // self.tile_size, pos.x // self.tile_size)
+                )
+                lock = self.space_locks.get(key)
+                if lock is None:
+                    with self.space_locks_lock:
+                        lock = self.space_locks.setdefault(key, threading.Lock())
+        if self.metrics is None and self.profiler is None:
+            return lock
+        return MeasuredLock(lock, self.metrics, self.profiler)
+
+    def retire(self, agent) -> None:
+        # Unmaps a dead agent, get_agent reads it from the store from now on
+        with self.population_lock:
+            self.population.pop(agent.id, None)
+            if agent.actions.on_flush is None:
+                self.retired_logs.append((agent.id, agent.actions, agent.path))
+
+    def get_logs(self) -> tuple[list, list]:
+        # Actions and moves logs of the mapped and retired agents, by ids order
+        with self.population_lock:
+            logs = [(a.id, a.actions, a.path) for a in self.population.values()]
+            logs += self.retired_logs
+        logs.sort(key=lambda log: log[0])
+        return [actions for _, actions, _ in logs], [path for _, _, path in logs]
 
     def wrap_position(self, pos: Position):
         # Used on every pos input
@@ -44,99 +123,101 @@ class Universe:
         self, pos: Position
     ):  # TODO rename or refactor (stop returning bool or pos)
         pos = self.wrap_position(pos)
-        return (
-            pos if not self.freeze.is_set() and self.space[pos.tuple] is None else False
-        )
+        return pos if not self.freeze.is_set() and self.space[pos.tuple] < 0 else False
 
     def get_area(self, pos: Position, scope: int) -> np.array:
         # Returns an area of the space given a position and a scope.
-        # Behaves like a torus
+        # Behaves like a torus: a view of the space when the area does not cross
+        # its borders, otherwise only the area is gathered through wrapped indices
         assert isinstance(pos, Position)
         assert (
             scope > 0 and self.height >= 2 * scope + 1 and self.width >= 2 * scope + 1
         )
-        area = np.full(
-            shape=(2 * scope + 1, 2 * scope + 1), fill_value=None, dtype=object
+        min_y, max_y = pos.y - scope, pos.y + scope + 1
+        min_x, max_x = pos.x - scope, pos.x + scope + 1
+        if 0 <= min_y and max_y <= self.height and 0 <= min_x and max_x <= self.width:
+            return self.space[min_y:max_y, min_x:max_x]
+
+        offsets = np.arange(-scope, scope + 1)
+        rows = (pos.y + offsets) % self.height
+        columns = (pos.x + offsets) % self.width
+        return self.space[rows[:, None], columns[None, :]]
+
+    def get_areas(self, ys: np.array, xs: np.array, scope: int) -> np.array:
+        # Batched get_area, returns one (2 * scope + 1)^2 area per position
+        assert (
+            scope > 0 and self.height >= 2 * scope + 1 and self.width >= 2 * scope + 1
         )
+        offsets = np.arange(-scope, scope + 1)
+        rows = (np.asarray(ys)[:, None] + offsets) % self.height
+        columns = (np.asarray(xs)[:, None] + offsets) % self.width
+        return self.space[rows[:, :, None], columns[:, None, :]]
 
-        # Central area
-        min_y = max(pos.y - scope, 0)
-        max_y = min(pos.y + scope, self.height - 1)
-        min_x = max(pos.x - scope, 0)
-        max_x = min(pos.x + scope, self.width - 1)
-        area = self.space
-
-        # Y overflow
-        top_overflow = 0
-        if pos.y - scope < 0:  # Adding bot area to top center
-            top_overflow = scope - pos.y
-            bot = area[self.height - top_overflow : self.height, :]
-            area = np.concatenate(
-                (bot, area),
-                axis=0,
-            )
-        elif pos.y + scope >= self.height:  # Adding top area to bot center
-            bot_overflow = pos.y + scope + 1 - self.height
-            top = area[0:bot_overflow, :]
-            area = np.concatenate(
-                (area, top),
-                axis=0,
-            )
-
-        # X overflow
-        left_overflow = 0
-        if pos.x - scope < 0:  # Adding right area to left center
-            left_overflow = scope - pos.x
-            right = area[:, self.width - left_overflow : self.width]
-            area = np.concatenate(
-                (right, area),
-                axis=1,
-            )
-        elif pos.x + scope >= self.width:  # Adding left area to right center
-            right_overflow = pos.x + scope + 1 - self.width
-            left = area[:, 0:right_overflow]
-            area = np.concatenate(
-                (area, left),
-                axis=1,
-            )
+    def get_time(self) -> int:
+        return self.clock.now()
 
-        return area[
-            pos.y - scope + top_overflow : pos.y + scope + 1 + top_overflow,
-            pos.x - scope + left_overflow : pos.x + scope + 1 + left_overflow,
-        ]
+    @property
+    def max_scope(self) -> int:
+        # Largest perception scope get_area allows
+        return (min(self.height, self.width) - 1) // 2
 
-    def get_time(self) -> int:
-        return perf_counter_ns() - self.genesis
+    @property
+    def occupancy(self) -> int:
+        return int(np.count_nonzero(self.space >= 0))
 
     def get_displayable(self):
-        displayable_array: np.array = np.vectorize(
-            lambda agent: (1 + agent.id) % 255 if agent is not None else 0,
-        )(self.space)
+        displayable_array: np.array = np.where(
+            self.space >= 0, (1 + self.space) % 255, 0
+        )
         return displayable_array
 
     def copy(self):
-        new_universe = Universe(self.height, self.width)
-        new_universe.genesis = self.genesis
+        new_universe = Universe(
+            self.height,
+            self.width,
+            self.lock_strategy.value,
+            self.stripes_count,
+            self.tile_size,
+            self.clock,
+        )
         new_universe.freeze = self.freeze
+        new_universe.mutation = self.mutation
+        new_universe.release_dead = self.release_dead
+        # Space and population state, the agents objects are not copied
+        new_universe.space = self.space.copy()
+        new_universe.population_store = self.population_store.copy()
+        return new_universe
+
+    def get_agent(self, id: int) -> object:
+        # Mapped object if any, a view over the population store otherwise
+        if id < 0:
+            return None
+        agent = self.population.get(id)
+        return agent if agent is not None else self.population_store[id]
 
     def __getitem__(self, pos: Position):
         if isinstance(pos, Position):
-            item = self.space[pos.tuple]
+            item = self.get_agent(int(self.space[pos.tuple]))
         else:
             item = self.space[pos]
         return item
 
     def __contains__(self, value: object):
-        return np.any(self.space == value)
+        id = getattr(value, "id", value)
+        position = getattr(value, "position", None)
+        if isinstance(position, Position):
+            return self.space[position.tuple] == id
+        return np.any(self.space == id)
 
     def __setitem__(self, pos: Position, value: object):
+        value = -1 if value is None else getattr(value, "id", value)
         if isinstance(pos, Position):
             self.space[pos.tuple] = value
         else:
             self.space[pos] = value
 
     def __eq__(self, other):
-        return self.space == other
+        return self.space == getattr(other, "id", other)
 
     def __repr__(self):
         return f"Space at {self.get_time()} ns\n{self.space}"
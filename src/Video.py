@@ -0,0 +1,114 @@
+import os
+import queue
+import multiprocessing as mp
+import numpy as np
+
+# Fixed GIF palette, a 6x6x6 color cube starting with black
+LEVELS = np.arange(0, 256, 51, dtype=np.uint8)
+PALETTE = np.stack(np.meshgrid(LEVELS, LEVELS, LEVELS, indexing="ij"), -1)
+PALETTE = PALETTE.reshape(-1, 3)
+
+
+def palette_indices(colors: np.ndarray) -> np.ndarray:
+    # Nearest color of the cube for each RGB color
+    levels = (np.asarray(colors, dtype=np.int32) + 25) // 51
+    return (levels[..., 0] * 36 + levels[..., 1] * 6 + levels[..., 2]).astype(np.uint8)
+
+
+def _encode(path: str, fps: float, frames: mp.Queue) -> None:
+    # Encoder process, writes the frames until None is received. GIF frames are
+    # palette indices written one by one, the other formats RGB frames handed
+    # to imageio.
+    frame = frames.get()
+    if path.lower().endswith(".gif"):
+        from PIL import Image, GifImagePlugin
+
+        with open(path, "wb") as file:
+            while frame is not None:
+                image = Image.fromarray(frame, mode="P")
+                image.putpalette(PALETTE.tobytes())
+                if file.tell() == 0:
+                    header, _ = GifImagePlugin.getheader(
+                        image, info={"loop": 0, "optimize": False}
+                    )
+                    file.write(b"".join(header))
+                for data in GifImagePlugin.getdata(image, duration=1000 / fps):
+                    file.write(data)
+                frame = frames.get()
+            file.write(b";")  # Trailer
+    else:
+        import imageio.v2 as imageio
+
+        with imageio.get_writer(path, fps=fps) as writer:
+            while frame is not None:
+                writer.append_data(frame)
+                frame = frames.get()
+
+
+class VideoWriter:
+    """
+    Frames of the space turned into images through a lookup table of the
+    agents colors, then encoded by a background process. Frames are handed
+    through a bounded queue, the renderer waits when the encoder falls behind.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        colors: np.ndarray,
+        fps: float = 30,
+        scale: int = 1,
+        max_pending: int = 16,
+    ):
+        self.path = path
+        self.scale: int = scale
+        self.frames_count: int = 0
+        # Color of each id shifted by one, empty cells (-1) being black
+        gif = path.lower().endswith(".gif")
+        colors = np.asarray(colors, dtype=np.uint8).reshape(-1, 3)
+        self.lut: np.ndarray = np.concatenate(
+            [
+                np.zeros((1,) if gif else (1, 3), dtype=np.uint8),
+                palette_indices(colors) if gif else colors,
+            ]
+        )
+        if gif:
+            import PIL  # Optional dependency, fails before rendering starts
+        else:
+            import imageio
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.frames: mp.Queue = mp.Queue(maxsize=max_pending)
+        self.process = mp.Process(
+            target=_encode, args=(path, fps, self.frames), daemon=True
+        )
+        self.process.start()
+
+    def write(self, space: np.ndarray) -> None:
+        # Space of agents ids, -1 when empty
+        frame = self.lut[space + 1]
+        if self.scale > 1:
+            frame = frame.repeat(self.scale, axis=0).repeat(self.scale, axis=1)
+        self._put(frame)
+        self.frames_count += 1
+
+    def _put(self, item) -> None:
+        while True:
+            try:
+                self.frames.put(item, timeout=1)
+                return
+            except queue.Full:
+                if not self.process.is_alive():
+                    self._fail()
+
+    def _fail(self) -> None:
+        self.frames.cancel_join_thread()  # Frames left in the queue are dropped
+        raise RuntimeError(f"Encoding {self.path} failed")
+
+    def close(self) -> None:
+        # Waits for the encoding of the pending frames
+        if self.process.is_alive():
+            self._put(None)
+        self.process.join()
+        if self.process.exitcode != 0:
+            self._fail()
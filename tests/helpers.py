@@ -0,0 +1,48 @@
+import numpy as np
+
+from src.ActionLog import SPAWN
+from src.Lab import Lab
+
+# Small seeded runs, tens to hundreds of ticks
+RUN = dict(
+    height=16,
+    width=16,
+    initial_population_count=24,
+    max_total_duration=100,
+    verbose=False,
+    seed=7,
+    deterministic=True,
+)
+DURATIONS = {"threaded": 1, "pooled": 0.01, "vectorized": 0.1}
+TICKS = {"threaded": 0.1, "pooled": 1e-4, "vectorized": 1e-3}
+
+
+def experiment(engine: str, **kwargs) -> dict:
+    parameters = dict(
+        RUN,
+        engine=engine,
+        max_simulation_duration=DURATIONS[engine],
+        tick_duration=TICKS[engine],
+    )
+    return Lab().experiment(**{**parameters, **kwargs})
+
+
+def state(simulation: dict) -> tuple:
+    universe = simulation["universe"]
+    return (
+        universe.action_log.to_array().copy(),
+        universe.move_log.to_array().copy(),
+        universe.space.copy(),
+        universe.population_store.to_dataframe(),
+    )
+
+
+def assert_same_state(a: tuple, b: tuple) -> None:
+    for x, y in zip(a[:3], b[:3]):
+        np.testing.assert_array_equal(x, y)
+    assert a[3].equals(b[3])
+
+
+def decisions_counts(actions: np.ndarray) -> np.ndarray:
+    # Actions decided by each agent, lifecycle events aside
+    return np.bincount(actions["id"][actions["code"] < SPAWN])
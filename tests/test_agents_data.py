@@ -0,0 +1,36 @@
+import numpy as np
+import pytest
+
+from src.Lab import Lab
+from src.Lineage import Lineage
+from helpers import experiment
+
+
+@pytest.mark.parametrize("engine", ["threaded", "vectorized"])
+def test_agents_data_match_the_agents_views(engine):
+    simulation = experiment(engine)
+    store = simulation["universe"].population_store
+    data = Lab().get_agents_data(simulation)
+    assert data.index.tolist() == list(range(len(store)))
+    for id in range(0, len(store), max(len(store) // 50, 1)):
+        record = store[id].to_dict()
+        row = data.loc[id]
+        assert row["parent"] == (record["parents"][0] if record["parents"] else -1)
+        for name in ["generation", "birth_success", "scope"]:
+            assert row[name] == record[name]
+        for name in ["start_date", "death_date"]:
+            assert row[name] == (-1 if record[name] is None else record[name])
+        for name in ["reaction_time", "speed", "energy_capacity"]:
+            assert row[name] == pytest.approx(record[name])
+        assert tuple(row[["r", "g", "b"]]) == tuple(record["color"])
+    # Children counts agree with the children of the lineage
+    np.testing.assert_array_equal(
+        data["children_count"], np.diff(Lineage(store).offsets)
+    )
+
+
+def test_agents_data_do_not_share_the_store_memory():
+    simulation = experiment("vectorized")
+    data = Lab().get_agents_data(simulation)
+    data["generation"] = -1
+    assert (simulation["universe"].population_store.column("generation") >= 0).all()
@@ -0,0 +1,15 @@
+import numpy as np
+import pytest
+
+from helpers import experiment, state, assert_same_state
+
+
+@pytest.mark.parametrize("engine", ["threaded", "pooled", "vectorized"])
+def test_deterministic_runs_are_reproducible(engine):
+    assert_same_state(state(experiment(engine)), state(experiment(engine)))
+
+
+@pytest.mark.parametrize("engine", ["pooled", "vectorized"])
+def test_seeds_give_different_runs(engine):
+    a, b = state(experiment(engine, seed=1)), state(experiment(engine, seed=2))
+    assert not np.array_equal(a[2], b[2])
@@ -0,0 +1,7 @@
+from helpers import experiment, decisions_counts
+
+
+def test_vectorized_agents_act_once_per_tick():
+    simulation = experiment("vectorized")
+    counts = decisions_counts(simulation["universe"].action_log.to_array())
+    assert counts.max() <= simulation["timings"]["ticks"]
@@ -0,0 +1,138 @@
+import json
+import numpy as np
+import pytest
+
+from src.Export import (
+    ACTION_RECORD_DTYPE,
+    AGENT_RECORD_DTYPE,
+    FRAME_RECORD_DTYPE,
+    HEADER_DTYPE,
+    INDEX_DTYPE,
+)
+from src.Lab import Lab
+from helpers import experiment
+
+
+@pytest.fixture(scope="module")
+def simulation():
+    return experiment("vectorized")
+
+
+def read_table(path, name: str, format: str) -> dict:
+    match format:
+        case "npz":
+            with np.load(path / f"{name}.npz") as data:
+                return {key: data[key] for key in data.files}
+        case "parquet":
+            import pyarrow.parquet as pq
+
+            table = pq.read_table(path / f"{name}.parquet")
+        case "arrow":
+            import pyarrow.feather as feather
+
+            table = feather.read_table(path / f"{name}.arrow")
+    return {key: column.to_numpy() for key, column in zip(table.column_names, table)}
+
+
+def read_indexed_records(path, magic: bytes, dtype: np.dtype) -> list:
+    # Frames records as the viewer seeks them, from the header and index
+    data = path.read_bytes()
+    header = np.frombuffer(data, HEADER_DTYPE, 1)[0]
+    assert header["magic"] == magic
+    assert header["record_size"] == dtype.itemsize
+    count = int(header["frames_count"])
+    index = np.frombuffer(data, INDEX_DTYPE, count, HEADER_DTYPE.itemsize)
+    start = HEADER_DTYPE.itemsize + INDEX_DTYPE.itemsize * count
+    records = np.frombuffer(data, dtype, offset=start)
+    assert len(records) * dtype.itemsize == len(data) - start
+    return [
+        (int(t), records[offset : offset + n])
+        for t, offset, n in zip(index["time"], index["offset"], index["count"])
+    ]
+
+
+def test_binary_layout_is_fixed():
+    # Field offsets the viewer reads at, changing them needs a new version
+    layouts = {
+        HEADER_DTYPE: (16, [0, 4, 8, 12]),
+        INDEX_DTYPE: (24, [0, 8, 16, 20]),
+        FRAME_RECORD_DTYPE: (12, [0, 4, 8]),
+        ACTION_RECORD_DTYPE: (16, [0, 4, 5, 6, 8]),
+        AGENT_RECORD_DTYPE: (12, [0, 4, 8, 9, 10, 11]),
+    }
+    for dtype, (size, offsets) in layouts.items():
+        assert dtype.itemsize == size
+        assert [dtype.fields[name][1] for name in dtype.names] == offsets
+
+
+@pytest.mark.parametrize("format", ["npz", "parquet", "arrow"])
+def test_tables_round_trip(simulation, format, tmp_path):
+    if format != "npz":
+        pytest.importorskip("pyarrow")
+    Lab().export(simulation, str(tmp_path), format=format, gui=False, verbose=False)
+    universe = simulation["universe"]
+    actions = read_table(tmp_path, "actions", format)
+    log = universe.action_log.to_array()
+    for name in log.dtype.names:
+        np.testing.assert_array_equal(actions[name], log[name])
+
+    agents = read_table(tmp_path, "agents", format)
+    store = universe.population_store
+    for name in ["id", "generation", "parent", "spawn_date", "death_date"]:
+        np.testing.assert_array_equal(agents[name], store.column(name))
+    np.testing.assert_array_equal(
+        np.stack([agents["r"], agents["g"], agents["b"]], axis=1),
+        store.column("color"),
+    )
+
+    frames = read_table(tmp_path, "frames", format)
+    index = read_table(tmp_path, "frames_index", format)
+    for i, (t, ids, ys, xs) in enumerate(Lab().iter_frames(simulation)):
+        assert index["time"][i] == t
+        shown = slice(
+            index["frame_offset"][i], index["frame_offset"][i] + index["frame_count"][i]
+        )
+        np.testing.assert_array_equal(frames["id"][shown], ids)
+        np.testing.assert_array_equal(frames["y"][shown], ys)
+        np.testing.assert_array_equal(frames["x"][shown], xs)
+        assert (frames["frame"][shown] == i).all()
+
+
+def test_gui_files_match_the_run(simulation, tmp_path):
+    Lab().export(simulation, str(tmp_path), phylogeny=False, verbose=False)
+    universe = simulation["universe"]
+    frames = read_indexed_records(tmp_path / "frames.bin", b"GMSF", FRAME_RECORD_DTYPE)
+    chunks = list(Lab().iter_frames(simulation))
+    assert len(frames) == len(chunks) > 1
+    for (t, records), (time, ids, ys, xs) in zip(frames, chunks):
+        assert t == time
+        np.testing.assert_array_equal(records["id"], ids)
+        np.testing.assert_array_equal(records["y"], ys)
+        np.testing.assert_array_equal(records["x"], xs)
+
+    # Actions of a frame happen before the next one, all of them once
+    log = universe.action_log.to_array()
+    actions = read_indexed_records(
+        tmp_path / "actions.bin", b"GMSA", ACTION_RECORD_DTYPE
+    )
+    records = np.concatenate([records for _, records in actions])
+    for name in ["id", "code", "success", "time"]:
+        np.testing.assert_array_equal(records[name], log[name])
+    for (_, records), (t, _) in zip(actions, frames[1:]):
+        assert (records["time"] < t).all()
+
+    agents = np.fromfile(tmp_path / "agents.bin", AGENT_RECORD_DTYPE)
+    store = universe.population_store
+    np.testing.assert_array_equal(agents["id"], np.arange(len(store)))
+    np.testing.assert_array_equal(agents["generation"], store.column("generation"))
+
+    with open(tmp_path / "meta.json") as file:
+        meta = json.load(file)
+    assert meta["frames_count"] == len(frames)
+    assert meta["agents_count"] == len(store)
+    assert (meta["height"], meta["width"]) == (universe.height, universe.width)
+
+
+def test_unknown_format_is_rejected(simulation, tmp_path):
+    with pytest.raises(ValueError, match="Possible export formats"):
+        Lab().export(simulation, str(tmp_path), format="csv", verbose=False)
@@ -0,0 +1,52 @@
+import numpy as np
+import pytest
+
+from src.Lineage import Lineage
+from src.PopulationStore import PopulationStore
+from helpers import experiment
+
+
+@pytest.mark.parametrize("engine", ["threaded", "pooled"])
+def test_lineage_children_match_agents(engine):
+    universe = experiment(engine)["universe"]
+    lineage = Lineage(universe.population_store)
+    assert len(lineage) == len(universe.population)
+    for id, agent in universe.population.items():
+        assert lineage.children(id).tolist() == agent.children
+        assert lineage.parent[id] == (agent.parents[0] if agent.parents else -1)
+    assert lineage.offsets[-1] == np.count_nonzero(lineage.parent >= 0)
+
+
+def test_released_agents_keep_their_lineage():
+    kept = experiment("pooled")["universe"]
+    released = experiment("pooled", release_dead=True)["universe"]
+    assert len(released.population) < len(kept.population)
+    a = Lineage(kept.population_store).to_dataframe()
+    b = Lineage(released.population_store).to_dataframe()
+    assert a.equals(b)
+
+
+def test_queries_match_the_parents():
+    lineage = Lineage(experiment("vectorized")["universe"].population_store)
+    founder = lineage.founder_of()
+    for id in range(0, len(lineage), max(len(lineage) // 50, 1)):
+        ancestors = lineage.ancestors(id)
+        assert founder[id] == (ancestors[-1] if ancestors.size else id)
+        assert lineage.generation[id] - lineage.generation[founder[id]] == len(
+            ancestors
+        )
+        for ancestor in ancestors:
+            assert lineage.is_ancestor(ancestor, id)
+            assert id in lineage.descendants(ancestor)
+    living = (lineage.death_date < 0) & lineage.birth_success & (lineage.parent >= 0)
+    assert lineage.surviving_descendants().sum() == np.count_nonzero(living)
+
+
+def test_deep_trees_export_without_recursion():
+    # A single line of descent, deeper than the recursion limit
+    store = PopulationStore()
+    depth = 5000
+    store.append(depth, parent=np.arange(-1, depth - 1), spawn_date=np.arange(depth))
+    tree = Lineage(store).to_newick()
+    assert tree.count("(") == tree.count(")") == depth - 1
+    assert tree.endswith("a_0:0;")
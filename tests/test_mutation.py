@@ -0,0 +1,94 @@
+import numpy as np
+import pytest
+
+from src.Mutation import Mutation
+from src.PopulationStore import COLUMNS
+from helpers import experiment, state, assert_same_state
+
+TRAITS = ["reaction_time", "speed", "energy_capacity", "scope", "color", "weights"]
+
+
+def genomes(n: int, rng: np.random.Generator) -> dict:
+    # A batch of valid genomes, in the dtypes of the store
+    weights = rng.random((n, COLUMNS["weights"][1][0]))
+    values = {
+        "reaction_time": rng.uniform(0.01, 1, n),
+        "speed": rng.uniform(0.5, 2, n),
+        "energy_capacity": rng.uniform(50, 200, n),
+        "scope": rng.integers(1, 5, n),
+        "color": rng.integers(0, 256, (n, 3)),
+        "weights": weights / weights.sum(axis=1, keepdims=True),
+    }
+    return {trait: values[trait].astype(COLUMNS[trait][0]) for trait in TRAITS}
+
+
+@pytest.mark.parametrize("noise", ["gaussian", "lognormal", "uniform"])
+def test_mutated_genomes_stay_valid(noise):
+    rng = np.random.default_rng(0)
+    mutation = Mutation(
+        rate=1, strength=5, traits={trait: {"noise": noise} for trait in TRAITS}
+    )
+    batch = genomes(1000, rng)
+    for _ in range(5):  # Mutations of mutations
+        batch = mutation.mutate(batch, rng, max_scope=8)
+        for trait in TRAITS:
+            assert batch[trait].dtype == COLUMNS[trait][0]
+            assert np.isfinite(batch[trait]).all()
+        assert ((batch["scope"] >= 1) & (batch["scope"] <= 8)).all()
+        assert (batch["weights"] >= 0).all()
+        np.testing.assert_allclose(batch["weights"].sum(axis=1), 1, rtol=1e-5)
+    if noise == "lognormal":  # Signs are kept
+        for trait in ["reaction_time", "speed", "energy_capacity"]:
+            assert (batch[trait] > 0).all()
+
+
+def test_genes_mutate_at_their_rate():
+    rng = np.random.default_rng(0)
+    batch = genomes(10000, rng)
+    mutated = Mutation(rate=0.3, traits={"speed": {"rate": 0}}).mutate(batch, rng)
+    assert abs(np.mean(mutated["reaction_time"] != batch["reaction_time"]) - 0.3) < 0.02
+    np.testing.assert_array_equal(mutated["speed"], batch["speed"])
+    unchanged = Mutation(rate=0).mutate(batch, rng)
+    for trait in TRAITS:
+        np.testing.assert_array_equal(unchanged[trait], batch[trait])
+
+
+def test_mutation_is_seeded():
+    batch = genomes(100, np.random.default_rng(0))
+    mutation = Mutation(rate=0.5)
+    a = mutation.mutate(batch, np.random.default_rng(1), max_scope=8)
+    b = mutation.mutate(batch, np.random.default_rng(1), max_scope=8)
+    c = mutation.mutate(batch, np.random.default_rng(2), max_scope=8)
+    for trait in TRAITS:
+        np.testing.assert_array_equal(a[trait], b[trait])
+    assert any(not np.array_equal(a[trait], c[trait]) for trait in TRAITS)
+
+
+def test_only_given_traits_mutate():
+    batch = genomes(10, np.random.default_rng(0))
+    mutated = Mutation(rate=1).mutate(
+        {"weights": batch["weights"]}, np.random.default_rng(0)
+    )
+    assert list(mutated) == ["weights"]
+
+
+@pytest.mark.parametrize(
+    "traits", [{"height": {}}, {"speed": {"noise": "cauchy"}}], ids=["trait", "noise"]
+)
+def test_unknown_settings_are_rejected(traits):
+    with pytest.raises(ValueError, match="Possible"):
+        Mutation(traits=traits)
+
+
+@pytest.mark.parametrize("engine", ["pooled", "vectorized"])
+def test_mutating_runs_are_reproducible(engine):
+    mutation = Mutation(rate=0.5, strength=2)
+    a = experiment(engine, mutation=mutation)
+    b = experiment(engine, mutation=mutation)
+    assert_same_state(state(a), state(b))
+    # Offspring differ from their parents
+    store = a["universe"].population_store
+    children = np.flatnonzero(store.column("parent") >= 0)
+    assert children.size
+    parents = store.column("parent")[children]
+    assert (store.column("weights")[children] != store.column("weights")[parents]).any()
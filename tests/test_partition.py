@@ -0,0 +1,64 @@
+import numpy as np
+import pytest
+
+from src.Lab import Lab
+from src.Partition import PartitionedSimulation
+from src.Universe import Universe
+from helpers import decisions_counts
+
+
+def test_full_store_grows_between_runs():
+    rng = np.random.default_rng(1)
+    universe = Universe(16, 16)
+    simulation = PartitionedSimulation(universe, 2, 2 * 256, rng=rng)
+    cells = rng.choice(256, 128, replace=False)
+    simulation.spawn_initial_population(np.stack([cells // 16, cells % 16], axis=1))
+    simulation.run(deadline=2**62)  # Runs until the store is full
+    assert simulation.full
+    count = simulation.store.count
+    spawn_date = simulation.store.spawn_date[:count].copy()
+    simulation.grow(4 * 256)
+    assert not simulation.full
+    np.testing.assert_array_equal(simulation.store.spawn_date[:count], spawn_date)
+    for _ in range(100):  # Until past the former capacity
+        simulation.run(deadline=0)
+        if simulation.store.count > 2 * 256:
+            break
+    simulation.merge()
+    assert universe.population_store.count > 2 * 256
+
+
+def test_full_store_truncates_the_run_loudly():
+    # A run stops as soon as its store is full, long before its deadline
+    with pytest.warns(RuntimeWarning, match="population store full"):
+        simulation = Lab().experiment(
+            height=16,
+            width=16,
+            initial_population_count=128,
+            max_total_duration=100,
+            max_simulation_duration=60,
+            verbose=False,
+            engine="multiprocess",
+            workers=2,
+            seed=1,
+            population_capacity=2 * 256,
+        )
+    assert simulation["timings"]["truncated"]
+    assert simulation["universe"].population_store.count <= 2 * 256
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_partitioned_agents_act_once_per_tick(seed):
+    # Agents moving or born into a later phase band wait for the next tick.
+    # A run past its deadline stops after one tick, ticks are counted exactly.
+    rng = np.random.default_rng(seed)
+    universe = Universe(8, 8)
+    simulation = PartitionedSimulation(universe, 2, 10**5, rng=rng)
+    cells = rng.choice(64, 32, replace=False)
+    simulation.spawn_initial_population(np.stack([cells // 8, cells % 8], axis=1))
+    ticks = 10
+    for _ in range(ticks):
+        simulation.run(deadline=0)
+    simulation.merge()
+    counts = decisions_counts(universe.action_log.to_array())
+    assert counts.max() <= ticks
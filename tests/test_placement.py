@@ -0,0 +1,84 @@
+import numpy as np
+import pytest
+
+from src.Lab import Lab, Distributions
+
+HEIGHT, WIDTH = 32, 48
+
+
+def positions(distribution: str, n: int, seed: int = 0, **kwargs) -> np.ndarray:
+    return Lab()._generate_initial_positions(
+        HEIGHT,
+        WIDTH,
+        n,
+        verbose=False,
+        distribution=Distributions(distribution),
+        rng=np.random.default_rng(seed),
+        **kwargs,
+    )
+
+
+@pytest.mark.parametrize("distribution", ["random", "clustered", "uniform_grid"])
+@pytest.mark.parametrize("n", [0, 1, 100, HEIGHT * WIDTH])
+def test_positions_are_unique_cells(distribution, n):
+    cells = positions(distribution, n)
+    assert cells.shape == (n, 2)
+    assert ((cells >= 0) & (cells < [HEIGHT, WIDTH])).all()
+    assert len(np.unique(cells[:, 0] * WIDTH + cells[:, 1])) == n
+
+
+@pytest.mark.parametrize("distribution", ["random", "clustered", "uniform_grid"])
+def test_seeded_positions_are_reproducible(distribution):
+    np.testing.assert_array_equal(
+        positions(distribution, 100), positions(distribution, 100)
+    )
+    assert not np.array_equal(
+        positions(distribution, 100), positions(distribution, 100, 1)
+    )
+
+
+def test_uniform_grid_is_evenly_spaced():
+    cells = positions("uniform_grid", 48)  # 6 rows of 8 cells
+    for axis, size, count in [(0, HEIGHT, 6), (1, WIDTH, 8)]:
+        values = np.unique(cells[:, axis])
+        assert len(values) == count
+        gaps = np.diff(np.append(values, values[0] + size))
+        assert gaps.max() - gaps.min() <= 1
+
+
+def test_clusters_gather_the_positions():
+    # A single tight cluster, every cell close to it on the torus
+    cells = positions("clustered", 50, clusters_count=1, clusters_spread=2.0)
+    for axis, size in [(0, HEIGHT), (1, WIDTH)]:
+        values = np.sort(np.unique(cells[:, axis]))
+        gaps = np.diff(np.append(values, values[0] + size))
+        assert size - gaps.max() < 16  # Smallest arc covering the cluster
+
+
+def test_density_map_weights_the_cells():
+    density_map = np.zeros((HEIGHT, WIDTH))
+    density_map[:, : WIDTH // 2] = 3
+    density_map[:, WIDTH // 2 :] = 1
+    density_map[0] = 0  # Never picked
+    cells = np.concatenate(
+        [
+            positions("density_map", 10, seed, density_map=density_map)
+            for seed in range(200)
+        ]
+    )
+    assert not (cells[:, 0] == 0).any()
+    assert abs(np.mean(cells[:, 1] < WIDTH // 2) - 0.75) < 0.03
+
+
+def test_density_map_fills_its_support():
+    density_map = np.zeros((HEIGHT, WIDTH))
+    density_map[4:8, 10:20] = np.arange(1, 41).reshape(4, 10)
+    cells = positions("density_map", 40, density_map=density_map)
+    assert sorted((cells[:, 0] * WIDTH + cells[:, 1]).tolist()) == sorted(
+        np.flatnonzero(density_map).tolist()
+    )
+
+
+def test_unknown_distribution_is_rejected():
+    with pytest.raises(ValueError, match="Possible distributions"):
+        Lab().experiment(8, 8, 4, 1, 1, verbose=False, distribution="spiral")
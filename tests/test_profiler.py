@@ -0,0 +1,27 @@
+import pytest
+
+from src.Lab import Lab
+
+
+@pytest.mark.parametrize(
+    "engine, duration, tick", [("threaded", 1, 0.1), ("pooled", 0.01, 1e-4)]
+)
+def test_profiled_runs_count_every_phase(engine, duration, tick):
+    simulation = Lab().experiment(
+        height=16,
+        width=16,
+        initial_population_count=24,
+        max_total_duration=100,
+        max_simulation_duration=duration,
+        verbose=False,
+        engine=engine,
+        seed=7,
+        deterministic=True,
+        tick_duration=tick,
+        profile=True,
+    )
+    counts = simulation["profiler"].summary()["count"]
+    # Every round times all of its phases once
+    rounds = counts[["sleep", "perception", "decision", "action"]]
+    assert (rounds > 0).all()
+    assert rounds.nunique() == 1
@@ -0,0 +1,46 @@
+import os
+import numpy as np
+import pytest
+
+from src.Lab import Lab
+from src.Snapshot import Snapshot
+from helpers import DURATIONS, experiment, state, assert_same_state
+
+
+@pytest.mark.parametrize("engine", ["pooled", "vectorized"])
+@pytest.mark.parametrize("release_dead", [False, True])
+def test_resume_equals_uninterrupted_run(engine, release_dead, tmp_path):
+    duration = DURATIONS[engine]
+    uninterrupted = state(experiment(engine, release_dead=release_dead))
+    experiment(
+        engine,
+        max_simulation_duration=duration / 2,
+        release_dead=release_dead,
+        snapshot_path=str(tmp_path),
+        snapshot_interval=duration / 10,
+    )
+    resumed = Lab().resume(
+        str(tmp_path), max_simulation_duration=duration, verbose=False
+    )
+    assert_same_state(uninterrupted, state(resumed))
+
+
+@pytest.mark.parametrize("engine", ["pooled", "vectorized"])
+def test_snapshots_write_each_log_row_once(engine, tmp_path):
+    duration = DURATIONS[engine]
+    universe = experiment(
+        engine, snapshot_path=str(tmp_path), snapshot_interval=duration / 10
+    )["universe"]
+    logs = {"actions": universe.action_log, "moves": universe.move_log}
+    for kind, log in logs.items():
+        directory = tmp_path / "logs" / kind
+        parts = [np.load(directory / name) for name in sorted(os.listdir(directory))]
+        # Parts follow each other, the final snapshot covering the whole log
+        offsets = np.cumsum([0] + [len(part) for part in parts])
+        assert sorted(os.listdir(directory)) == [
+            f"part-{offset:020d}.npy" for offset in offsets[:-1]
+        ]
+        np.testing.assert_array_equal(np.concatenate(parts), log.to_array())
+        np.testing.assert_array_equal(
+            Snapshot.read(str(tmp_path)).arrays[kind], log.to_array()
+        )
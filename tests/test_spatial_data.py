@@ -0,0 +1,56 @@
+import numpy as np
+import pytest
+
+from src.Lab import Lab
+from helpers import experiment
+
+
+@pytest.fixture(scope="module", params=["pooled", "vectorized"])
+def simulation(request):
+    return experiment(request.param)
+
+
+def reconstruct(simulation: dict, t: int) -> dict:
+    # Brute force, last position of every agent moved by t and not dead by then
+    universe = simulation["universe"]
+    moves = universe.move_log.to_array()
+    death_date = universe.population_store.column("death_date")
+    positions = {}
+    for move in moves[moves["time"] <= t]:
+        positions[int(move["id"])] = (int(move["y"]), int(move["x"]))
+    return {
+        id: position
+        for id, position in positions.items()
+        if not 0 <= death_date[id] <= t
+    }
+
+
+@pytest.mark.parametrize("interval", [None, 10**5])
+def test_frames_match_full_reconstruction(simulation, interval):
+    frames = list(Lab().iter_frames(simulation, interval))
+    assert len(frames) > 1
+    if interval is not None:
+        assert (np.diff([t for t, *_ in frames]) == interval).all()
+    for t, ids, ys, xs in frames[:: max(len(frames) // 20, 1)] + frames[-1:]:
+        shown = dict(zip(ids.tolist(), zip(ys.tolist(), xs.tolist())))
+        assert shown == reconstruct(simulation, t)
+
+
+def test_last_frame_is_the_final_space(simulation):
+    t, ids, ys, xs = list(Lab().iter_frames(simulation))[-1]
+    space = simulation["universe"].space
+    np.testing.assert_array_equal(space[ys, xs], ids)
+    assert np.count_nonzero(space >= 0) == len(ids)
+
+
+@pytest.mark.parametrize("interval", [None, 10**5])
+def test_spatial_data_follows_the_frames(simulation, interval):
+    frames = list(Lab().iter_frames(simulation, interval))
+    timestamps, positions = Lab().get_spatial_data(simulation, interval)
+    assert timestamps == [t for t, *_ in frames] + [float("inf")]
+    times, dense = Lab().get_spatial_data(simulation, interval, dense=True)
+    np.testing.assert_array_equal(times, timestamps[:-1])
+    for (t, ids, ys, xs), compressed, frame in zip(frames, positions, dense):
+        assert compressed == dict(zip(ids.tolist(), zip(ys.tolist(), xs.tolist())))
+        np.testing.assert_array_equal(np.flatnonzero(frame[:, 0] >= 0), ids)
+        np.testing.assert_array_equal(frame[ids], np.stack([ys, xs], axis=1))
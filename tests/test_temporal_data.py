@@ -0,0 +1,63 @@
+import numpy as np
+import pytest
+
+from src.Lab import Lab
+
+
+@pytest.fixture(scope="module")
+def simulation():
+    # Hundreds of founders, each one of its own color
+    return Lab().experiment(
+        height=30,
+        width=30,
+        initial_population_count=500,
+        max_total_duration=100,
+        max_simulation_duration=0.05,
+        verbose=False,
+        engine="vectorized",
+        seed=3,
+        deterministic=True,
+        tick_duration=1e-3,
+    )
+
+
+def living(store, t: int) -> np.ndarray:
+    # Brute force, agents born at t and not dead yet
+    born = store.birth_success & (store.spawn_date >= 0) & (store.spawn_date <= t)
+    return born & ((store.death_date < 0) | (store.death_date > t))
+
+
+def test_population_count_matches_brute_force(simulation):
+    store = simulation["universe"].population_store
+    data = Lab().get_temporal_data(simulation)
+    for t, count in data["population_count"].items():
+        assert count == np.count_nonzero(living(store, t))
+
+
+@pytest.mark.parametrize("by", ["generation", "color"])
+def test_breakdowns_match_brute_force(simulation, by):
+    store = simulation["universe"].population_store
+    data = Lab().get_temporal_data(simulation, by=by)
+    if by == "color":
+        assert data.shape[1] > 300  # High cardinality key
+        colors = store.color.astype(np.int32)
+        keys = np.array(
+            [f"#{c:06x}" for c in colors[:, 0] << 16 | colors[:, 1] << 8 | colors[:, 2]]
+        )
+    else:
+        keys = store.generation
+    total = Lab().get_temporal_data(simulation)["population_count"]
+    np.testing.assert_array_equal(data.sum(axis=1), total)
+    for t in data.index[:: max(len(data) // 10, 1)]:
+        groups, counts = np.unique(keys[living(store, t)], return_counts=True)
+        expected = dict(zip(groups.tolist(), counts.tolist()))
+        row = data.loc[t]
+        assert row[row > 0].to_dict() == expected
+
+
+def test_resampled_counts_follow_the_events(simulation):
+    data = Lab().get_temporal_data(simulation, by="color")
+    interval = 10**6
+    resampled = Lab().get_temporal_data(simulation, by="color", interval=interval)
+    for t, row in resampled.iloc[1:].iterrows():
+        np.testing.assert_array_equal(row, data[data.index <= t].iloc[-1])